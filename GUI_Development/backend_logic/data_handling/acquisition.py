@@ -0,0 +1,110 @@
+import threading
+import logging
+import numpy as np
+from mindstream_shared.ring_buffer import SampleRingBuffer
+
+
+class BoardAcquisition:
+    """
+    Dedicated acquisition thread for a streaming BoardShim.
+
+    Drains the board with get_board_data() into a SampleRingBuffer, so BrainFlow's
+    own ring never wraps and every consumer reads the same samples by index
+    instead of copying the board buffer on its own. Subscribers are notified
+    from this thread once enough new samples have arrived, so nothing downstream
+    has to poll.
+    """
+
+    def __init__(self, board_shim, buffer_seconds: float = 60.0, poll_interval_s: float = 0.004):
+        from brainflow.board_shim import BoardShim
+
+        self.board_shim = board_shim
+        board_id = board_shim.get_board_id()
+        self.sampling_rate = BoardShim.get_sampling_rate(board_id)
+        self.num_rows = BoardShim.get_num_rows(board_id)
+        self.timestamp_channel = BoardShim.get_timestamp_channel(board_id)
+        try:
+            self.package_num_channel = BoardShim.get_package_num_channel(board_id)
+        except Exception:
+            self.package_num_channel = None
+
+        self.poll_interval_s = poll_interval_s
+        self.ring = SampleRingBuffer(self.num_rows, int(buffer_seconds * self.sampling_rate))
+
+        # Each entry: [callback, hop_samples, sample count at the last notification]
+        self._subscribers = []
+        self._subscribers_lock = threading.Lock()
+
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.logger = logging.getLogger(__name__)
+
+    @property
+    def sample_count(self) -> int:
+        return self.ring.count
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="BoardAcquisition", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        """Stop draining. Must be called before the board session is released."""
+        self._stop_event.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def _run(self):
+        while not self._stop_event.is_set():
+            try:
+                block = self.board_shim.get_board_data()
+                if block is not None and block.size:
+                    self.ring.append(block)
+                    self._notify_subscribers()
+            except Exception as e:
+                self.logger.error(f"Board acquisition failed: {e}")
+            self._stop_event.wait(self.poll_interval_s)
+
+    # ─── Data-available notifications ───────────────────────────────
+    def subscribe(self, callback, hop_samples: int = 1):
+        """
+        Call `callback(sample_count)` whenever at least `hop_samples` new samples
+        have arrived since its previous call. Runs on the acquisition thread, so
+        callbacks must be quick and thread-safe (set an Event, emit a Qt signal).
+        """
+        with self._subscribers_lock:
+            self._subscribers.append([callback, max(1, int(hop_samples)), self.ring.count])
+
+    def unsubscribe(self, callback):
+        with self._subscribers_lock:
+            self._subscribers = [sub for sub in self._subscribers if sub[0] != callback]
+
+    def _notify_subscribers(self):
+        count = self.ring.count
+        with self._subscribers_lock:
+            due = [sub for sub in self._subscribers if count - sub[2] >= sub[1]]
+            for sub in due:
+                sub[2] = count
+        for callback, _, _ in due:
+            try:
+                callback(count)
+            except Exception as e:
+                self.logger.error(f"Data-available subscriber failed: {e}")
+
+    # ─── BoardShim-compatible reads ─────────────────────────────────
+    def get_current_board_data(self, num_points):
+        """
+        Drop-in replacement for BoardShim.get_current_board_data: returns the
+        newest `num_points` samples as a (num_rows, n) view of the ring.
+        """
+        return self.ring.latest(num_points)
+
+    def read(self, start, stop):
+        """Samples [start, stop) by absolute sample index, as a view."""
+        return self.ring.read(start, stop)
@@ -0,0 +1,193 @@
+import threading
+from dataclasses import dataclass
+from typing import Dict, Optional, Tuple
+import numpy as np
+
+# Standard EEG bands (Hz)
+DEFAULT_BANDS = {
+    "delta": (1.0, 4.0),
+    "theta": (4.0, 8.0),
+    "alpha": (8.0, 13.0),
+    "beta": (13.0, 30.0),
+    "gamma": (30.0, 45.0),
+}
+
+
+@dataclass(frozen=True)
+class BandPowers:
+    """
+    Band powers of every channel for one spectrum; rows follow eeg_channels,
+    columns follow `names`. Arrays are fresh per result and never modified.
+    """
+    names: Tuple[str, ...]
+    absolute: np.ndarray           # (n_ch, n_bands) µV² integrated over each band
+    relative: np.ndarray           # (n_ch, n_bands) fraction of the power in `total_band`
+    erd: Optional[np.ndarray]      # (n_ch, n_bands) ERD% vs. the baseline, None without one
+    sample_index: int              # Absolute index one past the newest sample of the spectrum
+
+    def band(self, name, kind="absolute"):
+        """(n_ch,) column for one band, e.g. powers.band("alpha", "erd")."""
+        values = getattr(self, kind)
+        return None if values is None else values[:, self.names.index(name)]
+
+
+class BandPowerEngine:
+    """
+    Named-band powers of all channels from a power spectral density matrix.
+
+    Each band is a (low, high) range in Hz. For a given frequency grid, i.e. once
+    per (fs, nfft), the engine builds an (n_bins, n_bands + 1) weight matrix: the
+    overlap in Hz of every bin with every band, plus the `total_band` column used
+    for relative power. Band powers are then a single matrix product per spectrum.
+
+    ERD% is (P - R) / R * 100 against a per-channel, per-band baseline R, either
+    averaged between begin_baseline()/end_baseline() or given to set_baseline()
+    (PreOnsetBaseline sets every trial's pre-onset powers).
+    """
+
+    def __init__(self, bands: Optional[Dict[str, Tuple[float, float]]] = None, total_band=None):
+        bands = dict(bands or DEFAULT_BANDS)
+        if not bands:
+            raise ValueError("BandPowerEngine needs at least one band")
+        self.names = tuple(bands)
+        self.edges = np.array([bands[name] for name in self.names], dtype=float)
+        if np.any(self.edges[:, 1] <= self.edges[:, 0]):
+            raise ValueError(f"Band limits must be increasing: {bands}")
+        if total_band is None:
+            total_band = (self.edges[:, 0].min(), self.edges[:, 1].max())
+        self.total_band = (float(total_band[0]), float(total_band[1]))
+
+        self._weights = {}             # (n_bins, bin width) → weight matrix
+        self._lock = threading.Lock()  # Baselines are set from the GUI thread, read by the DSP worker
+        self._baseline = None
+        self._baseline_sum = None
+        self._baseline_count = 0
+        self._collecting = False
+
+    def weights_for(self, freqs):
+        """(n_bins, n_bands + 1) integration weights for an evenly spaced rfft frequency grid."""
+        df = float(freqs[1] - freqs[0])
+        key = (len(freqs), df)
+        weights = self._weights.get(key)
+        if weights is None:
+            limits = np.vstack((self.edges, self.total_band))
+            low = freqs[:, None] - df / 2
+            high = freqs[:, None] + df / 2
+            overlap = np.minimum(high, limits[:, 1]) - np.maximum(low, limits[:, 0])
+            weights = np.clip(overlap, 0.0, None)
+            self._weights[key] = weights
+        return weights
+
+    def compute(self, freqs, psd, sample_index=0):
+        """
+        BandPowers for `psd` (n_ch, n_bins), a linear density in µV²/Hz on `freqs`.
+        While a baseline is being collected, the absolute powers are added to it.
+        """
+        powers = psd @ self.weights_for(freqs)
+        absolute = powers[:, :-1]
+        total = powers[:, -1:]
+        relative = np.divide(absolute, total, out=np.zeros_like(absolute), where=total > 0)
+
+        with self._lock:
+            if self._collecting:
+                if self._baseline_sum is None or self._baseline_sum.shape != absolute.shape:
+                    self._baseline_sum = np.zeros_like(absolute)
+                    self._baseline_count = 0
+                self._baseline_sum += absolute
+                self._baseline_count += 1
+            baseline = self._baseline
+
+        erd = None
+        if baseline is not None and baseline.shape == absolute.shape:
+            erd = np.divide(absolute - baseline, baseline, out=np.zeros_like(absolute), where=baseline > 0)
+            erd *= 100.0
+        return BandPowers(self.names, absolute, relative, erd, sample_index)
+
+    # ─── Baseline (reference period) for ERD% ───
+
+    def begin_baseline(self):
+        """Start averaging every computed spectrum into a new baseline."""
+        with self._lock:
+            self._collecting = True
+            self._baseline_sum = None
+            self._baseline_count = 0
+
+    def end_baseline(self):
+        """Finish averaging; returns True if any spectra were collected."""
+        with self._lock:
+            self._collecting = False
+            if not self._baseline_count:
+                return False
+            self._baseline = self._baseline_sum / self._baseline_count
+            return True
+
+    def set_baseline(self, baseline):
+        """Use a known (n_ch, n_bands) baseline of absolute powers."""
+        with self._lock:
+            self._baseline = None if baseline is None else np.array(baseline, dtype=float)
+
+    def clear_baseline(self):
+        with self._lock:
+            self._collecting = False
+            self._baseline = None
+
+    @property
+    def baseline(self):
+        return self._baseline
+
+    @property
+    def collecting_baseline(self):
+        return self._collecting
+
+
+class PreOnsetBaseline:
+    """
+    Takes the ERD% baseline from the run schedule: each trial's pre-onset
+    period (TimingEngine.before_s, from trial start to the onset) becomes the
+    baseline of the collector's current BandPowerEngine, so ERD% after the
+    onset compares against the rest just before it.
+
+    The period is kept as absolute sample indices and the baseline is one Welch
+    estimate over exactly those samples (band_powers_between), taken once the
+    onset sample arrived. The live running mean would also average the seconds
+    before the trial started.
+
+    Connects to TimingEngine's trial_started, tick_8ms and state_changed;
+    every slot runs on the GUI thread and only calls the engine's locked
+    set_baseline().
+    """
+
+    def __init__(self, timing_engine, data_collector):
+        self.timing_engine = timing_engine
+        self.data_collector = data_collector
+        self._start = None  # Sample index of the trial start while waiting for the onset
+        self._onset = None
+        timing_engine.trial_started.connect(self._on_trial_started)
+        timing_engine.tick_8ms.connect(self._on_tick)
+        timing_engine.state_changed.connect(self._on_state_changed)
+
+    def _on_trial_started(self, trial_index):
+        self._finish()
+        sampling_rate = self.data_collector.sampling_rate
+        if self.timing_engine.before_s <= 0 or not sampling_rate:
+            return
+        self._start = self.data_collector.get_sample_count()
+        self._onset = self._start + int(round(self.timing_engine.before_s * sampling_rate))
+
+    def _on_tick(self, now_ms, sched_ms):
+        if self._start is not None and self.data_collector.get_sample_count() >= self._onset:
+            self._finish()
+
+    def _on_state_changed(self, run_active, recording_enabled):
+        # A stopped run ends its pre-onset period early (the samples so far are used)
+        if not run_active:
+            self._finish()
+
+    def _finish(self):
+        if self._start is None:
+            return
+        start, stop = self._start, min(self._onset, self.data_collector.get_sample_count())
+        self._start = self._onset = None
+        baseline = self.data_collector.band_powers_between(start, stop)
+        if baseline is not None:  # Too short for one segment: the previous baseline stays
+            self.data_collector.band_power.set_baseline(baseline)
@@ -1,18 +1,48 @@
+import threading
 import numpy as np
 from brainflow import AggOperations
 from brainflow.data_filter import DataFilter, FilterTypes, DetrendOperations, NoiseTypes
 from scipy.interpolate import CubicSpline
 from scipy.signal import windows
-from PyQt5.QtCore import QTimer
+from PyQt5.QtCore import QTimer, QObject, pyqtSignal
 import backend_logic.data_handling.data_processing as dp
+from backend_logic.data_handling.acquisition import BoardAcquisition
+from backend_logic.data_handling.streaming_filters import StreamingFilterChain
+from backend_logic.data_handling.dsp_worker import DSPWorker, FRAME_STAGES
+from backend_logic.data_handling.spectral import SpectralEngine, WelchEngine
+from backend_logic.data_handling.band_power import BandPowerEngine
 from scipy.ndimage import uniform_filter1d
-from scipy.signal import welch, windows
+
+
+class _RotatingBuffers:
+    """A few preallocated float arrays handed out in turn (reallocated only when the shape changes)."""
+
+    def __init__(self, n_slots):
+        self._slots = [None] * n_slots
+        self._next = 0
+
+    def next(self, shape):
+        idx = self._next
+        self._next = (idx + 1) % len(self._slots)
+        buf = self._slots[idx]
+        if buf is None or buf.shape != shape:
+            buf = np.empty(shape)
+            self._slots[idx] = buf
+        return buf
+
+
+class CollectorSignals(QObject):
+    """Qt-side notifications; emitted from worker threads, delivered queued to GUI-thread receivers."""
+    data_available = pyqtSignal(int)   # Absolute sample count, once data_hop_samples new samples arrived
+    frame_ready = pyqtSignal(object)   # DSPFrame from the DSP worker
 
 
 class CentralizedDataCollector:
     def __init__(self, board_shim, eeg_channels, preprocessing, ica_manager=None):
         self.board_shim = board_shim
         self.eeg_channels = eeg_channels
+        self.channel_index = {ch: idx for idx, ch in enumerate(eeg_channels)}  # Board channel → array row
+        # PreprocessingConfigPublisher (anything with a `.config` PreprocessingConfig)
         self.preprocessing = preprocessing
         self.ica_manager = ica_manager
         
@@ -21,6 +51,19 @@ class CentralizedDataCollector:
         if board_shim:
             from brainflow.board_shim import BoardShim
             self.sampling_rate = BoardShim.get_sampling_rate(board_shim.get_board_id())
+
+        # Event-driven updates instead of polling timers: data_available fires once
+        # at least data_hop_samples new samples arrived (recorder), and the DSP worker
+        # runs once per frame_hop_samples (None ⇒ about 60 frames per second)
+        self.signals = CollectorSignals()
+        self.data_hop_samples = 1
+        self.frame_hop_samples = None
+
+        # Single acquisition thread draining the board into a shared ring buffer;
+        # every consumer below reads views of that ring instead of the board
+        self.acquisition = None
+        if board_shim:
+            self._start_acquisition(board_shim)
         
         # Init 3 different num_points for different plots
         # Reduced to 4 seconds for better performance (33% less processing per frame)
@@ -52,13 +95,62 @@ class CentralizedDataCollector:
         self.data_FFT = None
         self.data_PSD = None
         
-        # Cache windows for performance - compute once, reuse every frame
-        self._hamming_window_FFT = None
-        self._hamming_window_PSD = None
-        
-        # Pre-allocate arrays for performance
-        self._freq_array_FFT = None
-        self._freq_array_PSD = None
+        # Streaming mode: keep per-channel filter state and only filter new samples
+        # instead of re-filtering the whole window every frame
+        self.use_streaming_filters = True
+        self._stream_chain = None
+
+        # Newest filtered window, shared by muV/FFT/PSD/recorder on the same frame:
+        # (sample_index, config generation, streaming flag, length, window, newest index)
+        self._window_cache = None
+        self.window_cache_hits = 0
+        self.window_cache_misses = 0
+        # The DSP worker and the recorder (GUI thread) both ask for windows
+        self._window_lock = threading.Lock()
+
+        # FFT engine: full spectrum once per fft_hop_samples (None ⇒ about 30 per second),
+        # optional per-sample sliding-DFT bins
+        self.fft_hop_samples = None
+        self.fft_sliding_bins = None
+        self._fft_engine = None
+        self._fft_engine_bins = None
+        self._fft_result = None  # (engine version, pooled amplitudes)
+        self._fft_lock = threading.Lock()
+
+        # PSD engine: running Welch mean over the newest psd_segments segments of
+        # psd_nperseg samples (None ⇒ nump_PSD), one new periodogram per hop
+        self.psd_nperseg = None
+        self.psd_segments = 8
+        # Rolling spectrogram: the newest spectrogram_columns segment periodograms, in dB
+        self.spectrogram_columns = 300
+        self._psd_engine = None
+        self._psd_result = None  # (engine version, pooled log powers)
+        self._psd_lock = threading.Lock()
+
+        # Named-band powers from the same Welch spectrum, one result per new segment;
+        # replace band_power (or its bands) to change what every consumer sees
+        self.band_power = BandPowerEngine()
+        self.data_bands = None
+        self._bands_result = None  # (engine, Welch version, BandPowers)
+
+        # Reused output buffers: a few slots each so a result handed to a caller
+        # stays intact while the next ones are written (DSP frames copy theirs)
+        self._window_outputs = _RotatingBuffers(3)
+        self._fft_outputs = _RotatingBuffers(3)
+        self._psd_outputs = _RotatingBuffers(3)
+
+        # Live views render the worker's latest frame instead of computing on the GUI thread;
+        # it computes only the stages some consumer asked for (consumer → stages)
+        self.use_dsp_worker = True
+        self.dsp_worker = DSPWorker(self, on_frame=self.signals.frame_ready.emit)
+        self._frame_demand = {}
+        self._demand_lock = threading.Lock()
+        # A new preprocessing config should show up without waiting for new samples
+        config_changed = getattr(preprocessing, 'config_changed', None)
+        if config_changed is not None:
+            config_changed.connect(self.dsp_worker.notify)
+        if board_shim:
+            self._start_processing()
 
     
 
@@ -66,49 +158,37 @@ class CentralizedDataCollector:
     def collect_data_muV(self):
         self.data = None
         if self.board_on:
-            self.data = dp.get_filtered_data_with_ica(self.board_shim, self.nump_muV, self.eeg_channels, self.preprocessing, self.ica_manager)
+            self.data = self._get_filtered_window(self.nump_muV)
             return self.data
         return None
 
 
     def collect_data_FFT(self):
 
-        self.data_FFT = None  # Will be a 2D array of shape [[freqs], [Amplitude 1, Amplitude 2, Amplitude 3, etc.]]
+        self.data_FFT = None  # (freqs, amplitudes): amplitudes is (n_channels, n_freqs), row i ↔ eeg_channels[i]
 
         if self.board_on:
-            data_for_FFT = dp.get_filtered_data_with_ica(self.board_shim, self.nump_FFT, self.eeg_channels, self.preprocessing, self.ica_manager)
-            
-            # Pre-allocate amplitude list for performance
-            num_channels = len(self.eeg_channels)
-            amplitudes = [None] * num_channels
-
-            # Cache frequency array - compute once, reuse every frame
-            if self._freq_array_FFT is None:
-                self._freq_array_FFT = np.fft.rfftfreq(self.nump_FFT, d=1.0 / self.sampling_rate)
-            freqs = self._freq_array_FFT
-            
-            # Cache Hamming window - compute once, reuse every frame
-            if self._hamming_window_FFT is None:
-                self._hamming_window_FFT = windows.hamming(self.nump_FFT)
-            window = self._hamming_window_FFT
+            data_for_FFT, newest_index = self.get_indexed_filtered_array(self.nump_FFT)
+            if data_for_FFT.shape[1] < self.nump_FFT:
+                return None  # Not enough data yet — skip this frame
+
+            # Batched, hop-limited spectrum shared by the FFT plot, recorder and band powers
+            config = self.get_config()
+            # Sliding bins are exact only when each window is a pure shift of the last
+            allow_sliding = self.windows_are_shifts(config)
+            with self._fft_lock:
+                engine = self._get_fft_engine()
+                freqs, spectrum = engine.compute(data_for_FFT, newest_index,
+                                                 key=(config.generation, self.use_streaming_filters),
+                                                 allow_sliding=allow_sliding)
+                result = self._fft_result
+                if result is None or result[0] != engine.version:
+                    # Hand out a pooled copy so callers never see the engine's later updates
+                    amplitudes = self._fft_outputs.next(spectrum.shape)
+                    np.copyto(amplitudes, spectrum)
+                    result = self._fft_result = (engine.version, amplitudes)
+                amplitudes = result[1]
 
-            for idx, ch in enumerate(self.eeg_channels):
-                # Apply the window to the latest slice of EEG data
-                signal = data_for_FFT[ch]
-                if len(signal) < self.nump_FFT:
-                    return None  # Not enough data yet — skip this frame
-
-                signal = signal[-self.nump_FFT:]  # Now we can safely slice
-                windowed_signal = signal * window
-
-                # Perform FFT on windowed signal
-                fft_vals = np.fft.rfft(windowed_signal)
-                amplitude = np.abs(fft_vals)
-                # Use index assignment instead of append for pre-allocated list
-                amplitudes[idx] = amplitude
-
-
-            # Return as tuple: (freqs, list_of_amplitudes)
             self.data_FFT = (freqs, amplitudes)
             return self.data_FFT
             
@@ -118,81 +198,343 @@ class CentralizedDataCollector:
 
     def collect_data_PSD(self):
 
-        self.data_PSD = None    
+        self.data_PSD = None    # (freqs, powers): powers is (n_channels, n_freqs), row i ↔ eeg_channels[i]
 
 
         if self.board_on:
-            data_for_PSD = dp.get_filtered_data_with_ica(
-                self.board_shim, 
-                self.nump_PSD, 
-                self.eeg_channels, 
-                self.preprocessing,
-                self.ica_manager
-            )
-
-            # Pre-allocate power list for performance
-            num_channels = len(self.eeg_channels)
-            powers = [None] * num_channels
-
-            # Cache frequency array - compute once, reuse every frame
-            if self._freq_array_PSD is None:
-                self._freq_array_PSD = np.fft.rfftfreq(self.nump_PSD, d=1.0 / self.sampling_rate)
-            freqs = self._freq_array_PSD
-
-            # Cache Hamming window - compute once, reuse every frame
-            nperseg = self.nump_PSD  # Full window size for Welch = 84 samples
-            noverlap = int(0.5 * nperseg)  # 50% overlap for smoother averaging
-            if self._hamming_window_PSD is None:
-                self._hamming_window_PSD = windows.hamming(nperseg)
-            window = self._hamming_window_PSD
-
-            for idx, ch in enumerate(self.eeg_channels):
-                signal = data_for_PSD[ch]
-                if len(signal) < self.nump_PSD:
+            with self._psd_lock:
+                result = self._welch_density()
+                if result is None:
                     return None
+                version, freqs, power = result
+                cached = self._psd_result
+                if cached is None or cached[0] != version:
+                    powers = self._psd_outputs.next(power.shape)
+                    np.log1p(power, out=powers)  # Safe log
+                    uniform_filter1d(powers, size=4, axis=-1, output=powers)  # Smooth
+                    cached = self._psd_result = (version, powers)
+                powers = cached[1]
 
-                signal = signal[-self.nump_PSD:] * window
-                freqs_welch, power = welch(
-                    signal,
-                    fs=self.sampling_rate,  # Ensure this is 125 Hz or as configured
-                    window=window,
-                    nperseg=self.nump_PSD,  # Should be high enough for clear frequency resolution
-                    noverlap=int(0.5 * self.nump_PSD),
-                    scaling='density'
-                )
-
-                log_power = np.log1p(power)  # Safe log
-                log_power = uniform_filter1d(log_power, size=4)  # Smooth
-                # Use index assignment instead of append for pre-allocated list
-                powers[idx] = log_power
-
-            # Return as tuple: (freqs, list_of_powers)
             self.data_PSD = (freqs, powers)
             return self.data_PSD
 
         return None
 
-    
+    def collect_band_powers(self):
+        """
+        BandPowers (absolute, relative and ERD% per channel and band) from the
+        current Welch spectrum. Recomputed only when a new segment completed, so
+        every detector and view asking on the same hop shares one result.
+        """
+        self.data_bands = None
+        if self.board_on:
+            with self._psd_lock:
+                result = self._welch_density()
+                if result is None:
+                    return None
+                version, freqs, power = result
+                engine = self.band_power
+                cached = self._bands_result
+                if cached is None or cached[0] is not engine or cached[1] != version:
+                    bands = engine.compute(freqs, power, self._psd_engine.last_index)
+                    cached = self._bands_result = (engine, version, bands)
+            self.data_bands = cached[2]
+            return self.data_bands
+        return None
+
+    def band_powers_between(self, start, stop):
+        """
+        Absolute band powers (n_ch, n_bands) of the filtered samples [start, stop)
+        only (absolute sample indices), from one Welch estimate over the segments
+        lying entirely inside that range; for baselines of a known period. The
+        part of the range still held by the filtered window is used. None when
+        not even one segment of it is available.
+        """
+        if not self.board_on:
+            return None
+        with self._psd_lock:
+            welch = self._get_psd_engine()
+        available = self.get_sample_count() - int(start)
+        if available <= 0:
+            return None
+        data, newest_index = self.get_indexed_filtered_array(available)
+        first = newest_index - data.shape[1]
+        lo = max(int(start), first)
+        hi = min(int(stop), newest_index)
+        if hi <= lo:
+            return None
+        result = welch.mean_psd(data[:, lo - first:hi - first], lo)
+        if result is None:
+            return None
+        freqs, psd = result
+        return self.band_power.compute(freqs, psd, hi).absolute
+
+    def get_spectrogram(self, num_columns=None):
+        """
+        Rolling spectrogram as (freqs, seconds per column, columns, column count):
+        columns is a read-only (n_channels, n_freqs, n) dB view, oldest column first,
+        and column count the total ever added. Columns are added by the Welch pass
+        (one per segment hop), so this never computes anything.
+        """
+        engine = self._psd_engine
+        if not self.board_on or engine is None or engine.history is None:
+            return None
+        history = engine.history
+        columns = history.latest(num_columns or history.capacity)
+        if columns.shape[1] == 0:
+            return None
+        columns = columns.reshape(len(self.eeg_channels), len(engine.freqs), columns.shape[1])
+        return engine.freqs, engine.step / self.sampling_rate, columns, history.count
+
+    def update_welch(self):
+        """Run the Welch pass (new spectrogram columns) without producing a PSD result."""
+        if self.board_on:
+            with self._psd_lock:
+                self._welch_density()
+
+    def _welch_density(self):
+        """(version, freqs, linear PSD) from the Welch engine; call with _psd_lock held."""
+        engine = self._get_psd_engine()
+        data, newest_index = self.get_indexed_filtered_array(engine.span)
+        if data.shape[1] < engine.nperseg:
+            return None
+        config = self.get_config()
+        result = engine.compute(data, newest_index, key=(config.generation, self.use_streaming_filters))
+        if result is None:
+            return None
+        return (engine.version,) + result
+
     def get_data(self):
         return self.data
+
+    def get_filtered_array(self, num_points):
+        """
+        Filtered (n_channels, n) array for the newest `num_points` samples, as a
+        read-only view. Row i is eeg_channels[i]; see `channel_index`.
+
+        Memoized on (newest sample index, config generation, window length): every
+        consumer asking within the same sample tick shares one computation, and
+        shorter windows are served as slices of the cached longest one. Misses
+        compute the longest window any consumer uses, so the muV/FFT/PSD views
+        share a single filter + ICA pass.
+        """
+        return self.get_indexed_filtered_array(num_points)[0]
+
+    def get_indexed_filtered_array(self, num_points):
+        """(get_filtered_array(num_points), absolute index one past its newest sample)."""
+        with self._window_lock:
+            window, newest_index = self._cached_filtered_array(num_points)
+        view = window[:, -num_points:] if num_points < window.shape[1] else window[:, :]
+        view.flags.writeable = False
+        return view, newest_index
+
+    def _get_filtered_window(self, num_points):
+        """Filtered {channel: samples} for the newest `num_points` samples (row views)."""
+        window = self.get_filtered_array(num_points)
+        return {ch: window[idx] for idx, ch in enumerate(self.eeg_channels)}
+
+    def _get_fft_engine(self):
+        hop = self.fft_hop_samples or max(1, round(self.sampling_rate / 30))
+        engine = self._fft_engine
+        if (engine is None or engine.nfft != self.nump_FFT or engine.sampling_rate != self.sampling_rate
+                or engine.hop_samples != hop or self._fft_engine_bins != self.fft_sliding_bins):
+            engine = SpectralEngine(self.sampling_rate, self.nump_FFT, hop, self.fft_sliding_bins)
+            self._fft_engine = engine
+            self._fft_engine_bins = self.fft_sliding_bins
+            self._fft_result = None
+        return engine
+
+    def _get_psd_engine(self):
+        nperseg = self.psd_nperseg or self.nump_PSD
+        engine = self._psd_engine
+        if (engine is None or engine.nperseg != nperseg or engine.sampling_rate != self.sampling_rate
+                or engine.n_segments != self.psd_segments or engine.history_columns != self.spectrogram_columns):
+            engine = WelchEngine(self.sampling_rate, nperseg, self.psd_segments,
+                                 history_columns=self.spectrogram_columns)
+            self._psd_engine = engine
+            self._psd_result = None
+            self._bands_result = None
+        return engine
+
+    def _longest_window(self):
+        """Longest window any consumer asks for; cache misses compute this much."""
+        psd_span = self._psd_engine.span if self._psd_engine is not None else self.nump_PSD
+        return max(self.nump_muV, self.nump_FFT, self.nump_PSD, psd_span)
+
+    def _cached_filtered_array(self, num_points):
+        config = self.get_config()
+        sample_index = self.get_sample_count()
+        cache = self._window_cache
+        if (cache is not None and cache[0] == sample_index and cache[1] == config.generation
+                and cache[2] == self.use_streaming_filters and cache[3] >= num_points):
+            self.window_cache_hits += 1
+            return cache[4], cache[5]
+
+        self.window_cache_misses += 1
+        length = max(num_points, self._longest_window())
+        processed, newest_index = self._compute_filtered_array(length, config)
+        self._window_cache = (sample_index, config.generation, self.use_streaming_filters, length,
+                              processed, newest_index)
+        return processed, newest_index
+
+    def _compute_filtered_array(self, num_points, config):
+        """
+        Filter the newest `num_points` samples into a pooled output buffer and run
+        them through ICA in place when enabled. Uses the streaming chain when on,
+        otherwise re-filters the whole window like before. Returns (window, absolute
+        index one past its newest sample).
+        """
+        out = self._window_outputs.next((len(self.eeg_channels), num_points))
+        if not self.use_streaming_filters or self.acquisition is None:
+            newest_index = self.get_sample_count()
+            processed = dp.get_filtered_array(self.acquisition, num_points, self.eeg_channels, config,
+                                              self.sampling_rate or 125, out=out)
+        else:
+            chain = self._stream_chain
+            if chain is None or chain.n_channels != len(self.eeg_channels) or chain.sampling_rate != self.sampling_rate:
+                # Room for the longest window plus several seconds between updates
+                chain = StreamingFilterChain(len(self.eeg_channels), self.sampling_rate, capacity=int(10 * self.sampling_rate))
+                self._stream_chain = chain
+            prime_points = self._longest_window()
+            chain.update(self.acquisition, self.eeg_channels, config, prime_points)
+            processed = chain.window(num_points, out=out)
+            newest_index = chain.latest_index
+
+        return dp.apply_ica_array(processed, self.channel_index, config, self.ica_manager), newest_index
+
+    def windows_are_shifts(self, config=None):
+        """
+        True when each filtered window is the previous one shifted by the new
+        samples (streaming filters, no detrend/smoothing/ICA rewriting the past),
+        so consumers may update incrementally instead of from the whole window.
+        """
+        config = config or self.get_config()
+        return self.use_streaming_filters and not (config.detrend or config.smoothing or config.fast_ica)
+
+    def get_window_cache_stats(self):
+        """(hits, misses) of the filtered-window cache since the last reset."""
+        return self.window_cache_hits, self.window_cache_misses
+
+    def reset_window_cache_stats(self):
+        self.window_cache_hits = 0
+        self.window_cache_misses = 0
+
+    def get_config(self):
+        """Current PreprocessingConfig snapshot (published by the GUI thread on every change)."""
+        return self.preprocessing.config
+
+    def latest_frame(self):
+        """
+        Newest DSPFrame for the live views. Never blocks on processing; computes
+        one synchronously only when the worker is disabled.
+        """
+        if self.dsp_worker.is_running():
+            return self.dsp_worker.latest_frame()
+        return self.dsp_worker.compute_frame()
+
+    def set_frame_demand(self, consumer, stages=()):
+        """
+        Declare which DSPFrame stages `consumer` needs now (see dsp_worker.FRAME_STAGES);
+        an empty `stages` withdraws it. The worker computes the union of all
+        demands and is not woken by new samples at all while that is empty.
+        Consumers that call collect_* themselves (the recorder) need not register.
+        """
+        stages = frozenset(stages)
+        unknown = stages - FRAME_STAGES
+        if unknown:
+            raise ValueError(f"Unknown frame stages: {sorted(unknown)}")
+        with self._demand_lock:
+            if stages:
+                self._frame_demand[consumer] = stages
+            else:
+                self._frame_demand.pop(consumer, None)
+            wanted = frozenset().union(*self._frame_demand.values())
+            changed = wanted != self.dsp_worker.stages
+            self.dsp_worker.stages = wanted
+        if changed:
+            self._update_processing_subscription()
+
+    def get_frame_demand(self):
+        """Union of the stages all consumers asked for."""
+        return self.dsp_worker.stages
+
+    def _start_processing(self):
+        if self.use_dsp_worker:
+            self.dsp_worker.start()
+            self._update_processing_subscription()
+
+    def _update_processing_subscription(self):
+        """Wake the worker once per frame hop while some consumer wants frames, never otherwise."""
+        acquisition = self.acquisition
+        if acquisition is None:
+            return
+        acquisition.unsubscribe(self.dsp_worker.notify)
+        if self.dsp_worker.stages and self.dsp_worker.is_running():
+            hop = self.frame_hop_samples or max(1, round(acquisition.sampling_rate / 60))
+            acquisition.subscribe(self.dsp_worker.notify, hop)
+            self.dsp_worker.notify()  # A new consumer sees its stages without waiting a hop
+
+    def _stop_processing(self):
+        if self.acquisition is not None:
+            self.acquisition.unsubscribe(self.dsp_worker.notify)
+        self.dsp_worker.stop()
+
+    def _start_acquisition(self, board_shim):
+        """Start draining `board_shim` on the acquisition thread."""
+        self._stop_acquisition()
+        self.acquisition = BoardAcquisition(board_shim)
+        self.acquisition.subscribe(self.signals.data_available.emit, self.data_hop_samples)
+        self.acquisition.start()
+
+    def _stop_acquisition(self):
+        if self.acquisition is not None:
+            self.acquisition.stop()
+            self.acquisition = None
+
+    def get_sample_count(self):
+        """Absolute index one past the newest acquired sample (0 when the board is off)."""
+        return self.acquisition.sample_count if self.acquisition else 0
+
+    def get_raw_window(self, num_points):
+        """Newest `num_points` raw board samples (all BrainFlow rows) as a read-only view."""
+        if self.acquisition is None:
+            return None
+        return self.acquisition.get_current_board_data(num_points)
+
+    def get_raw_range(self, start, stop):
+        """Raw board samples [start, stop) by absolute sample index, as a view."""
+        if self.acquisition is None:
+            return None
+        return self.acquisition.read(start, stop)
     
     def set_board_shim(self, board_shim):
-        """Update the board_shim reference and reinitialize sampling rate if needed."""
+        """
+        Update the board_shim reference and reinitialize sampling rate if needed.
+        Call with None *before* releasing the board session so the acquisition
+        thread stops draining it first.
+        """
         self.board_shim = board_shim
+        self._stop_processing()
+        self._stop_acquisition()
+        self._stream_chain = None
+        self._window_cache = None
+        self._fft_engine = None
+        self._fft_result = None
+        self._psd_engine = None
+        self._psd_result = None
+        self._bands_result = None
         if board_shim:
+            self._start_acquisition(board_shim)
             from brainflow.board_shim import BoardShim
             self.sampling_rate = BoardShim.get_sampling_rate(board_shim.get_board_id())
             # Update EEG channels in case board changed
             self.eeg_channels = BoardShim.get_eeg_channels(board_shim.get_board_id())
+            self.channel_index = {ch: idx for idx, ch in enumerate(self.eeg_channels)}
             # Recalculate num_points based on new sampling rate (4 seconds for performance)
             self.nump_muV = int(4 * self.sampling_rate)
             self.nump_FFT = int(4 * self.sampling_rate)
-            # Clear cached arrays since num_points changed
-            self._hamming_window_FFT = None
-            self._hamming_window_PSD = None
-            self._freq_array_FFT = None
-            self._freq_array_PSD = None
             self.board_on = True
+            self._start_processing()
         else:
             self.sampling_rate = None
             self.board_on = False
@@ -2,250 +2,110 @@ import numpy as np
 from brainflow import AggOperations
 from brainflow.data_filter import DataFilter, FilterTypes, DetrendOperations, NoiseTypes
 from scipy.interpolate import CubicSpline
+from numpy.lib.stride_tricks import sliding_window_view
+from backend_logic.data_handling.filter_bank import filter_bank_for, sosfilt_forward_backward
 # Include this for manual implementation
 import scipy.signal as signal_lib
     #butter, filtfilt, lfilter
 
-def get_filtered_data(board_shim, num_points, eeg_channels, preprocessing):
+def get_filtered_data(board_shim, num_points, eeg_channels, config, sampling_rate=125):
     """
     Retrieves raw EEG data and applies optional preprocessing steps,
     delegating all BP/BS logic to the helper functions.
+
+    `board_shim` can be a BoardShim or anything exposing the same
+    get_current_board_data(num_points) call, e.g. the collector's BoardAcquisition ring.
+    `config` is a PreprocessingConfig snapshot; no Qt widget is touched here.
+    Returns {channel: samples} as row views of get_filtered_array's result.
+    """
+    processed = get_filtered_array(board_shim, num_points, eeg_channels, config, sampling_rate)
+    return {channel: processed[idx] for idx, channel in enumerate(eeg_channels)}
+
+
+def get_filtered_array(board_shim, num_points, eeg_channels, config, sampling_rate=125, out=None):
+    """
+    Array form of get_filtered_data: a (len(eeg_channels), n_samples) block whose
+    rows follow `eeg_channels`. The EEG rows are gathered once into `out` (reused
+    when its shape matches, otherwise allocated) and every step runs in place on it.
     """
+    bank = filter_bank_for(config, sampling_rate)
+
     data = board_shim.get_current_board_data(num_points)
-    processed_data = {}
-
-    for channel in eeg_channels:
-        signal = data[channel].copy()
-
-        # 1) Remove mains hum (50/60 Hz)
-        DataFilter.remove_environmental_noise(
-            data=signal,
-            sampling_rate=125,
-            noise_type=NoiseTypes.FIFTY_AND_SIXTY
-        )
-
-        # 2) Detrend if requested
-        if preprocessing["DetrendOnOff"].isChecked():
-            signal = detrend_signal(signal)
-
-        # 3) Band-pass / low-pass / high-pass (all logic inside bandpass_filters)
-        if preprocessing["BandPassOnOff"].isChecked():
-            signal = bandpass_filters(
-                signal,
-                preprocessing,
-                sampling_rate=125,
-                order=4
-            )
-
-        # 4) Band-stop / low-cut / high-cut (all logic inside bandstop_filters)
-        if preprocessing["BandStopOnOff"].isChecked():
-            signal = bandstop_filters(
-                signal,
-                preprocessing,
-                sampling_rate=125,
-                order=4
-            )
-
-        processed_data[channel] = signal
-
-
-    # 5) Smoothing (applied to each channel individually)
-    for channel in eeg_channels:
-        if channel in processed_data:
-            signal = processed_data[channel]
-            window_size = preprocessing["Window"].value()
-            if preprocessing["Average"].isChecked():
-                signal = mean_smoothing(signal, window_size)
-            if preprocessing["Median"].isChecked():
-                signal = median_smoothing(signal, window_size)
-            processed_data[channel] = signal
+    shape = (len(eeg_channels), data.shape[1])
+    if out is None or out.shape != shape:
+        out = np.empty(shape)
+    np.take(data, eeg_channels, axis=0, out=out)
+    if shape[1] == 0:
+        return out
 
-    return processed_data
+    # Every step filters all channels in one call along the sample axis
+
+    # 1) Remove mains hum (50/60 Hz)
+    out[:] = notch_filters(out, bank)
+
+    # 2) Detrend if requested
+    if config.detrend:
+        detrend_block(out)
+
+    # 3) Band-pass / low-pass / high-pass (all logic inside bandpass_filters)
+    if config.bandpass:
+        out[:] = bandpass_filters(out, bank)
+
+    # 4) Band-stop / low-cut / high-cut (all logic inside bandstop_filters)
+    if config.bandstop:
+        out[:] = bandstop_filters(out, bank)
+
+    # 5) Smoothing
+    if config.average:
+        rolling_mean(out, config.window)
+    if config.median:
+        rolling_median(out, config.window)
 
+    return out
 
-def bandpass_filters(signal, preprocessing, sampling_rate=125, order=4):
+
+def notch_filters(signal, filter_bank):
     """
-    Applies each user-configured filter slot as either:
-      • Low-pass   (blank/zero start, valid end)
-      • High-pass  (valid start, blank/zero end)
-      • Band-pass  (both present, start < end)
-    Invalid or nonsensical entries are skipped.
+    Removes 50 and 60 Hz mains hum with the FilterBank's notch stages (along the
+    last axis), the same output as remove_environmental_noise(FIFTY_AND_SIXTY).
     """
-    num_bp = preprocessing["NumberBandPass"].value()
-
-    # Determine FIR/IIR mode once and read window (for FIR only) from combo userData
-    try:
-        fir_iir_mode = preprocessing["BPTypeFIR_IIR"].currentText().strip().upper()
-    except Exception:
-        fir_iir_mode = "IIR"
-    window = None
-    if fir_iir_mode == "FIR":
-        try:
-            window = preprocessing["FIRWindowType"].currentData()
-            if window is None:
-                window = "hamming"
-        except Exception:
-            window = "hamming"
-
-    for i in range(1, num_bp + 1):
-        raw_start = preprocessing[f"BP{i}Start"].text().strip()
-        raw_end   = preprocessing[f"BP{i}End"].text().strip()
+    for kind, sos in filter_bank.notch_stages:
+        if kind == "zero_phase":
+            signal = sosfilt_forward_backward(sos, signal)
+        else:
+            signal = signal_lib.sosfilt(sos, signal, axis=-1)
 
-        # Skip completely empty slots
-        if not raw_start and not raw_end:
-            continue
+    return signal
 
-        # Parse floats (or None on failure/blank)
-        try:
-            start = float(raw_start) if raw_start else None
-        except ValueError:
-            start = None
-        try:
-            end   = float(raw_end)   if raw_end   else None
-        except ValueError:
-            end = None
 
-        if fir_iir_mode == "FIR":
-            # FIR branch: windowed FIR with 101 taps, zero-phase via filtfilt
+def bandpass_filters(signal, filter_bank):
+    """
+    Applies each configured band-pass slot from a precomputed FilterBank:
+      • FIR stages: windowed FIR, zero-phase via filtfilt
+      • IIR stages: Butterworth SOS
+    Slot parsing and filter design already happened when the bank was built.
+    """
+    for kind, coeffs in filter_bank.bandpass_stages:
+        if kind == "fir":
             try:
-                # 1) True band-pass
-                if start and end and start < end:
-                    taps = signal_lib.firwin(
-                        numtaps=101,
-                        cutoff=[start, end],
-                        pass_zero=False,
-                        window=window,
-                        fs=sampling_rate
-                    )
-                    signal = signal_lib.filtfilt(taps, [1.0], signal, axis=-1)
-
-                # 2) Low-pass only (no valid start ⇒ pass all below `end`)
-                elif end and (not start or start <= 0):
-                    taps = signal_lib.firwin(
-                        numtaps=101,
-                        cutoff=end,
-                        pass_zero=True,
-                        window=window,
-                        fs=sampling_rate
-                    )
-                    signal = signal_lib.filtfilt(taps, [1.0], signal, axis=-1)
-
-                # 3) High-pass only (no valid end ⇒ pass all above `start`)
-                elif start and (not end or end <= 0):
-                    taps = signal_lib.firwin(
-                        numtaps=101,
-                        cutoff=start,
-                        pass_zero=False,
-                        window=window,
-                        fs=sampling_rate
-                    )
-                    signal = signal_lib.filtfilt(taps, [1.0], signal, axis=-1)
-                # else: invalid combination → skip
+                # BrainFlow's rolling filters need a C-contiguous array afterwards
+                signal = np.ascontiguousarray(signal_lib.filtfilt(coeffs, [1.0], signal, axis=-1))
             except Exception:
-                # Skip slot on FIR failure rather than raising
+                # Skip slot on FIR failure (e.g. window shorter than the padding) rather than raising
                 pass
         else:
-            # IIR branch (existing behavior via BrainFlow Butterworth)
-            # 1) True band-pass
-            if start and end and start < end:
-                DataFilter.perform_bandpass(
-                    data=signal,
-                    sampling_rate=sampling_rate,
-                    start_freq=start,
-                    stop_freq=end,
-                    order=order,
-                    filter_type=FilterTypes.BUTTERWORTH.value,
-                    ripple=0
-                )
-
-            # 2) Low-pass only (no valid start ⇒ pass all below `end`)
-            elif end and (not start or start <= 0):
-                DataFilter.perform_lowpass(
-                    data=signal,
-                    sampling_rate=sampling_rate,
-                    cutoff=end,
-                    order=order,
-                    filter_type=FilterTypes.BUTTERWORTH.value,
-                    ripple=0
-                )
-
-            # 3) High-pass only (no valid end ⇒ pass all above `start`)
-            elif start and (not end or end <= 0):
-                DataFilter.perform_highpass(
-                    data=signal,
-                    sampling_rate=sampling_rate,
-                    cutoff=start,
-                    order=order,
-                    filter_type=FilterTypes.BUTTERWORTH.value,
-                    ripple=0
-                )
-
-        # else: invalid combination → skip
+            signal = signal_lib.sosfilt(coeffs, signal, axis=-1)
 
     return signal
 
 
-def bandstop_filters(signal, preprocessing, sampling_rate=125, order=4):
+def bandstop_filters(signal, filter_bank):
     """
-    Applies each user-configured slot as either:
-      • Band-stop  (both present, start < end)
-      • High-pass  (blank/zero start ⇒ cut below `end`)
-      • Low-pass   (blank/zero end   ⇒ cut above `start`)
-    Invalid entries are skipped silently.
+    Applies each configured band-stop slot (band-stop, or high/low-pass when one
+    edge is blank) from a precomputed FilterBank as Butterworth SOS.
     """
-    num_bs = preprocessing["NumberBandStop"].value()
-
-    for i in range(1, num_bs + 1):
-        raw_start = preprocessing[f"BStop{i}Start"].text().strip()
-        raw_end   = preprocessing[f"BStop{i}End"].text().strip()
-
-        if not raw_start and not raw_end:
-            continue
-
-        try:
-            start = float(raw_start) if raw_start else None
-        except ValueError:
-            start = None
-        try:
-            end   = float(raw_end)   if raw_end   else None
-        except ValueError:
-            end = None
-
-        # 1) True band-stop
-        if start and end and start < end:
-            DataFilter.perform_bandstop(
-                data=signal,
-                sampling_rate=sampling_rate,
-                start_freq=start,
-                stop_freq=end,
-                order=order,
-                filter_type=FilterTypes.BUTTERWORTH.value,
-                ripple=0
-            )
-
-        # 2) High-pass style (remove below `end`) when start missing
-        elif end and (not start or start <= 0):
-            DataFilter.perform_highpass(
-                data=signal,
-                sampling_rate=sampling_rate,
-                cutoff=end,
-                order=order,
-                filter_type=FilterTypes.BUTTERWORTH.value,
-                ripple=0
-            )
-
-        # 3) Low-pass style (remove above `start`) when end missing
-        elif start and (not end or end <= 0):
-            DataFilter.perform_lowpass(
-                data=signal,
-                sampling_rate=sampling_rate,
-                cutoff=start,
-                order=order,
-                filter_type=FilterTypes.BUTTERWORTH.value,
-                ripple=0
-            )
-
-        # else: skip invalid slots
+    for sos in filter_bank.bandstop_stages:
+        signal = signal_lib.sosfilt(sos, signal, axis=-1)
 
     return signal
 
@@ -256,16 +116,37 @@ def detrend_signal(signal):
     return signal
 
 
-def get_filtered_data_with_ica(board_shim, num_points, eeg_channels, preprocessing, ica_manager=None):
+def detrend_block(block, scratch=None):
+    """Least-squares linear detrend of every row of a (n_channels, n) block, in place."""
+    n = block.shape[-1]
+    if n < 2:
+        return block
+    ramp = np.arange(n, dtype=float) - (n - 1) / 2.0
+    slope = block @ ramp / (ramp @ ramp)
+    block -= block.mean(axis=-1, keepdims=True)
+    if scratch is None or scratch.shape != block.shape:
+        scratch = np.empty(block.shape)
+    np.multiply.outer(slope, ramp, out=scratch)
+    block -= scratch
+    return block
+
+
+def get_filtered_data_with_ica(board_shim, num_points, eeg_channels, config, ica_manager=None, sampling_rate=125):
     """
     Retrieves raw EEG data and applies preprocessing steps including ICA if enabled.
     This function integrates with the ICA manager for real-time ICA processing.
     """
     # Get preprocessed data without ICA
-    processed_data = get_filtered_data(board_shim, num_points, eeg_channels, preprocessing)
-    
-    # Apply ICA if enabled and manager is provided
-    if preprocessing["FastICA"].isChecked() and ica_manager is not None:
+    processed_data = get_filtered_data(board_shim, num_points, eeg_channels, config, sampling_rate)
+    return apply_ica(processed_data, config, ica_manager)
+
+
+def apply_ica(processed_data, config, ica_manager=None):
+    """
+    Runs already-filtered {channel: samples} data through the ICA manager when
+    FastICA is enabled. Falls back to the input if ICA fails.
+    """
+    if config.fast_ica and ica_manager is not None:
         try:
             # Process through ICA manager
             processed_data = ica_manager.process_data(processed_data)
@@ -275,6 +156,21 @@ def get_filtered_data_with_ica(board_shim, num_points, eeg_channels, preprocessi
     
     return processed_data
 
+
+def apply_ica_array(processed, channel_index, config, ica_manager=None):
+    """
+    In-place ICA for a (n_channels, n_samples) block whose rows are mapped by
+    `channel_index` ({channel: row}). Falls back to the input if ICA fails.
+    """
+    if config.fast_ica and ica_manager is not None:
+        try:
+            ica_manager.process_array(processed, channel_index)
+        except Exception as e:
+            print(f"ICA processing failed: {e}")
+
+    return processed
+
+
 def Baseline(signal):
     """
        Real-time baseline correction: subtracts the mean from the signal.
@@ -341,3 +237,36 @@ def median_smoothing(signal, window_size):
     DataFilter.perform_rolling_filter(signal, window_size, AggOperations.MEDIAN)
 
     return signal
+
+
+def rolling_mean(block, window_size, scratch=None):
+    """
+    Trailing moving average of every row of a (n_channels, n) block, in place.
+    Matches BrainFlow's rolling MEAN filter (the first samples average the
+    shorter window available so far).
+    """
+    n = block.shape[-1]
+    if window_size < 1 or n == 0:
+        return block
+    w = min(window_size, n)
+    if scratch is None or scratch.shape != block.shape:
+        scratch = np.empty(block.shape)
+    np.cumsum(block, axis=-1, out=scratch)
+    np.subtract(scratch[:, w:], scratch[:, :-w], out=block[:, w:])
+    block[:, w:] /= w
+    np.divide(scratch[:, :w], np.arange(1, w + 1), out=block[:, :w])
+    return block
+
+
+def rolling_median(block, window_size):
+    """
+    Trailing moving median of every row of a (n_channels, n) block, in place.
+    Matches BrainFlow's rolling MEDIAN filter (the first window_size - 1 samples
+    are left as they are).
+    """
+    n = block.shape[-1]
+    if window_size < 2 or n < window_size:
+        return block
+    medians = np.median(sliding_window_view(block, window_size, axis=-1), axis=-1)
+    block[:, window_size - 1:] = medians
+    return block
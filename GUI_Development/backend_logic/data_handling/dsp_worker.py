@@ -0,0 +1,159 @@
+import threading
+import logging
+import time
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+# What a consumer can ask the worker for (see CentralizedDataCollector.set_frame_demand)
+FRAME_STAGES = frozenset({
+    "window",       # Filtered (n_ch, n) window and its {channel: samples} rows
+    "fft",          # FFT amplitudes
+    "psd",          # Welch PSD (log powers)
+    "bands",        # Band powers from the Welch spectrum
+    "spectrogram",  # Welch pass only, for the rolling spectrogram columns
+})
+
+
+@dataclass(frozen=True)
+class DSPFrame:
+    """
+    One completed processing pass, handed from the DSP worker to the plots.
+
+    `version` increases with every published frame, so a widget can skip
+    redrawing when nothing new arrived. Stages no consumer asked for are None.
+    A frame owns its arrays (compute_frame
+    copies them out of the collector's pooled buffers), so nothing writes to
+    it after it is published and readers need no lock.
+    """
+    version: int
+    sample_index: int                  # Absolute index one past the newest sample used
+    generation: int                    # PreprocessingConfig generation used
+    filtered: Optional[Dict[int, Any]]  # {channel: samples}, as collect_data_muV
+    window: Optional[Any]              # The same samples as one (n_ch, n) array; rows of `filtered` view it
+    window_index: int                  # Absolute index one past the newest sample of `window`
+    fft: Optional[tuple]               # (freqs, amplitudes), as collect_data_FFT
+    psd: Optional[tuple]               # (freqs, log powers), as collect_data_PSD
+    bands: Optional[Any]               # BandPowers, as collect_band_powers
+    created: float                     # time.time() when the frame was completed
+
+
+class FrameDoubleBuffer:
+    """
+    Two-slot frame buffer: the worker writes the back slot, then flips which
+    slot is the front. Readers take the front frame without locking, so
+    rendering never waits on DSP and DSP never waits on rendering; that is only
+    safe because published frames own their data (see DSPFrame).
+    """
+
+    def __init__(self):
+        self._slots = [None, None]
+        self._front = 0
+
+    def publish(self, frame: DSPFrame):
+        back = 1 - self._front
+        self._slots[back] = frame
+        self._front = back  # Single reference swap: readers see old or new, never partial
+
+    def latest(self) -> Optional[DSPFrame]:
+        return self._slots[self._front]
+
+    def clear(self):
+        self._slots = [None, None]
+        self._front = 0
+
+
+class DSPWorker:
+    """
+    Processing thread for the live views.
+
+    Sleeps until notify() is called (a hop of new samples arrived, or a new
+    PreprocessingConfig was published), then runs the collector's filter/ICA, FFT,
+    Welch and band-power passes off the Qt main thread, publishes the result as a
+    DSPFrame into a FrameDoubleBuffer and hands it to `on_frame`. Only the
+    stages in `stages` are computed; with none requested a pass does nothing.
+    """
+
+    def __init__(self, data_collector, on_frame=None):
+        self.data_collector = data_collector
+        self.on_frame = on_frame  # Called on the worker thread with each new frame
+        self.frames = FrameDoubleBuffer()
+        self.stages = frozenset()  # Stages the consumers need, set by the collector
+        self._version = 0
+
+        self._wake = threading.Event()
+        self._stop_event = threading.Event()
+        self._thread = None
+        self.logger = logging.getLogger(__name__)
+
+    def notify(self, *args):
+        """Wake the worker for another pass (safe from any thread)."""
+        self._wake.set()
+
+    def start(self):
+        if self._thread is not None and self._thread.is_alive():
+            return
+        self._stop_event.clear()
+        self._thread = threading.Thread(target=self._run, name="DSPWorker", daemon=True)
+        self._thread.start()
+
+    def stop(self, timeout: float = 1.0):
+        self._stop_event.set()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout)
+        self._thread = None
+        self.frames.clear()
+
+    def is_running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def latest_frame(self) -> Optional[DSPFrame]:
+        return self.frames.latest()
+
+    def _run(self):
+        last_key = None
+        while True:
+            self._wake.wait()
+            self._wake.clear()
+            if self._stop_event.is_set():
+                break
+            try:
+                collector = self.data_collector
+                key = (collector.get_sample_count(), collector.get_config().generation, self.stages)
+                if key != last_key:
+                    frame = self.compute_frame()
+                    if frame is not None:
+                        self.frames.publish(frame)
+                        if self.on_frame is not None:
+                            self.on_frame(frame)
+                    last_key = key
+            except Exception as e:
+                self.logger.error(f"DSP worker pass failed: {e}")
+
+    def compute_frame(self) -> Optional[DSPFrame]:
+        """Run one processing pass; also usable synchronously when no thread is running."""
+        collector = self.data_collector
+        stages = self.stages
+        if not collector.board_on or not stages:
+            return None
+        sample_index = collector.get_sample_count()
+        generation = collector.get_config().generation
+        # The collector hands out pooled buffers that later passes (and the recorder)
+        # overwrite; the frame gets its own copies so a plot can draw it meanwhile
+        window, window_index, filtered = None, 0, None
+        if "window" in stages:
+            window, window_index = collector.get_indexed_filtered_array(collector.nump_muV)
+            window = window.copy()
+            filtered = {ch: window[idx] for idx, ch in enumerate(collector.eeg_channels)}
+        fft = collector.collect_data_FFT() if "fft" in stages else None
+        if fft is not None:
+            fft = (fft[0], fft[1].copy())
+        psd = collector.collect_data_PSD() if "psd" in stages else None
+        if psd is not None:
+            psd = (psd[0], psd[1].copy())
+        bands = collector.collect_band_powers() if "bands" in stages else None
+        if "spectrogram" in stages and not stages & {"psd", "bands"}:
+            collector.update_welch()
+        self._version += 1
+        return DSPFrame(self._version, sample_index, generation, filtered, window, window_index,
+                        fft, psd, bands, time.time())
@@ -0,0 +1,113 @@
+from functools import lru_cache
+import numpy as np
+import scipy.signal as signal_lib
+
+
+def _butter_sos(order, cutoff, btype, fs):
+    """Butterworth SOS, or None when the cutoff does not fit below Nyquist."""
+    nyq = fs / 2.0
+    cutoffs = np.atleast_1d(cutoff)
+    if np.any(cutoffs <= 0) or np.any(cutoffs >= nyq):
+        return None
+    return signal_lib.butter(order, cutoff, btype=btype, fs=fs, output='sos')
+
+
+class FilterBank:
+    """
+    Precomputed filter designs for one preprocessing configuration.
+
+    Band-pass slots follow the GUI rules (both ⇒ band-pass, blank/zero start ⇒
+    low-pass, blank/zero end ⇒ high-pass); band-stop slots mirror them. Each slot
+    becomes an ("sos", matrix) or ("fir", taps) stage, and the whole chain is also
+    available as one cascaded SOS matrix plus one combined FIR for streaming use.
+    IIR stages are the Butterworth filters BrainFlow's perform_bandpass/bandstop/
+    lowpass/highpass (FilterTypes.BUTTERWORTH) apply, which give the same output.
+    """
+
+    def __init__(self, sampling_rate, fir_iir, fir_window, bandpass, bandstop, order=4, numtaps=101):
+        self.sampling_rate = sampling_rate
+        fs = sampling_rate
+
+        # Mains hum as BrainFlow's remove_environmental_noise(FIFTY_AND_SIXTY) applies
+        # it: a 48-52 Hz band-stop run forward-backward, then a causal 58-62 Hz one
+        # (both 4th order Butterworth, whatever `order` the slots use)
+        self.notch_stages = []
+        for kind, band in (("zero_phase", [48.0, 52.0]), ("sos", [58.0, 62.0])):
+            sos = _butter_sos(4, band, 'bandstop', fs)
+            if sos is not None:
+                self.notch_stages.append((kind, sos))
+
+        self.bandpass_stages = []
+        for start, end in bandpass:
+            if start and end and start < end:
+                cutoff, btype, pass_zero = [start, end], 'bandpass', False
+            elif end and (not start or start <= 0):
+                cutoff, btype, pass_zero = end, 'lowpass', True
+            elif start and (not end or end <= 0):
+                cutoff, btype, pass_zero = start, 'highpass', False
+            else:
+                continue  # invalid combination → skip
+            try:
+                if fir_iir == "FIR":
+                    taps = signal_lib.firwin(numtaps=numtaps, cutoff=cutoff, pass_zero=pass_zero,
+                                             window=fir_window, fs=fs)
+                    self.bandpass_stages.append(("fir", taps))
+                else:
+                    sos = _butter_sos(order, cutoff, btype, fs)
+                    if sos is not None:
+                        self.bandpass_stages.append(("sos", sos))
+            except Exception:
+                # Skip slot on design failure rather than raising
+                pass
+
+        self.bandstop_stages = []
+        for start, end in bandstop:
+            if start and end and start < end:
+                sos = _butter_sos(order, [start, end], 'bandstop', fs)
+            elif end and (not start or start <= 0):
+                sos = _butter_sos(order, end, 'highpass', fs)
+            elif start and (not end or end <= 0):
+                sos = _butter_sos(order, start, 'lowpass', fs)
+            else:
+                continue
+            if sos is not None:
+                self.bandstop_stages.append(sos)
+
+        # Whole chain as one SOS cascade + one FIR for the streaming filter. A causal
+        # chain cannot run forward-backward, so causal_sos has the zero-phase notch
+        # twice instead (the same magnitude response, with phase delay)
+        sos_list = [sos for kind, sos in self.notch_stages]
+        sos_list += [coeffs for kind, coeffs in self.bandpass_stages if kind == "sos"]
+        sos_list += self.bandstop_stages
+        self.sos = np.vstack(sos_list) if sos_list else None
+        zero_phase = [sos for kind, sos in self.notch_stages if kind == "zero_phase"]
+        self.causal_sos = np.vstack(zero_phase + sos_list) if sos_list else None
+        fir = None
+        for kind, taps in self.bandpass_stages:
+            if kind == "fir":
+                fir = taps if fir is None else np.convolve(fir, taps)
+        self.fir = fir
+
+
+def sosfilt_forward_backward(sos, signal):
+    """
+    Zero-phase SOS filtering along the last axis the way BrainFlow's *_ZERO_PHASE
+    filters do it: a forward pass from zero state, then a backward pass that
+    continues from the forward pass's final state (no padding, unlike sosfiltfilt).
+    """
+    zi = np.zeros((sos.shape[0],) + signal.shape[:-1] + (2,))
+    forward, state = signal_lib.sosfilt(sos, signal, axis=-1, zi=zi)
+    backward, _ = signal_lib.sosfilt(sos, forward[..., ::-1], axis=-1, zi=state)
+    return backward[..., ::-1]
+
+
+@lru_cache(maxsize=16)
+def get_filter_bank(sampling_rate, fir_iir, fir_window, bandpass, bandstop, order=4, numtaps=101) -> FilterBank:
+    """FilterBank for a configuration, designed once and cached by its settings."""
+    return FilterBank(sampling_rate, fir_iir, fir_window, bandpass, bandstop, order, numtaps)
+
+
+def filter_bank_for(config, sampling_rate, order=4, numtaps=101) -> FilterBank:
+    """Cached FilterBank for a PreprocessingConfig snapshot."""
+    return get_filter_bank(sampling_rate, config.fir_iir, config.fir_window,
+                           config.bandpass, config.bandstop, order, numtaps)
@@ -3,6 +3,7 @@ import time
 import logging
 from enum import Enum
 from typing import Optional, List, Dict, Any
+from PyQt5.QtCore import QObject, pyqtSignal
 
 # Try to import sklearn FastICA, fallback to scipy if not available
 try:
@@ -19,6 +20,16 @@ class ICAState(Enum):
     CALIBRATING = "CALIBRATING"
     ACTIVE = "ACTIVE"
 
+class _ICAWidgetBridge(QObject):
+    """
+    Forwards widget updates to the GUI thread. process_data runs on the DSP
+    worker thread, so it must never touch the status bar or checkbox directly;
+    queued signals deliver the update on the thread that owns the widgets.
+    """
+    status_changed = pyqtSignal(str)
+    uncheck_requested = pyqtSignal()
+
+
 class ICAManager:
     """
     Simple ICA manager for basic EEG artifact removal.
@@ -30,6 +41,16 @@ class ICAManager:
         self.fast_ica_checkbox = fast_ica_checkbox
         self.ica_calib_spinbox = ica_calib_spinbox
         self.channel_dial = channel_dial  # Add channel dial reference
+
+        # Widget values cached on the GUI thread so process_data never reads widgets
+        self.active_channel_count = channel_dial.value()
+        self.calibration_seconds = 8
+        channel_dial.valueChanged.connect(self._on_channel_count_changed)
+        ica_calib_spinbox.valueChanged.connect(self._on_calibration_seconds_changed)
+
+        self._widgets = _ICAWidgetBridge()
+        self._widgets.status_changed.connect(self._set_status_text)
+        self._widgets.uncheck_requested.connect(lambda: self.fast_ica_checkbox.setChecked(False))
         
         # State management
         self.state = ICAState.OFF
@@ -52,13 +73,23 @@ class ICAManager:
         """Setup UI controls"""
         self.ica_calib_spinbox.setRange(3, 30)
         self.ica_calib_spinbox.setValue(8)
+        self.calibration_seconds = self.ica_calib_spinbox.value()
         
         # Start with checkbox disabled and unchecked
         self.fast_ica_checkbox.setEnabled(False)
         self.fast_ica_checkbox.setChecked(False)
     
+    def _on_channel_count_changed(self, value):
+        self.active_channel_count = value
+
+    def _on_calibration_seconds_changed(self, value):
+        self.calibration_seconds = value
+
     def _update_status(self, message: str):
-        """Update the status bar"""
+        """Update the status bar (safe from any thread)"""
+        self._widgets.status_changed.emit(message)
+
+    def _set_status_text(self, message: str):
         if self.status_bar and message:
             self.status_bar.setText(message)
             self.status_bar.repaint()
@@ -99,7 +130,7 @@ class ICAManager:
             return False
         
         # Get active channel count from the dial
-        channel_count = self.channel_dial.value()
+        channel_count = self.active_channel_count
         
         return channel_count >= self.min_channels
     
@@ -111,7 +142,7 @@ class ICAManager:
         self.ica_model = None
         
         # Always uncheck when disabling
-        self.fast_ica_checkbox.setChecked(False)
+        self._widgets.uncheck_requested.emit()
         
         # Clear status
         self._update_status("")
@@ -132,69 +163,61 @@ class ICAManager:
         self.state = ICAState.ACTIVE
         
         # Update status with active channel count from dial
-        active_channel_count = self.channel_dial.value()
+        active_channel_count = self.active_channel_count
         self._update_status(f"ICA: Running ({active_channel_count} channels)")
         self.logger.info(f"ICA entered ACTIVE state with {active_channel_count} channels")
     
     def process_data(self, preprocessed_data: Dict[int, np.ndarray]) -> Dict[int, np.ndarray]:
-        """Process data through ICA pipeline"""
+        """Process {channel: samples} data through the ICA pipeline (see process_array)"""
         if self.state == ICAState.OFF:
             return preprocessed_data
+
+        channels = list(preprocessed_data.keys())
+        min_length = min(len(data) for data in preprocessed_data.values())
+        block = np.array([preprocessed_data[ch][-min_length:] for ch in channels], dtype=float)
+        block = self.process_array(block, {ch: row for row, ch in enumerate(channels)})
+        return {ch: block[row] for row, ch in enumerate(channels)}
+
+    def process_array(self, data: np.ndarray, channel_index: Dict[int, int]) -> np.ndarray:
+        """
+        Process a (n_channels, n_samples) block through the ICA pipeline in place.
+        `channel_index` maps board channel numbers to rows of `data`; only the
+        active channels (1 to the dial value) are touched.
+        """
+        if self.state == ICAState.OFF:
+            return data
         
         # Get active channel count from the dial
-        active_channel_count = self.channel_dial.value()
+        active_channel_count = self.active_channel_count
         
         if active_channel_count < self.min_channels:
             if self.state != ICAState.OFF:
                 self._enter_off_state()
-            return preprocessed_data
+            return data
         
         # Only process the active channels (1 to active_channel_count)
-        active_channels = list(range(1, active_channel_count + 1))
-        
-        # Create output with all channels preserved
-        output_data = preprocessed_data.copy()
+        rows = [channel_index[ch] for ch in range(1, active_channel_count + 1) if ch in channel_index]
+        if not rows:
+            return data
         
         if self.state == ICAState.CALIBRATING:
             # During calibration, only collect data from active channels
-            self._handle_calibration(preprocessed_data, active_channels)
-            return output_data
+            self._handle_calibration(data[rows])
         elif self.state == ICAState.ACTIVE:
             # Apply ICA only to active channels, preserve others unchanged
-            processed_active = self._apply_ica(preprocessed_data, active_channels)
-            
-            # Update only the active channels in output
-            for ch in active_channels:
-                if ch in processed_active:
-                    output_data[ch] = processed_active[ch]
-            
-            return output_data
+            cleaned = self._apply_ica(data[rows])
+            if cleaned is not None:
+                data[rows] = cleaned
         
-        return output_data
+        return data
     
-    def _handle_calibration(self, preprocessed_data: Dict[int, np.ndarray], active_channels: List[int]):
+    def _handle_calibration(self, data_matrix: np.ndarray):
         """Handle data during calibration phase"""
-        # Extract data for active channels
-        data_matrix = []
-        for ch in active_channels:
-            if ch in preprocessed_data:
-                data_matrix.append(preprocessed_data[ch])
-        
-        if not data_matrix:
-            return
-        
-        # Ensure all channels have the same length
-        min_length = min(len(data) for data in data_matrix)
-        data_matrix = [data[:min_length] for data in data_matrix]
-        
-        # Convert to numpy array
-        data_matrix = np.array(data_matrix)
-        
-        # Add to calibration buffer
+        # Add to calibration buffer (data_matrix is already a copy of the active rows)
         self.calibration_buffer.append(data_matrix)
         
         # Check if we have enough calibration data
-        calibration_duration = self.ica_calib_spinbox.value()
+        calibration_duration = self.calibration_seconds
         if time.time() - self.calibration_start_time >= calibration_duration:
             self._fit_ica()
             self._enter_active_state()
@@ -251,32 +274,16 @@ class ICAManager:
             # If ICA fails, disable it
             self._enter_off_state()
     
-    def _apply_ica(self, preprocessed_data: Dict[int, np.ndarray], active_channels: List[int]) -> Dict[int, np.ndarray]:
-        """Apply ICA to new data"""
+    def _apply_ica(self, stacked_data: np.ndarray) -> Optional[np.ndarray]:
+        """Apply ICA to a (n_active, n_samples) block; None when nothing changes"""
         if self.ica_model is None:
-            return preprocessed_data
+            return None
         
         try:
-            # Extract data for active channels
-            data_matrix = []
-            for ch in active_channels:
-                if ch in preprocessed_data:
-                    data_matrix.append(preprocessed_data[ch])
-            
-            if not data_matrix:
-                return preprocessed_data
-            
-            # Ensure all channels have the same length
-            min_length = min(len(data) for data in data_matrix)
-            data_matrix = [data[:min_length] for data in data_matrix]
-            
-            # Stack data: (n_channels, n_samples)
-            stacked_data = np.array(data_matrix)
-            
             # Remove any NaN values
             valid_mask = np.all(np.isfinite(stacked_data), axis=0)
             if not np.any(valid_mask):
-                return preprocessed_data
+                return None
                 
             data_for_ica = stacked_data[:, valid_mask]
             
@@ -289,35 +296,20 @@ class ICAManager:
             # Simple artifact removal - zero out components with high kurtosis
             cleaned_components = self._remove_bad_components(components)
             
-            # Transform back to channel space
-            cleaned_data = self.ica_model.inverse_transform(cleaned_components)
-            
-            # Transpose back to (n_channels, n_samples)
-            cleaned_data = cleaned_data.T
+            # Transform back to channel space: (n_channels, n_samples)
+            cleaned_data = self.ica_model.inverse_transform(cleaned_components).T
             
-            # Update the processed data
-            result_data = {}
-            for i, ch in enumerate(active_channels):
-                if i < cleaned_data.shape[0]:
-                    # Ensure output has same length as input
-                    if len(cleaned_data[i]) == len(preprocessed_data[ch]):
-                        result_data[ch] = cleaned_data[i]
-                    else:
-                        # Pad or truncate to match input length
-                        if len(cleaned_data[i]) < len(preprocessed_data[ch]):
-                            padded = np.zeros(len(preprocessed_data[ch]))
-                            padded[:len(cleaned_data[i])] = cleaned_data[i]
-                            result_data[ch] = padded
-                        else:
-                            result_data[ch] = cleaned_data[i][:len(preprocessed_data[ch])]
-                else:
-                    result_data[ch] = preprocessed_data[ch]
+            # Ensure output has same length as input (pad with zeros when NaNs were dropped)
+            if cleaned_data.shape[1] != stacked_data.shape[1]:
+                padded = np.zeros(stacked_data.shape)
+                padded[:, :cleaned_data.shape[1]] = cleaned_data
+                cleaned_data = padded
             
-            return result_data
+            return cleaned_data
             
         except Exception as e:
             self.logger.error(f"ICA application failed: {e}")
-            return preprocessed_data
+            return None
     
     def _remove_bad_components(self, components: np.ndarray) -> np.ndarray:
         """Remove bad components based on kurtosis - simple approach"""
@@ -386,7 +378,7 @@ class ICAManager:
         elif self.state == ICAState.CALIBRATING:
             return "ICA: Calibrating..."
         elif self.state == ICAState.ACTIVE:
-            active_channel_count = self.channel_dial.value()
+            active_channel_count = self.active_channel_count
             return f"ICA: Running ({active_channel_count} channels)"
         return ""
 
@@ -0,0 +1,133 @@
+from dataclasses import dataclass, field, replace
+from typing import Optional, Tuple
+from PyQt5.QtCore import QObject, pyqtSignal
+
+Band = Tuple[Optional[float], Optional[float]]
+
+
+def _parse_band(raw_start, raw_end) -> Band:
+    """Parse a start/end QLineEdit pair into floats (None for blank/invalid)."""
+    try:
+        start = float(raw_start) if raw_start else None
+    except ValueError:
+        start = None
+    try:
+        end = float(raw_end) if raw_end else None
+    except ValueError:
+        end = None
+    return start, end
+
+
+@dataclass(frozen=True)
+class PreprocessingConfig:
+    """
+    Immutable, hashable snapshot of every preprocessing control.
+
+    The DSP pipeline reads only this object, never the Qt widgets, so it can run
+    off the GUI thread. `generation` increases with every published change and is
+    excluded from equality/hashing, so two snapshots with the same settings
+    compare equal regardless of when they were taken.
+    """
+    fir_iir: str = "IIR"                 # "IIR" | "FIR"
+    fir_window: object = "hamming"       # scipy window spec, e.g. "hamming" or ("kaiser", 8.0)
+    bandpass: Tuple[Band, ...] = ()      # () when band-pass is off
+    bandstop: Tuple[Band, ...] = ()      # () when band-stop is off
+    detrend: bool = False
+    fast_ica: bool = False
+    ica_calib_secs: int = 8
+    average: bool = False
+    median: bool = False
+    window: int = 0
+    generation: int = field(default=0, compare=False)
+
+    @property
+    def smoothing(self) -> bool:
+        return self.average or self.median
+
+    def filter_key(self):
+        """The part of the config that determines the filter designs and their state."""
+        return self.fir_iir, self.fir_window, self.bandpass, self.bandstop
+
+    @classmethod
+    def from_controls(cls, controls, generation: int = 0) -> "PreprocessingConfig":
+        """Read the preprocessing widget dict once (GUI thread only)."""
+        try:
+            mode = controls["BPTypeFIR_IIR"].currentText().strip().upper()
+        except Exception:
+            mode = "IIR"
+        window = "hamming"
+        if mode == "FIR":
+            try:
+                window = controls["FIRWindowType"].currentData() or "hamming"
+            except Exception:
+                window = "hamming"
+
+        bandpass = ()
+        if controls["BandPassOnOff"].isChecked():
+            bandpass = tuple(
+                _parse_band(controls[f"BP{i}Start"].text().strip(), controls[f"BP{i}End"].text().strip())
+                for i in range(1, controls["NumberBandPass"].value() + 1)
+            )
+        bandstop = ()
+        if controls["BandStopOnOff"].isChecked():
+            bandstop = tuple(
+                _parse_band(controls[f"BStop{i}Start"].text().strip(), controls[f"BStop{i}End"].text().strip())
+                for i in range(1, controls["NumberBandStop"].value() + 1)
+            )
+
+        return cls(
+            fir_iir=mode,
+            fir_window=window,
+            bandpass=bandpass,
+            bandstop=bandstop,
+            detrend=controls["DetrendOnOff"].isChecked(),
+            fast_ica=controls["FastICA"].isChecked(),
+            ica_calib_secs=controls["ICACalibSecs"].value(),
+            average=controls["Average"].isChecked(),
+            median=controls["Median"].isChecked(),
+            window=controls["Window"].value(),
+            generation=generation,
+        )
+
+
+class PreprocessingConfigPublisher(QObject):
+    """
+    Watches the preprocessing widgets and publishes a new PreprocessingConfig
+    (with the next generation number) whenever any of them changes.
+
+    `config` is a plain attribute swap, so any thread may read it without locking.
+    """
+    config_changed = pyqtSignal(object)  # PreprocessingConfig
+
+    def __init__(self, controls, parent=None):
+        super().__init__(parent)
+        self.controls = controls
+        self._config = PreprocessingConfig.from_controls(controls)
+        self._connect_widgets()
+
+    @property
+    def config(self) -> PreprocessingConfig:
+        return self._config
+
+    @property
+    def generation(self) -> int:
+        return self._config.generation
+
+    def _connect_widgets(self):
+        for widget in self.controls.values():
+            if widget is None:
+                continue
+            # Pick the first change signal the widget type provides
+            for signal_name in ("toggled", "valueChanged", "currentIndexChanged", "textChanged"):
+                signal = getattr(widget, signal_name, None)
+                if signal is not None:
+                    signal.connect(self.publish)
+                    break
+
+    def publish(self, *args):
+        """Re-read the widgets; bump the generation and notify only if something changed."""
+        new_config = PreprocessingConfig.from_controls(self.controls, self._config.generation)
+        if new_config == self._config:
+            return
+        self._config = replace(new_config, generation=self._config.generation + 1)
+        self.config_changed.emit(self._config)
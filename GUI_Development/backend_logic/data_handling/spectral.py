@@ -0,0 +1,323 @@
+import numpy as np
+from scipy.signal import windows
+from mindstream_shared.ring_buffer import SampleRingBuffer
+
+
+class SpectralEngine:
+    """
+    Hamming-windowed amplitude spectrum of all channels, as one (n_ch, n_bins) frame.
+
+    A full spectrum is one batched rfft over every channel (axis=-1) with a cached
+    window and frequency array, and is recomputed only once `hop_samples` new
+    samples have arrived (or when the caller's key, e.g. the config generation,
+    changes); in between, the cached frame is returned to every consumer.
+
+    Sliding-DFT mode (`sliding_bins`) additionally updates the selected bins on
+    every sample: X_k ← (X_k − x_out + x_in)·e^{j2πk/N}, with the Hamming window
+    applied in the frequency domain (0.54·X_k − 0.23·(X_{k−1} + X_{k+1})). That
+    identity holds for the periodic Hamming window, so sliding mode uses it for
+    the whole frame, and it is exact only while each window is the previous one
+    shifted by the new samples (no detrend/smoothing/ICA rewriting the past).
+    The sliding state is resynchronised with a full rfft every `resync_every`
+    samples to bound rounding drift.
+    """
+
+    def __init__(self, sampling_rate, nfft, hop_samples=1, sliding_bins=None, resync_every=None):
+        self.sampling_rate = sampling_rate
+        self.nfft = int(nfft)
+        self.hop_samples = max(1, int(hop_samples))
+        self.freqs = np.fft.rfftfreq(self.nfft, d=1.0 / sampling_rate)
+
+        self.sliding_bins = None
+        if sliding_bins is not None:
+            # Bins 0 and N/2 have a neighbour outside the one-sided spectrum; skip them
+            bins = sorted({int(k) for k in sliding_bins if 0 < int(k) < self.nfft // 2})
+            self.sliding_bins = np.asarray(bins, dtype=int) if bins else None
+        self.window = windows.hamming(self.nfft, sym=self.sliding_bins is None)
+        self.resync_every = int(resync_every or self.nfft)
+
+        self.version = 0           # Bumped whenever the amplitudes change
+        self._amplitudes = None
+        self._scratch = None
+        self._last_index = None    # Sample index of the newest sample in the frame
+        self._last_full = None     # Sample index of the last full rfft
+        self._last_key = None
+
+        # Sliding-DFT state: raw DFT of bins k-1, k, k+1 for every selected bin
+        if self.sliding_bins is not None:
+            self._dft_bins = np.unique(np.concatenate((self.sliding_bins - 1, self.sliding_bins, self.sliding_bins + 1)))
+            lookup = {k: i for i, k in enumerate(self._dft_bins)}
+            self._centre = np.array([lookup[k] for k in self.sliding_bins])
+            self._below = np.array([lookup[k - 1] for k in self.sliding_bins])
+            self._above = np.array([lookup[k + 1] for k in self.sliding_bins])
+            self._twiddle = np.exp(2j * np.pi * self._dft_bins / self.nfft)
+        self._dft = None
+        self._previous = None      # Copy of the last window, for the samples leaving it
+
+    def invalidate(self):
+        self._last_index = None
+
+    def compute(self, data, sample_index, key=None, allow_sliding=True):
+        """
+        Spectrum of the newest `nfft` samples of `data` (n_ch, >= nfft) whose newest
+        sample has absolute index `sample_index`. Returns (freqs, amplitudes); the
+        amplitude array is owned by the engine and rewritten on later updates.
+        """
+        segment = data[:, -self.nfft:]
+        new = None
+        if (self._last_index is not None and key == self._last_key
+                and self._amplitudes.shape[0] == segment.shape[0]):
+            new = sample_index - self._last_index
+        if new == 0 or (new is not None and new < 0):
+            return self.freqs, self._amplitudes
+
+        sliding = self.sliding_bins is not None and allow_sliding and self._dft is not None
+        if new is None or sample_index - self._last_full >= self.hop_samples:
+            if not sliding or new is None or sample_index - self._last_full >= self.resync_every:
+                self._full(segment)
+                self._last_full = sample_index
+                self._last_key = key
+                self._last_index = sample_index
+                return self.freqs, self._amplitudes
+            # Refresh the non-sliding bins at the hop, keep the running DFT
+            self._windowed_rfft(segment)
+            self._last_full = sample_index
+
+        if sliding and new is not None and new < self.nfft:
+            self._slide(segment, new)
+        self._last_index = sample_index
+        return self.freqs, self._amplitudes
+
+    def _windowed_rfft(self, segment):
+        self.version += 1
+        if self._scratch is None or self._scratch.shape != segment.shape:
+            self._scratch = np.empty(segment.shape)
+            self._amplitudes = np.empty((segment.shape[0], len(self.freqs)))
+        np.multiply(segment, self.window, out=self._scratch)
+        np.abs(np.fft.rfft(self._scratch, axis=-1), out=self._amplitudes)
+
+    def _full(self, segment):
+        self._windowed_rfft(segment)
+        if self.sliding_bins is not None:
+            self._dft = np.fft.rfft(segment, axis=-1)[:, self._dft_bins]
+            if self._previous is None or self._previous.shape != segment.shape:
+                self._previous = np.empty(segment.shape)
+            np.copyto(self._previous, segment)
+
+    def _slide(self, segment, new):
+        dft = self._dft
+        leaving = self._previous[:, :new]
+        entering = segment[:, -new:]
+        for j in range(new):
+            dft += (entering[:, j] - leaving[:, j])[:, None]
+            dft *= self._twiddle
+        np.copyto(self._previous, segment)
+        self.version += 1
+        windowed = 0.54 * dft[:, self._centre] - 0.23 * (dft[:, self._below] + dft[:, self._above])
+        self._amplitudes[:, self.sliding_bins] = np.abs(windowed)
+
+
+class WelchEngine:
+    """
+    Running Welch PSD of all channels, as one (n_ch, n_bins) frame.
+
+    Segments of `nperseg` samples start every `nperseg - noverlap` samples on a
+    grid of absolute sample indices. Each segment's periodogram (constant detrend,
+    Hamming window, one-sided density scaling as scipy.signal.welch) is computed
+    once, in a batch over every channel and every segment completed since the last
+    call, and kept in a ring of the newest `n_segments`. The PSD is the running
+    mean of that ring: the newest segment is added and the oldest dropped, so the
+    averaging span (nperseg + (n_segments - 1) * step samples) can grow without
+    the per-update cost growing with it.
+
+    With `history_columns`, every new segment is also appended, in dB, as one
+    column of a (n_ch * n_bins, history_columns) SampleRingBuffer: a rolling
+    spectrogram that costs nothing beyond the periodograms already computed.
+    """
+
+    def __init__(self, sampling_rate, nperseg, n_segments=8, noverlap=None, history_columns=0):
+        self.sampling_rate = sampling_rate
+        self.nperseg = int(nperseg)
+        self.n_segments = max(1, int(n_segments))
+        self.noverlap = self.nperseg // 2 if noverlap is None else int(noverlap)
+        self.step = max(1, self.nperseg - self.noverlap)
+        self.span = self.nperseg + (self.n_segments - 1) * self.step
+        self.freqs = np.fft.rfftfreq(self.nperseg, d=1.0 / sampling_rate)
+
+        self.window = windows.hamming(self.nperseg)
+        # One-sided density: 1 / (fs * sum(w²)), doubled except at DC (and Nyquist)
+        scale = np.full(len(self.freqs), 2.0 / (sampling_rate * np.sum(self.window ** 2)))
+        scale[0] /= 2
+        if self.nperseg % 2 == 0:
+            scale[-1] /= 2
+        self._scale = scale
+
+        self.version = 0           # Bumped whenever the PSD changes
+        self._ring = None          # (n_segments, n_ch, n_bins) segment periodograms
+        self._sum = None
+        self._psd = None
+        self._head = 0             # Ring slot the next segment is written to
+        self._count = 0            # Segments currently in the ring
+        self._last_end = None      # Absolute end index of the newest segment
+        self._last_key = None
+
+        self.history_columns = int(history_columns)
+        self.history = None        # SampleRingBuffer of dB columns, row = channel * n_bins + bin
+
+    def invalidate(self):
+        self._last_end = None
+
+    @property
+    def last_index(self):
+        """Absolute index one past the newest sample in the averaged segments."""
+        return self._last_end if self._last_end is not None else 0
+
+    def compute(self, data, sample_index, key=None):
+        """
+        PSD of `data` (n_ch, n) whose newest sample has absolute index `sample_index`
+        (one past it). Returns (freqs, psd), or None before the first full segment;
+        the psd array is owned by the engine and rewritten on later updates.
+        """
+        n_ch, n = data.shape
+        if (self._last_end is None or key != self._last_key
+                or self._ring.shape[1] != n_ch or sample_index < self._last_end):
+            self._reset(n_ch, key)
+        elif sample_index - n + self.nperseg > self._last_end + self.step:
+            self._reset(n_ch, key)  # Gap: the next segment is no longer inside `data`
+
+        # Segment ends on the step grid that are complete and still inside `data`
+        newest_end = sample_index - sample_index % self.step
+        oldest_end = max(sample_index - n + self.nperseg, newest_end - (self.n_segments - 1) * self.step)
+        if self._last_end is not None:
+            oldest_end = max(oldest_end, self._last_end + self.step)
+        first = -(-oldest_end // self.step) * self.step
+        ends = np.arange(first, newest_end + 1, self.step)
+        if len(ends):
+            self._add(data, ends - (sample_index - n))
+            self._last_end = int(ends[-1])
+        if self._count == 0:
+            return None
+        return self.freqs, self._psd
+
+    def _reset(self, n_ch, key):
+        n_bins = len(self.freqs)
+        if self._ring is None or self._ring.shape[1] != n_ch:
+            self._ring = np.empty((self.n_segments, n_ch, n_bins))
+            self._sum = np.empty((n_ch, n_bins))
+            self._psd = np.empty((n_ch, n_bins))
+            if self.history_columns:
+                self.history = SampleRingBuffer(n_ch * n_bins, self.history_columns)
+        self._sum.fill(0.0)
+        self._head = 0
+        self._count = 0
+        self._last_end = None
+        self._last_key = key
+
+    def mean_psd(self, data, first_index):
+        """
+        Welch PSD of `data` (n_ch, n) alone, its oldest sample at absolute index
+        `first_index`: the mean periodogram of the segments on the step grid that
+        lie entirely inside it. Returns (freqs, psd), or None when no segment
+        fits. The running PSD is left untouched.
+        """
+        first_end = -(-(first_index + self.nperseg) // self.step) * self.step
+        ends = np.arange(first_end, first_index + data.shape[1] + 1, self.step)
+        if not len(ends):
+            return None
+        return self.freqs, self._periodograms(data, ends - first_index).mean(axis=1)
+
+    def _periodograms(self, data, local_ends):
+        """(n_ch, n_segments, n_bins) periodograms of the segments ending at `local_ends` (indices into data)."""
+        segments = np.lib.stride_tricks.sliding_window_view(data, self.nperseg, axis=-1)
+        segments = segments[:, local_ends - self.nperseg]            # (n_ch, n_new, nperseg)
+        segments = segments - segments.mean(axis=-1, keepdims=True)
+        segments *= self.window
+        spectra = np.fft.rfft(segments, axis=-1)
+        return (spectra.real ** 2 + spectra.imag ** 2) * self._scale
+
+    def _add(self, data, local_ends):
+        """Periodograms of the segments ending at `local_ends` (indices into data), oldest first."""
+        periodograms = self._periodograms(data, local_ends)
+
+        ring = self._ring
+        for j in range(periodograms.shape[1]):
+            if self._count == self.n_segments:
+                self._sum -= ring[self._head]
+            else:
+                self._count += 1
+            ring[self._head] = periodograms[:, j]
+            self._sum += ring[self._head]
+            self._head = (self._head + 1) % self.n_segments
+            if self._head == 0:
+                # Re-sum once per lap so add/drop rounding never accumulates
+                np.sum(ring[:self._count], axis=0, out=self._sum)
+        np.divide(self._sum, self._count, out=self._psd)
+        self.version += 1
+
+        if self.history is not None:
+            columns = np.log10(periodograms + 1e-12)
+            columns *= 10.0
+            self.history.append(columns.transpose(0, 2, 1).reshape(-1, columns.shape[1]))
+
+
+class BatchSpectra:
+    """
+    The live spectra, recomputed offline over a whole recording.
+
+    Frames end every `hop_samples` samples (the first once a full window is
+    available). fft() gives the same Hamming amplitude spectrum as
+    SpectralEngine and psd() the same running Welch mean of the newest
+    `n_segments` segment periodograms as WelchEngine (segments on a
+    `nperseg - noverlap` step grid), but for many frames at once: one batched
+    rfft over every channel and frame. Callers pass the frame ends in chunks
+    to bound memory.
+    """
+
+    def __init__(self, sampling_rate, nfft, nperseg, n_segments=8, noverlap=None, hop_samples=1):
+        self.sampling_rate = sampling_rate
+        self.hop_samples = max(1, int(hop_samples))
+        self.nfft = int(nfft)
+        self.fft_freqs = np.fft.rfftfreq(self.nfft, d=1.0 / sampling_rate)
+        self._fft_window = windows.hamming(self.nfft)
+
+        # Same segment grid, window and density scaling as the live Welch engine
+        self._welch = WelchEngine(sampling_rate, nperseg, n_segments, noverlap)
+        self.psd_freqs = self._welch.freqs
+        # Samples before the first segment on the step grid is complete
+        step = self._welch.step
+        self.psd_window = -(-self._welch.nperseg // step) * step
+
+    def frame_ends(self, n_samples, window):
+        """End (exclusive sample index) of every frame of a `window`-sample spectrum."""
+        return np.arange(window, n_samples + 1, self.hop_samples)
+
+    def fft(self, data, ends):
+        """Amplitude spectra of the nfft-sample windows of `data` ending at `ends`: (n_frames, n_ch, n_bins)."""
+        framed = np.lib.stride_tricks.sliding_window_view(data, self.nfft, axis=-1)
+        segments = framed[:, np.asarray(ends) - self.nfft] * self._fft_window  # (n_ch, n_frames, nfft)
+        return np.abs(np.fft.rfft(segments, axis=-1)).transpose(1, 0, 2)
+
+    def psd(self, data, ends):
+        """Welch PSD (linear density) as of each frame end (>= psd_window): (n_frames, n_ch, n_bins)."""
+        welch = self._welch
+        ends = np.asarray(ends)
+        step, nperseg = welch.step, welch.nperseg
+        # Every segment any of these frames averages, on the step grid
+        newest = ends - ends % step
+        first = max(self.psd_window, int(newest[0]) - (welch.n_segments - 1) * step)
+        segment_ends = np.arange(first, int(newest[-1]) + 1, step)
+
+        segments = np.lib.stride_tricks.sliding_window_view(data, nperseg, axis=-1)
+        segments = segments[:, segment_ends - nperseg]                # (n_ch, n_seg, nperseg)
+        segments = segments - segments.mean(axis=-1, keepdims=True)
+        segments *= welch.window
+        spectra = np.fft.rfft(segments, axis=-1)
+        periodograms = (spectra.real ** 2 + spectra.imag ** 2) * welch._scale
+
+        # Running means from a cumulative sum over segments
+        cumulative = np.zeros((periodograms.shape[1] + 1,) + periodograms.shape[::2])
+        np.cumsum(periodograms.transpose(1, 0, 2), axis=0, out=cumulative[1:])
+        stop = (newest - first) // step + 1
+        start = np.maximum(stop - welch.n_segments, 0)
+        counts = (stop - start)[:, None, None]
+        return (cumulative[stop] - cumulative[start]) / counts
@@ -0,0 +1,163 @@
+import threading
+import numpy as np
+import scipy.signal as signal_lib
+from mindstream_shared.ring_buffer import SampleRingBuffer
+from backend_logic.data_handling.filter_bank import filter_bank_for
+from backend_logic.data_handling.data_processing import detrend_block, rolling_mean, rolling_median
+
+
+class StreamingFilterChain:
+    """
+    Causal multi-channel filter chain that only filters newly arrived samples.
+
+    The mains notch and every BP/BStop slot come from the cached FilterBank as one
+    SOS cascade (and FIR slots as one tap vector) whose state (zi) is carried
+    between updates, so each update costs O(new samples) instead of re-filtering
+    the whole window.
+    Output goes into a filtered ring buffer; detrend and smoothing are applied to
+    the requested window at read time.
+
+    Unlike the windowed path, which detrends between the notch and the BP/BStop
+    stages, detrend here runs after every filter stage: the cascade carries its
+    state across updates, so it never sees a window to fit a trend to. Each
+    linear filter maps a linear trend to a (nearly) linear trend, so removing it
+    afterwards mostly differs from the windowed path by edge transients. Also
+    unlike it, FIR slots run causally (lfilter, not filtfilt), so they add a
+    (numtaps - 1) / 2 sample group delay, and the zero-phase 50 Hz notch runs
+    forward twice: the same magnitude response, but with phase delay near 50 Hz.
+    """
+
+    def __init__(self, n_channels, sampling_rate, capacity, order=4, numtaps=101):
+        self.n_channels = int(n_channels)
+        self.sampling_rate = sampling_rate
+        self.order = order
+        self.numtaps = numtaps
+        self.filtered = SampleRingBuffer(self.n_channels, capacity)
+
+        self._filter_key = None  # PreprocessingConfig.filter_key() the state was built for
+        self._config = None
+        self._sos = None
+        self._zero_phase_sos = None
+        self._sos_zi = None
+        self._fir = None
+        self._fir_zi = None
+        self._next_index = None  # Absolute raw sample index of the next sample to filter
+        self._scratch = None     # Reused by window() for in-place post-processing
+        self._lock = threading.Lock()
+
+    def invalidate(self):
+        """Drop all filter state; the next update rebuilds and re-primes."""
+        with self._lock:
+            self._filter_key = None
+
+    @property
+    def latest_index(self):
+        """Absolute raw sample index one past the newest filtered sample."""
+        return self._next_index if self._next_index is not None else 0
+
+    def _design(self, config):
+        self._filter_key = config.filter_key()
+        bank = filter_bank_for(config, self.sampling_rate, self.order, self.numtaps)
+        self._sos = bank.causal_sos
+        self._zero_phase_sos = bank.sos
+        self._fir = bank.fir
+        self._sos_zi = None
+        self._fir_zi = None
+
+    def _filter_block(self, block):
+        """Run a (n_channels, n) raw block through the cascade, carrying state."""
+        out = block
+        if self._sos is not None:
+            if self._sos_zi is None:
+                # Start from steady state at the first sample to avoid a step transient
+                base = signal_lib.sosfilt_zi(self._sos)  # (sections, 2)
+                self._sos_zi = base[:, None, :] * block[None, :, 0, None]
+            out, self._sos_zi = signal_lib.sosfilt(self._sos, out, axis=-1, zi=self._sos_zi)
+        if self._fir is not None:
+            if self._fir_zi is None:
+                base = signal_lib.lfilter_zi(self._fir, [1.0])
+                self._fir_zi = base[None, :] * out[:, 0, None]
+            out, self._fir_zi = signal_lib.lfilter(self._fir, [1.0], out, axis=-1, zi=self._fir_zi)
+        return out
+
+    def process(self, block, config, zero_phase=False):
+        """
+        Filter a caller-supplied (n_channels, n) block with the notch/BP/BStop
+        cascade from a PreprocessingConfig snapshot, bypassing the
+        ring. Consecutive calls carry state, so a recorder can filter its raw
+        blocks causally as they arrive. With zero_phase=True the whole block is
+        filtered forward-backward instead (offline use, no state kept).
+        """
+        with self._lock:
+            if config.filter_key() != self._filter_key:
+                self._design(config)
+            block = np.asarray(block, dtype=float)
+            if not zero_phase:
+                return self._filter_block(block)
+            out = block
+            sos = self._zero_phase_sos
+            if sos is not None and out.shape[1] > 3 * (2 * sos.shape[0] + 1):
+                out = signal_lib.sosfiltfilt(sos, out, axis=-1)
+            if self._fir is not None and out.shape[1] > 3 * len(self._fir):
+                out = signal_lib.filtfilt(self._fir, [1.0], out, axis=-1)
+            return out
+
+    def update(self, source, eeg_channels, config, prime_points):
+        """
+        Filter every raw sample that arrived since the last update.
+
+        :param source: BoardAcquisition (or anything with sample_count / read / ring)
+        :param config: PreprocessingConfig snapshot; a different filter_key() rebuilds the chain
+        :param prime_points: samples re-filtered from scratch after a rebuild
+        """
+        with self._lock:
+            count = source.sample_count
+            oldest = source.ring.oldest_index
+            self._config = config
+            rebuild = (
+                config.filter_key() != self._filter_key
+                or self._next_index is None
+                or self._next_index < oldest
+                or count - self._next_index > self.filtered.capacity
+            )
+            if rebuild:
+                self._design(config)
+                self.filtered.clear()
+                self._next_index = max(oldest, count - int(prime_points))
+
+            if count <= self._next_index:
+                return
+            raw = source.read(self._next_index, count)
+            block = np.asarray(raw[eeg_channels], dtype=float)
+            self.filtered.append(self._filter_block(block))
+            self._next_index = count
+
+    def window(self, num_points, out=None):
+        """
+        Return the newest `num_points` filtered samples as (n_channels, n),
+        with detrend/smoothing from the current config applied (after the
+        filters; see the class docstring).
+
+        The samples are copied into `out` (reused when its shape matches) and all
+        post-processing runs in place, so steady-state reads allocate nothing.
+        """
+        with self._lock:
+            view = self.filtered.latest(num_points)
+            config = self._config
+            if out is None or out.shape != view.shape:
+                out = np.empty(view.shape)
+            np.copyto(out, view)
+        n = out.shape[1]
+        if config is None or n == 0:
+            return out
+        scratch = self._scratch
+        if scratch is None or scratch.shape != out.shape:
+            scratch = self._scratch = np.empty(out.shape)
+        # Same vectorized detrend/smoothing as the windowed path
+        if config.detrend:
+            detrend_block(out, scratch)
+        if config.average:
+            rolling_mean(out, config.window, scratch)
+        if config.median:
+            rolling_median(out, config.window)
+        return out
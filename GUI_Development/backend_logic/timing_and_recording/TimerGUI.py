@@ -18,9 +18,10 @@ class TimelineWidget(QWidget):
     # ─── INIT ────────────────────────────────────────────────────────────────
     def __init__(self, recordButton, stopButton,
                  beforeOnset, afterOnset,
-                 buffer, numTrials, status_bar, timing_engine=None):
+                 buffer, numTrials, status_bar, timing_engine=None, render_scheduler=None):
         super().__init__()
         self.timing_engine = timing_engine
+        self.render_scheduler = render_scheduler
         # Make the whole widget transparent
         self.setAttribute(Qt.WA_TranslucentBackground)
         self.setStyleSheet("background: transparent; border: none;")
@@ -98,10 +99,15 @@ class TimelineWidget(QWidget):
         self.view.setHorizontalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
         self.view.setVerticalScrollBarPolicy(Qt.ScrollBarAlwaysOff)
 
-        # Precise update: subscribe to engine tick if available; fallback to local timer
+        # Precise update: subscribe to engine tick if available; fallback to local timer.
+        # With a render scheduler the bars redraw once per display frame instead of every 8 ms tick
         if self.timing_engine:
             try:
-                self.timing_engine.tick_8ms.connect(lambda now_ms, sched_ms: self.update_progress(self.status_bar))
+                if self.render_scheduler is not None:
+                    self.render_scheduler.add("timeline", lambda: self.update_progress(self.status_bar),
+                                              visible=lambda: self.timing_engine.run_active, continuous=True)
+                else:
+                    self.timing_engine.tick_8ms.connect(lambda now_ms, sched_ms: self.update_progress(self.status_bar))
                 self.timing_engine.state_changed.connect(self.on_engine_state_changed)
                 self.timing_engine.phase_changed.connect(self.on_engine_phase_changed)
                 self.timing_engine.run_completed.connect(self.on_engine_run_completed)
@@ -21,9 +21,10 @@ class BlackScreenTimerWindow(QDialog):
       - '🛑' stop when active run or recording
     """
 
-    def __init__(self, timing_engine, before_spinbox=None, timeline_widget=None, parent=None):
+    def __init__(self, timing_engine, before_spinbox=None, timeline_widget=None, parent=None, render_scheduler=None):
         super().__init__(parent)
         self.engine = timing_engine
+        self.render_scheduler = render_scheduler
         self.before_spinbox = before_spinbox
         self.timeline_widget = timeline_widget
 
@@ -265,7 +266,12 @@ class BlackScreenTimerWindow(QDialog):
 
     def _wire_engine(self):
         try:
-            self.engine.tick_8ms.connect(self._on_tick)
+            # Cue updates once per display frame; essential, so never skipped for a frame budget
+            if self.render_scheduler is not None:
+                self.render_scheduler.add("black_screen_cue", lambda: self._on_tick(0, 0),
+                                          visible=self.isVisible, continuous=True, essential=True)
+            else:
+                self.engine.tick_8ms.connect(self._on_tick)
             self.engine.phase_changed.connect(self._on_phase_changed)
             self.engine.run_completed.connect(self._on_run_completed)
             self.engine.trial_started.connect(self._on_trial_started)
@@ -345,7 +351,10 @@ class BlackScreenTimerWindow(QDialog):
 
         # Disconnect signals
         try:
-            self.engine.tick_8ms.disconnect(self._on_tick)
+            if self.render_scheduler is not None:
+                self.render_scheduler.remove("black_screen_cue")
+            else:
+                self.engine.tick_8ms.disconnect(self._on_tick)
             self.engine.phase_changed.disconnect(self._on_phase_changed)
             self.engine.run_completed.disconnect(self._on_run_completed)
             self.engine.trial_started.disconnect(self._on_trial_started)
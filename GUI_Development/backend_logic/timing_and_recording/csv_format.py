@@ -0,0 +1,127 @@
+import numpy as np
+
+_INT_DIGITS = 15                  # Integer part handled by the fast path: |v| < 1e15
+# Zero-padded digits of every 5-digit group: one gather turns 5 digits into characters
+_GROUP = 100000
+_GROUP_DIGITS = np.array([list(f"{i:05d}".encode("ascii")) for i in range(_GROUP)], dtype=np.uint8)
+
+
+def _digit_columns(numbers, n_digits):
+    """
+    (len(numbers), n_digits) zero-padded ASCII digits of non-negative integers
+    given as float64 (exact below 2**53); 5-digit groups are split off with
+    float division, which is exact here and much cheaper than int64 division.
+    """
+    n_groups = -(-n_digits // 5)
+    out = np.empty((numbers.size, 5 * n_groups), dtype=np.uint8)
+    rest = numbers
+    for g in range(n_groups - 1, 0, -1):
+        high = np.floor(rest / _GROUP)
+        out[:, 5 * g:5 * g + 5] = _GROUP_DIGITS[(rest - high * _GROUP).astype(np.int32)]
+        rest = high
+    out[:, :5] = _GROUP_DIGITS[rest.astype(np.int32)]
+    return out[:, 5 * n_groups - n_digits:]
+
+
+def format_fixed_rows(rows, decimals=10, flags=None, flag_col=None, flag_prefix="B - ", flag_column=False):
+    """
+    CSV text of a (n_rows, n_cols) float block, every value as '%.{decimals}f'
+    and comma separated, one line per row. Rows whose `flags` entry is set get
+    `flag_prefix` in front of column `flag_col`; with `flag_column` the flags
+    are instead written as an extra last column of 0/1 (and `flag_col` is not
+    touched).
+
+    Byte-for-byte what per-value %-formatting gives, but built with array
+    operations: each value's sign, integer digits, point and fraction digits
+    are written into a fixed-width character grid (digits five at a time from
+    a lookup table) and the unused positions (leading zeros, '+' signs) are
+    dropped with one boolean mask. Values the grid cannot represent exactly
+    (NaN/inf, |v| >= 1e15, and fractions within rounding noise of a tie) are
+    formatted by Python and spliced into their rows.
+    """
+    rows = np.asarray(rows, dtype=np.float64)
+    n_rows, n_cols = rows.shape
+    if n_rows == 0 or n_cols == 0:
+        return "\n" * n_rows
+    values = rows.ravel()
+    scale = 10.0 ** decimals
+
+    # Split into integer part and fraction exactly, then round the fraction digits
+    negative = np.signbit(values)
+    magnitude = np.abs(values)
+    fallback = ~np.isfinite(magnitude) | (magnitude >= 10.0 ** _INT_DIGITS)
+    magnitude = np.where(fallback, 0.0, magnitude)
+    integer = np.floor(magnitude)
+    scaled = (magnitude - integer) * scale
+    fraction = np.rint(scaled)
+    # A product within noise of .5 may have been rounded onto the tie; let Python decide
+    fallback |= np.abs(np.abs(scaled - np.floor(scaled)) - 0.5) < 1e-4
+    carry = fraction >= scale
+    integer[carry] += 1.0
+    fraction[carry] = 0.0
+
+    # Character grid: [prefix][sign][integer digits].[fraction digits][,flag][separator];
+    # the integer digits are as many as the largest value in the block needs
+    tail = 2 if flags is not None and flag_column else 0
+    prefix = flag_prefix.encode("ascii") if flags is not None and flag_col is not None and not tail else b""
+    p = len(prefix)
+    n_int = len(str(int(integer.max()))) if integer.size else 1
+    width = p + 1 + n_int + 1 + decimals + tail + 1
+    grid = np.empty((values.size, width), dtype=np.uint8)
+    keep = np.ones((values.size, width), dtype=bool)
+    if p:
+        grid[:, :p] = np.frombuffer(prefix, dtype=np.uint8)
+        flagged = np.zeros((n_rows, n_cols), dtype=bool)
+        flagged[:, flag_col] = np.asarray(flags, dtype=bool)
+        keep[:, :p] = flagged.ravel()[:, None]
+    grid[:, p] = ord("-")
+    keep[:, p] = negative
+
+    # Leading zeros go, but the units digit always stays
+    grid[:, p + 1:p + 1 + n_int] = _digit_columns(integer, n_int)
+    for j in range(n_int - 1):
+        keep[:, p + 1 + j] = integer >= 10.0 ** (n_int - 1 - j)
+
+    point = p + 1 + n_int
+    grid[:, point] = ord(".")
+    if decimals:
+        grid[:, point + 1:point + 1 + decimals] = _digit_columns(fraction, decimals)
+    else:
+        keep[:, point] = False
+    if tail:
+        # ',0' / ',1' after the last value of each row only
+        flag_cells = grid[:, -3:-1].reshape(n_rows, n_cols, 2)
+        flag_cells[..., 0] = ord(",")
+        flag_cells[:, -1, 1] = np.where(np.asarray(flags, dtype=bool), ord("1"), ord("0"))
+        flag_keep = keep[:, -3:-1].reshape(n_rows, n_cols, 2)
+        flag_keep[:, :-1] = False
+    separators = grid[:, -1].reshape(n_rows, n_cols)
+    separators[:] = ord(",")
+    separators[:, -1] = ord("\n")
+
+    text = grid[keep].tobytes().decode("ascii")
+    if not fallback.any():
+        return text
+
+    # Re-format the rows holding values the grid could not represent
+    row_lengths = keep.reshape(n_rows, -1).sum(axis=1)
+    row_ends = np.cumsum(row_lengths)
+    cells = ["%.{}f".format(decimals)] * n_cols
+    plain = ",".join(cells) + "\n"
+    marked = plain
+    if tail:
+        plain = ",".join(cells) + ",0\n"
+        marked = ",".join(cells) + ",1\n"
+    elif p:
+        cells[flag_col] = flag_prefix + cells[flag_col]
+        marked = ",".join(cells) + "\n"
+    pieces = []
+    last = 0
+    for r in np.flatnonzero(fallback.reshape(n_rows, n_cols).any(axis=1)):
+        start = int(row_ends[r] - row_lengths[r])
+        pieces.append(text[last:start])
+        row_format = marked if (p or tail) and flags[r] else plain
+        pieces.append(row_format % tuple(rows[r].tolist()))
+        last = int(row_ends[r])
+    pieces.append(text[last:])
+    return "".join(pieces)
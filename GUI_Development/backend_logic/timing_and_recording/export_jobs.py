@@ -0,0 +1,174 @@
+import os
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from PyQt5.QtCore import QObject, pyqtSignal
+
+
+class ExportCancelled(Exception):
+    """Raised inside a job's progress callback once the export was cancelled."""
+
+
+class ExportJob:
+    """One data type of one export; its counters are written by the pool thread, read by the GUI."""
+
+    def __init__(self, data_type: str):
+        self.data_type = data_type
+        self.state = "queued"  # "queued" | "running" | "done" | "failed" | "cancelled"
+        self.bytes_written = 0
+        self.fraction = 0.0
+        self.path = None
+        self.error = None
+
+
+class ExportJobManager(QObject):
+    """
+    Runs exports of a finished recording in the background, one job per data
+    type (muV/FFT/PSD) on a small thread pool, so the GUI stays responsive and
+    a new recording can start while the files are still being written (and
+    the last finished recording can be exported while a new one runs).
+
+    Jobs work on recording_manager.export_snapshot(), which keeps the recorded
+    session alive until every job is done. Progress (bytes written and
+    fraction of rows per job) is emitted as a status line at most every
+    STATUS_INTERVAL_S across all jobs; cancel() stops the jobs at their next block and removes their
+    partial files.
+    """
+    status = pyqtSignal(str)                 # Progress line for ExportStatus
+    finished = pyqtSignal(bool, str, list)   # success, message, exported types
+    _job_done = pyqtSignal()                 # From pool threads, delivered queued to the GUI thread
+
+    STATUS_INTERVAL_S = 0.1                  # Progress lines are throttled to ~10 Hz
+
+    def __init__(self, max_workers: int = 3, parent=None):
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+        self._pool = ThreadPoolExecutor(max_workers=max(1, int(max_workers)), thread_name_prefix="Export")
+        self._cancel = threading.Event()
+        self._jobs = []
+        self._status_lock = threading.Lock()
+        self._last_status_at = 0.0
+        self._recording_manager = None
+        self._snapshot = None
+        self._job_done.connect(self._on_job_done)
+
+    @property
+    def busy(self) -> bool:
+        return self._snapshot is not None
+
+    def start(self, recording_manager, directory_path: str, file_type: str, selected_types: dict) -> tuple:
+        """
+        Queue one job per selected data type that has recorded data.
+
+        Returns:
+            tuple: (started: bool, message: str)
+        """
+        if self.busy:
+            return False, "Export already in progress"
+        snapshot = recording_manager.export_snapshot()
+        if snapshot is None:
+            return False, "Export failed: Record data beforehand"
+        available = snapshot.get_available_data_types()
+        types = [t for t, wanted in selected_types.items() if wanted and available.get(t)]
+        if not types:
+            recording_manager.release_export_snapshot(snapshot)
+            return False, "No selected data types have recorded data"
+        try:
+            os.makedirs(directory_path, exist_ok=True)
+        except Exception:
+            recording_manager.release_export_snapshot(snapshot)
+            return False, "Export failed: Unexpected error"
+
+        ext = file_type.lower().lstrip(".")
+        self._cancel.clear()
+        self._recording_manager = recording_manager
+        self._snapshot = snapshot
+        self._jobs = [ExportJob(t) for t in types]
+        for job in self._jobs:
+            future = self._pool.submit(self._run, job, snapshot, directory_path, ext)
+            future.add_done_callback(lambda _: self._job_done.emit())
+        self.status.emit(self._progress_text())
+        if recording_manager.is_recording:
+            return True, f"Exporting previous recording: {', '.join(types)}"
+        return True, f"Exporting: {', '.join(types)}"
+
+    def cancel(self):
+        """Stop the running jobs at their next block; finished files are kept."""
+        if self.busy:
+            self._cancel.set()
+            self.status.emit("Cancelling export...")
+
+    def shutdown(self):
+        """Cancel and wait for the pool (application exit)."""
+        self._cancel.set()
+        self._pool.shutdown(wait=True)
+
+    # ─── Pool threads ───
+
+    def _run(self, job: ExportJob, snapshot, directory_path: str, ext: str):
+        def progress(n_bytes, fraction):
+            job.bytes_written += n_bytes
+            job.fraction = fraction
+            if self._cancel.is_set():
+                raise ExportCancelled()
+            # Blocks finish on every pool thread; only one line per interval reaches the GUI
+            now = time.monotonic()
+            with self._status_lock:
+                if now - self._last_status_at < self.STATUS_INTERVAL_S:
+                    return
+                self._last_status_at = now
+            self.status.emit(self._progress_text())
+
+        try:
+            if self._cancel.is_set():
+                raise ExportCancelled()
+            job.state = "running"
+            data = snapshot.get_cached_data_by_type({job.data_type: True})
+            if job.data_type not in data:
+                raise RuntimeError(f"{job.data_type} not recorded")
+            job.path = snapshot.export_data_type(directory_path, ext, job.data_type, data[job.data_type], progress)
+            if job.path is None:
+                raise RuntimeError(f"Unsupported file type: {ext}")
+            job.fraction = 1.0
+            job.state = "done"
+        except ExportCancelled:
+            job.state = "cancelled"
+        except Exception as e:
+            job.state = "failed"
+            job.error = e
+            self.logger.error(f"Export of {job.data_type} failed: {e}")
+
+    def _progress_text(self) -> str:
+        jobs = list(self._jobs)
+        if not jobs:
+            return ""
+        written = sum(job.bytes_written for job in jobs)
+        fraction = sum(job.fraction for job in jobs) / len(jobs)
+        names = ", ".join(job.data_type for job in jobs)
+        return f"Exporting {names}: {fraction:.0%} ({written / 1e6:.1f} MB)"
+
+    # ─── GUI thread ───
+
+    def _on_job_done(self):
+        if not self.busy or any(job.state in ("queued", "running") for job in self._jobs):
+            return
+        incomplete = self._snapshot.session_error is not None
+        self._recording_manager.release_export_snapshot(self._snapshot)
+        self._recording_manager = None
+        self._snapshot = None
+
+        exported = [job.data_type for job in self._jobs if job.state == "done"]
+        failed = [job.data_type for job in self._jobs if job.state == "failed"]
+        if self._cancel.is_set():
+            message = "Export cancelled"
+            if exported:
+                message += f" (kept: {', '.join(exported)})"
+            self.finished.emit(False, message, exported)
+        elif failed:
+            self.finished.emit(False, f"Export failed: {', '.join(failed)}", exported)
+        else:
+            message = f"Export successful: {', '.join(exported)}"
+            if incomplete:
+                message += " (incomplete: recording lost data)"
+            self.finished.emit(True, message, exported)
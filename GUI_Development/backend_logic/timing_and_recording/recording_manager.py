@@ -1,8 +1,17 @@
 import os
+import copy
+import time
+import logging
+import tempfile
 import threading
 import numpy as np
 from datetime import datetime
 from PyQt5.QtCore import QTimer, Qt
+from scipy.ndimage import uniform_filter1d
+from backend_logic.data_handling.spectral import BatchSpectra
+from backend_logic.data_handling.streaming_filters import StreamingFilterChain
+from backend_logic.timing_and_recording.session_writer import SessionWriter
+from backend_logic.timing_and_recording.csv_format import format_fixed_rows
 
 
 class SynchronizedRecordingTimer:
@@ -60,9 +69,38 @@ class SynchronizedRecordingTimer:
 
 class PreciseRecordingManager:
     """
-    Collects EEG samples at 125 Hz for multiple data types simultaneously.
+    Collects EEG samples for multiple data types simultaneously.
     Each data type gets its own file with datetime naming.
-    
+    Data is recorded on the collector's data_available signal; the engine's 8 ms
+    tick only tracks the run lifecycle.
+
+    muV is recorded from raw board blocks read by absolute sample index from the
+    collector's acquisition ring, so every board sample is recorded exactly once
+    (with its board timestamp and package number) regardless of tick jitter.
+    muv_filter_mode picks how those raw samples are filtered:
+    - 'stream': causal notch/BP/BStop applied in-stream as blocks arrive (default)
+    - 'export': raw samples kept, zero-phase filtered at export time
+    - 'raw':    no filtering
+
+    Recorded rows are not kept in RAM: they stream to a SessionWriter directory
+    (numbered .npy chunks plus index.json, written on a background thread) under
+    `session_root`, so memory stays at a chunk or two per stream and a crash
+    loses at most the last few seconds. export_cached reads the chunks back.
+    The directory is kept until the next recording finishes, so the last
+    finished recording can still be exported while a new one runs (or after
+    that one is forfeited).
+
+    spectra_mode picks where FFT/PSD exports come from:
+    - 'live':   the collector's spectrum rows, recorded on every update (default)
+    - 'export': only the raw muV stream is recorded; FFT/PSD are recomputed from
+                it at export time by BatchSpectra, one row per export_hop_s, with
+                the live engines' window lengths unless export_fft_window_s /
+                export_psd_nperseg / export_psd_segments are set
+
+    csv_buffer_flags picks how buffer-phase samples are marked in the muV CSV:
+    - 'prefix': the trial_s cell reads "B - <value>" (default; the documented layout)
+    - 'column': trial_s stays numeric and a last 'is_buffer' column holds 0/1
+
     Data structures:
     - muV: [ch1..ch8, global_s, trial_s] - time domain samples
     - FFT: [trial_s, global_s, ch1_bin1..ch1_binN, ch2_bin1..ch2_binN, ..., ch8_bin1..ch8_binN]
@@ -74,6 +112,7 @@ class PreciseRecordingManager:
         self.timer_widget = timer_widget
         self.engine = timing_engine
         self.export_status = export_status_label
+        self.logger = logging.getLogger(__name__)
 
         self.sync = SynchronizedRecordingTimer(timing_engine)
         self.is_recording = False
@@ -83,15 +122,40 @@ class PreciseRecordingManager:
             self.engine.run_completed.connect(self._on_run_completed)
         except Exception:
             pass
+        try:
+            # Record when new samples arrive instead of polling on every engine tick
+            self.data_collector.signals.data_available.connect(self._on_data_available)
+        except Exception:
+            pass
         
-        # Separate data storage for each type
-        self._muv_rows = []  # Shape: (N_samples, 10) -> [ch1..ch8, global_s, trial_s]
-        # For FFT/PSD we store one row per timestamp with all channels concatenated
-        # Shape: (N_samples, 2 + 8*num_freq_bins) -> [trial_s, global_s, ch1_bins..., ch2_bins..., ..., ch8_bins...]
-        self._fft_rows = []
-        self._psd_rows = []
-        # Flags aligned to muV samples indicating engine was in buffer phase
-        self._muv_is_buffer = []
+        # On-disk session of the current/last recording; streams:
+        # 'muV' one compact record per sample (see _muv_record_dtype);
+        # 'FFT'/'PSD' one row per update with all channels concatenated:
+        # (N_samples, 2 + 8*num_freq_bins) -> [trial_s, global_s, ch1_bins..., ..., ch8_bins...]
+        self.session_root = os.path.join(tempfile.gettempdir(), "eeg_sessions")
+        self._session = None
+        self._export_holds = {}  # Session -> background exports still reading it
+        self._retired = set()    # Replaced sessions whose removal waits for those exports
+        self._last_finished = None  # Detached copy of the previous recording while a new one runs
+        self._error_reported = False  # The current session's write error was shown already
+        self.muv_sample_dtype = np.float64  # np.float32 halves the stored EEG columns
+
+        # FFT/PSD source (see class docstring); frozen per recording in _spectra_from_raw
+        self.spectra_mode = 'live'  # 'live' | 'export'
+        self.export_hop_s = 0.1
+        self.export_fft_window_s = None
+        self.export_psd_nperseg = None
+        self.export_psd_segments = None
+        self._spectra_from_raw = False
+        self._record_muv = False
+
+        # Raw-block recording state
+        self.muv_filter_mode = 'stream'  # 'stream' | 'export' | 'raw'
+        self.csv_buffer_flags = 'prefix'  # 'prefix' | 'column' (see class docstring)
+        self._next_sample_index = 0  # Absolute acquisition index of the next sample to record
+        self._record_filter = None
+        self._record_config = None
+        self.dropped_samples = 0
         
         self._last_sample_index = -1  # guard against duplicates
         self._sample_rate = getattr(self.data_collector, 'sampling_rate', None) or 125
@@ -106,6 +170,9 @@ class PreciseRecordingManager:
             'FFT': False,
             'PSD': False,
         }
+        # What the last start() was asked to record (selected_types may be changed
+        # by the GUI afterwards, e.g. by a timer-only run)
+        self._recorded_types = dict(self.selected_types)
 
     def start(self, selected_types: dict):
         if self.is_recording:
@@ -113,21 +180,54 @@ class PreciseRecordingManager:
         if not self.data_collector or not self.data_collector.board_on:
             return False, "Board is off"
         self.selected_types = selected_types.copy()
+        self._recorded_types = selected_types.copy()
+        self._sample_rate = getattr(self.data_collector, 'sampling_rate', None) or 125
+        self._spectra_from_raw = self.spectra_mode == 'export'
+        # Exported spectra are computed from the raw stream, so it is recorded for them too
+        self._record_muv = bool(self.selected_types.get('muV') or (
+            self._spectra_from_raw and (self.selected_types.get('FFT') or self.selected_types.get('PSD'))))
         # Generate timestamp for this recording session
         self._recording_timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
         with self._data_lock:
-            self._muv_rows = []
-            self._muv_is_buffer = []
-            self._fft_rows = []
-            self._psd_rows = []
+            # The previous recording stays exportable until this one stops; only
+            # the one before it is dropped now (once any export of it is done)
+            if self._session is not None:
+                self._retire_last_finished()
+                self._last_finished = self._detached_copy()
+            self._fft_freqs = None
+            self._psd_freqs = None
+            self._error_reported = False
+            try:
+                self._session = SessionWriter(
+                    os.path.join(self.session_root, f"session_{self._recording_timestamp}"),
+                    meta={'sample_rate': self._sample_rate, 'selected_types': self.selected_types,
+                          'muv_filter_mode': self.muv_filter_mode, 'spectra_mode': self.spectra_mode})
+            except Exception as e:
+                self._session = None
+                return False, f"Cannot create session directory: {e}"
+            # A run that keeps to its schedule stages all its samples in one buffer
+            expected = None
+            try:
+                expected = int(np.ceil(self.engine.scheduled_run_s * self._sample_rate * 1.05)) + 1
+            except Exception:
+                pass
+            self._session.reserve('muV', self._muv_record_dtype(), expected_rows=expected)
             self._last_sample_index = -1
+            # Record every board sample that arrives from now on, exactly once
+            self._next_sample_index = self.data_collector.get_sample_count()
+            self.dropped_samples = 0
+            # Freeze the filter settings for the whole run
+            self._record_filter = None
+            self._record_config = None
+            try:
+                self._record_config = self.data_collector.get_config()
+            except Exception:
+                self._record_config = None
         # Pre-warm collectors so first tick has data ready (non-fatal if unavailable)
         try:
-            if self.selected_types.get('muV'):
-                self.data_collector.collect_data_muV()
-            if self.selected_types.get('FFT'):
+            if self._live_spectrum('FFT'):
                 self.data_collector.collect_data_FFT()
-            if self.selected_types.get('PSD'):
+            if self._live_spectrum('PSD'):
                 self.data_collector.collect_data_PSD()
         except Exception:
             pass
@@ -139,50 +239,216 @@ class PreciseRecordingManager:
             return False, str(e)
 
     def stop(self):
-        self.sync.stop()
-        self.is_recording = False
+        self._finish(keep=True)
 
     def forfeit(self):
-        self.stop()
+        self._finish(keep=False)
+
+    def _finish(self, keep: bool):
+        self.sync.stop()
+        self.is_recording = False
+        # Write the partly filled chunks and mark the session complete on disk
         with self._data_lock:
-            self._muv_rows = []
-            self._fft_rows = []
-            self._psd_rows = []
+            if self._session is not None:
+                self._session.close()
+            if keep:
+                # This recording is now the one to export; the previous one is dropped
+                self._retire_last_finished()
+            else:
+                # Forfeited data is dropped; the previous recording stays exportable
+                self._retire(self._session)
+                self._session = None
+        self._check_session_error()
+
+    def _retire(self, session):
+        """Discard a replaced session now, or when the last export reading it is released."""
+        if session is None:
+            return
+        if self._export_holds.get(session):
+            self._retired.add(session)
+        else:
+            session.discard()
+
+    def _retire_last_finished(self):
+        if self._last_finished is not None:
+            self._retire(self._last_finished._session)
+            self._last_finished = None
+
+    def _detached_copy(self):
+        """Copy holding this recording's session and settings, unaffected by a later start()."""
+        detached = copy.copy(self)
+        detached._data_lock = threading.Lock()
+        detached.selected_types = dict(self.selected_types)
+        detached._last_finished = None
+        return detached
+
+    def _export_source(self):
+        """The finished recording an export would read: this one, or the previous one while recording."""
+        if not self.is_recording and self._session is not None:
+            return self
+        return self._last_finished
+
+    def export_snapshot(self):
+        """
+        Detached copy of this manager for a background export of the last
+        finished recording (the previous one while a new recording runs), or
+        None with nothing recorded. The copy keeps that recording's session and
+        settings when a new start() moves the manager on, and the session
+        directory stays on disk until release_export_snapshot() is called with it.
+        """
+        with self._data_lock:
+            source = self._export_source()
+            if source is None:
+                return None
+            snapshot = source._detached_copy()
+            session = snapshot._session
+            self._export_holds[session] = self._export_holds.get(session, 0) + 1
+            return snapshot
+
+    def release_export_snapshot(self, snapshot):
+        """Done with an export_snapshot(): its session may be discarded if it was replaced."""
+        with self._data_lock:
+            session = snapshot._session
+            holds = self._export_holds.get(session, 0) - 1
+            if holds > 0:
+                self._export_holds[session] = holds
+                return
+            self._export_holds.pop(session, None)
+            if session in self._retired:
+                self._retired.discard(session)
+                session.discard()
+
+    @property
+    def session_error(self):
+        """Why writing the current session to disk failed (chunks are missing), or None."""
+        session = self._session
+        if session is None or session.error is None:
+            return None
+        return str(session.error)
+
+    def _check_session_error(self):
+        """Show a session write failure once, on the export status and the status bar."""
+        error = self.session_error
+        if error is None or self._error_reported:
+            return
+        self._error_reported = True
+        self.logger.error(f"Recording session write failed, data is being lost: {error}")
+        text = f"Recording error: data lost ({error})"
+        for label in (self.export_status, getattr(self.timer_widget, 'status_bar', None)):
+            try:
+                if label is not None:
+                    label.setText(text)
+            except Exception:
+                pass
+
+    def _muv_record_dtype(self) -> np.dtype:
+        """
+        One recorded sample. `phase` packs the engine state: (trial_index + 1) << 1,
+        plus 1 while in the buffer phase.
+        """
+        return np.dtype([
+            ('eeg', self.muv_sample_dtype, (8,)),
+            ('global_s', np.float64),
+            ('trial_s', np.float64),
+            ('timestamp', np.float64),
+            ('package_num', np.float32),  # NaN when the board has none
+            ('phase', np.uint16),
+        ])
+
+    def _live_spectrum(self, data_type: str) -> bool:
+        return bool(self.selected_types.get(data_type)) and not self._spectra_from_raw
+
+    def _rows(self, stream: str) -> int:
+        return self._session.rows(stream) if self._session is not None else 0
+
+    def _has_type(self, data_type: str) -> bool:
+        """
+        Whether `data_type` was selected for the last recording and has rows. The
+        muV stream is also recorded for spectra computed from it, which alone
+        does not make muV available.
+        """
+        if not self._recorded_types.get(data_type):
+            return False
+        if data_type != 'muV' and self._spectra_from_raw:
+            return self._rows('muV') > 0
+        return self._rows(data_type) > 0
 
     def has_cached_data(self) -> bool:
         with self._data_lock:
-            return (len(self._muv_rows) > 0 or 
-                   len(self._fft_rows) > 0 or 
-                   len(self._psd_rows) > 0)
+            return (self._has_type('muV') or
+                   self._has_type('FFT') or
+                   self._has_type('PSD'))
 
     def get_available_data_types(self) -> dict:
         """Returns which data types actually have recorded data available."""
         with self._data_lock:
             return {
-                'muV': len(self._muv_rows) > 0,
-                'FFT': len(self._fft_rows) > 0, 
-                'PSD': len(self._psd_rows) > 0,
+                'muV': self._has_type('muV'),
+                'FFT': self._has_type('FFT'),
+                'PSD': self._has_type('PSD'),
             }
 
+    def get_exportable_data_types(self) -> dict:
+        """get_available_data_types() of the recording export_snapshot() would export."""
+        with self._data_lock:
+            source = self._export_source()
+        if source is None:
+            return {'muV': False, 'FFT': False, 'PSD': False}
+        return source.get_available_data_types()
 
-
-    def get_cached_data_by_type(self) -> dict:
-        """Return cached data separated by type with proper structures"""
+    def get_cached_data_by_type(self, types=None) -> dict:
+        """
+        Return recorded data separated by type with proper structures (read from
+        the session chunks). `types` limits which are built, e.g. {'PSD': True}.
+        """
+        wanted = lambda data_type: types is None or bool(types.get(data_type))
         with self._data_lock:
             result = {}
-            
-            # muV: Keep original 10xN format [ch1..ch8, global_s, trial_s]
-            if len(self._muv_rows) > 0:
+            session = self._session
+            if session is None:
+                return result
+
+            # Spectra exported from the raw stream need it even when muV itself is not
+            derive = [t for t in ('FFT', 'PSD') if self._spectra_from_raw and wanted(t) and self._has_type(t)]
+
+            # muV: Keep original 10xN format [ch1..ch8, global_s, trial_s],
+            # filled chunk by chunk straight from the memory-mapped records
+            n = session.rows('muV')
+            if n > 0 and ((wanted('muV') and self._has_type('muV')) or derive):
+                session.flush()
+                muv_matrix = np.empty((10, n), dtype=float)
+                timestamps = np.empty(n, dtype=float)
+                package_nums = np.empty(n, dtype=float)
+                phase = np.empty(n, dtype=np.uint16)
+                start = 0
+                for chunk in session.chunks('muV'):
+                    stop = start + chunk.shape[0]
+                    muv_matrix[:8, start:stop] = chunk['eeg'].T
+                    muv_matrix[8, start:stop] = chunk['global_s']
+                    muv_matrix[9, start:stop] = chunk['trial_s']
+                    timestamps[start:stop] = chunk['timestamp']
+                    package_nums[start:stop] = chunk['package_num']
+                    phase[start:stop] = chunk['phase']
+                    start = stop
+                if self.muv_filter_mode == 'export' and self._record_config is not None:
+                    muv_matrix[:8] = self._filter_offline(muv_matrix[:8])
                 result['muV'] = {
-                    'data': np.vstack(self._muv_rows).T,  # 10xN format
+                    'data': muv_matrix,
                     'structure': 'channels+time',
                     'columns': ['ch1', 'ch2', 'ch3', 'ch4', 'ch5', 'ch6', 'ch7', 'ch8', 'global_s', 'trial_s'],
-                    'buffer_flags': list(self._muv_is_buffer)
+                    'buffer_flags': (phase & 1).astype(bool),
+                    'trial_index': (phase >> 1).astype(np.int32) - 1,
+                    'timestamps': timestamps,
+                    'package_nums': package_nums,
                 }
-            
+                for data_type in derive:
+                    result[data_type] = self._derive_spectrum(data_type, muv_matrix, session.directory)
+                if not (wanted('muV') and self._has_type('muV')):
+                    del result['muV']
+
             # FFT: Frequency domain data with all channels per row
-            if len(self._fft_rows) > 0:
-                fft_matrix = np.vstack(self._fft_rows)
+            if wanted('FFT') and session.rows('FFT') > 0:
+                fft_matrix = session.read('FFT')
                 result['FFT'] = {
                     'data': fft_matrix,  # rows = timestamps, cols = [trial_s, global_s, ch1_bins..., ..., ch8_bins...]
                     'structure': 'time_by_channel_bins',
@@ -191,8 +457,8 @@ class PreciseRecordingManager:
                 }
             
             # PSD: Power spectral density with all channels per row
-            if len(self._psd_rows) > 0:
-                psd_matrix = np.vstack(self._psd_rows)
+            if wanted('PSD') and session.rows('PSD') > 0:
+                psd_matrix = session.read('PSD')
                 result['PSD'] = {
                     'data': psd_matrix,  # rows = timestamps, cols = [trial_s, global_s, ch1_bins..., ..., ch8_bins...]
                     'structure': 'time_by_channel_bins',
@@ -202,6 +468,50 @@ class PreciseRecordingManager:
             
             return result
 
+    def _derive_spectrum(self, data_type: str, muv_matrix: np.ndarray, directory: str) -> dict:
+        """
+        FFT or PSD rows ([trial_s, global_s, ch1_bins..., ...], like the live rows)
+        every export_hop_s over the recorded samples, computed in chunks of frames
+        into a .npy file in the session directory and returned memory-mapped.
+        """
+        fs = self._sample_rate
+        collector = self.data_collector
+        nfft = int(round(self.export_fft_window_s * fs)) if self.export_fft_window_s else collector.nump_FFT
+        nperseg = self.export_psd_nperseg or collector.psd_nperseg or collector.nump_PSD
+        n_segments = self.export_psd_segments or collector.psd_segments
+        batch = BatchSpectra(fs, nfft, nperseg, n_segments,
+                             hop_samples=max(1, int(round(self.export_hop_s * fs))))
+
+        n_ch = min(8, len(collector.eeg_channels))
+        eeg = muv_matrix[:n_ch]
+        if data_type == 'FFT':
+            freqs, window, compute = batch.fft_freqs, nfft, batch.fft
+        else:
+            freqs, window, compute = batch.psd_freqs, batch.psd_window, batch.psd
+        ends = batch.frame_ends(eeg.shape[1], window)
+
+        path = os.path.join(directory, f"{data_type}_from_raw.npy")
+        rows = np.lib.format.open_memmap(path, mode='w+', dtype=float,
+                                         shape=(len(ends), 2 + n_ch * len(freqs)))
+        chunk = max(1, (8 << 20) // (8 * n_ch * max(window, len(freqs))))  # About 8 MB of frames
+        for i in range(0, len(ends), chunk):
+            part = ends[i:i + chunk]
+            spectra = compute(eeg, part)
+            if data_type == 'PSD':
+                # Same presentation as the live PSD: log, then smoothed over 4 bins
+                np.log1p(spectra, out=spectra)
+                uniform_filter1d(spectra, size=4, axis=-1, output=spectra)
+            rows[i:i + len(part), 0] = muv_matrix[9, part - 1]
+            rows[i:i + len(part), 1] = muv_matrix[8, part - 1]
+            rows[i:i + len(part), 2:] = spectra.reshape(len(part), -1)
+        rows.flush()
+        return {
+            'data': rows,  # rows = frames, cols = [trial_s, global_s, ch1_bins..., ..., ch8_bins...]
+            'structure': 'time_by_channel_bins',
+            'freqs': freqs,
+            'columns': []
+        }
+
     def _on_sample_tick(self, current_sched_ms: int):
         if not self.is_recording:
             return
@@ -217,35 +527,36 @@ class PreciseRecordingManager:
                 except Exception:
                     pass
             return
+
+    def _on_data_available(self, sample_count: int):
+        """
+        Record whatever arrived since the last call. Driven by the collector's
+        data_available signal, so rows follow actual sample arrival and nothing is
+        recomputed while the board delivers no new data.
+        """
+        if not self.is_recording or not getattr(self.engine, 'run_active', False):
+            return
         try:
-            # Timestamps
-            global_time_s = current_sched_ms / 1000.0
-            # trial_time_s is schedule-aligned relative to trial start minus before window
+            # De-duplication: skip notifications that carry no new samples
+            sample_index = int(sample_count)
+            if sample_index <= self._last_sample_index:
+                return
+
+            # Timestamps: run-relative, like the engine tick
+            global_time_s = self.engine.get_run_elapsed_ms() / 1000.0
+            # trial_time_s is relative to trial start minus before window
             trial_time_s = (-float(self.timer_widget.time_before.value())
                             + self.sync.get_trial_relative_seconds())
 
-            # De-duplication: compute sample index at sampling rate and skip duplicates
-            sample_index = int(global_time_s * self._sample_rate + 1e-6)
-            if sample_index <= self._last_sample_index:
-                return
+            # muV: drain every raw board sample that arrived since the last call
+            if self._record_muv:
+                self._drain_muv_block(global_time_s, trial_time_s)
+            self._check_session_error()
 
             # Collect samples for each selected data type
             with self._data_lock:
-                # muV: Keep the working logic unchanged
-                if self.selected_types.get('muV'):
-                    muv_sample = self._collect_muv_sample()
-                    if muv_sample is not None:
-                        muv_row = np.append(muv_sample, [global_time_s, trial_time_s])
-                        if muv_row.shape[0] == 10:
-                            self._muv_rows.append(muv_row.astype(float))
-                            # Track whether this sample occurred during buffer phase
-                            try:
-                                self._muv_is_buffer.append(self.engine.phase == 'buffer')
-                            except Exception:
-                                self._muv_is_buffer.append(False)
-                
                 # FFT: Store frequency data for all channels in a single row per timestamp
-                if self.selected_types.get('FFT'):
+                if self._live_spectrum('FFT'):
                     fft_channel_data = self._collect_fft_sample()
                     if fft_channel_data is not None and len(fft_channel_data) > 0:
                         # Ensure channels are in order and flatten all bins across channels
@@ -255,10 +566,10 @@ class PreciseRecordingManager:
                         if len(channel_bins) > 0:
                             all_bins_flat = np.concatenate(channel_bins)
                             fft_row = np.concatenate(([trial_time_s, global_time_s], all_bins_flat))
-                            self._fft_rows.append(fft_row.astype(float))
+                            self._session.append('FFT', fft_row.astype(float)[None, :])
                 
                 # PSD: Store power data for all channels in a single row per timestamp
-                if self.selected_types.get('PSD'):
+                if self._live_spectrum('PSD'):
                     psd_channel_data = self._collect_psd_sample()
                     if psd_channel_data is not None and len(psd_channel_data) > 0:
                         channel_bins = []
@@ -267,7 +578,7 @@ class PreciseRecordingManager:
                         if len(channel_bins) > 0:
                             all_bins_flat = np.concatenate(channel_bins)
                             psd_row = np.concatenate(([trial_time_s, global_time_s], all_bins_flat))
-                            self._psd_rows.append(psd_row.astype(float))
+                            self._session.append('PSD', psd_row.astype(float)[None, :])
                 
                 self._last_sample_index = sample_index
         except Exception:
@@ -278,24 +589,94 @@ class PreciseRecordingManager:
         # Engine signaled run completion; ensure recording stops and status updates
         was_recording = bool(self.is_recording)
         if was_recording:
+            # Pick up the samples that arrived after the last notification
+            if self._record_muv:
+                try:
+                    run_s = self.engine.get_run_elapsed_ms() / 1000.0
+                    # run_active is already False here, so read the trial timer directly
+                    trial_s = (-float(self.timer_widget.time_before.value())
+                               + self.engine.get_trial_elapsed_ms() / 1000.0)
+                    self._drain_muv_block(run_s, trial_s)
+                except Exception:
+                    pass
             self.stop()
-        # Only show completion ready status if we were actually recording
-        if was_recording:
+        # Only show completion ready status if we were actually recording (and nothing was lost)
+        if was_recording and self.session_error is None:
             try:
                 if self.export_status is not None:
                     self.export_status.setText("Recording complete - Ready to export")
             except Exception:
                 pass
 
-    def _collect_muv_sample(self):
-        """Collect muV data sample - using the working logic"""
+    def _drain_muv_block(self, global_time_s: float, trial_time_s: float):
+        """
+        Append every raw sample in [_next_sample_index, newest) from the acquisition
+        ring as one block. Per-sample global_s / trial_s are placed relative to this
+        tick using the board timestamps, so they do not depend on tick alignment.
+        """
+        acquisition = getattr(self.data_collector, 'acquisition', None)
+        if acquisition is None:
+            return
+        count = acquisition.sample_count
+        start = self._next_sample_index
+        if count <= start:
+            return
+        raw = acquisition.read(start, count)
+        n = raw.shape[1]
+        # Samples older than the ring capacity were overwritten before we got to them
+        self.dropped_samples += (count - start) - n
+        self._next_sample_index = count
+        if n == 0:
+            return
+
+        channels = list(self.data_collector.eeg_channels[:8])
+        eeg = np.zeros((8, n), dtype=float)
+        eeg[:len(channels)] = raw[channels]
+        timestamps = raw[acquisition.timestamp_channel]
+
+        if self.muv_filter_mode == 'stream' and self._record_config is not None:
+            eeg = self._filter_in_stream(eeg)
+
         try:
-            data = self.data_collector.collect_data_muV()
-            if data:
-                return self._extract_latest_from_channels(data)
+            is_buffer = self.engine.phase == 'buffer'
+            trial_index = int(self.engine.trial_index)
         except Exception:
-            pass
-        return None
+            is_buffer, trial_index = False, -1
+
+        block = np.empty(n, dtype=self._muv_record_dtype())
+        block['eeg'] = eeg.T
+        # Seconds between each sample's board timestamp and this tick
+        age_s = time.time() - timestamps
+        block['global_s'] = global_time_s - age_s
+        block['trial_s'] = trial_time_s - age_s
+        block['timestamp'] = timestamps
+        if acquisition.package_num_channel is not None:
+            block['package_num'] = raw[acquisition.package_num_channel]
+        else:
+            block['package_num'] = np.nan
+        block['phase'] = ((max(trial_index, -1) + 1) << 1) | int(is_buffer)
+
+        with self._data_lock:
+            if self._session is None:
+                return
+            self._session.append('muV', block)
+
+    def _filter_in_stream(self, eeg: np.ndarray) -> np.ndarray:
+        """Causal notch/BP/BStop over a raw block, carrying filter state across blocks."""
+        if self._record_filter is None:
+            self._record_filter = StreamingFilterChain(eeg.shape[0], self._sample_rate, capacity=1)
+        try:
+            return self._record_filter.process(eeg, self._record_config)
+        except Exception:
+            return eeg
+
+    def _filter_offline(self, eeg: np.ndarray) -> np.ndarray:
+        """Zero-phase notch/BP/BStop over the whole recorded session (export mode)."""
+        try:
+            chain = StreamingFilterChain(eeg.shape[0], self._sample_rate, capacity=1)
+            return chain.process(eeg, self._record_config, zero_phase=True)
+        except Exception:
+            return eeg
 
     def _collect_fft_sample(self):
         """Collect FFT data - returns list of rows for all channels"""
@@ -306,6 +687,7 @@ class PreciseRecordingManager:
                 # Store frequency info on first collection
                 if self._fft_freqs is None:
                     self._fft_freqs = freqs
+                    self._session.set_meta('FFT_freqs', np.asarray(freqs, dtype=float).tolist())
                 
                 # Create one row per channel with all frequency bins
                 channel_rows = []
@@ -327,6 +709,7 @@ class PreciseRecordingManager:
                 # Store frequency info on first collection
                 if self._psd_freqs is None:
                     self._psd_freqs = freqs
+                    self._session.set_meta('PSD_freqs', np.asarray(freqs, dtype=float).tolist())
                 
                 # Create one row per channel with all frequency bins
                 channel_rows = []
@@ -339,14 +722,6 @@ class PreciseRecordingManager:
             pass
         return None
 
-    def _extract_latest_from_channels(self, channel_dict) -> np.ndarray:
-        values = np.zeros(8, dtype=float)
-        for i, ch in enumerate(self.data_collector.eeg_channels[:8]):
-            sig = channel_dict.get(ch)
-            if sig is not None and len(sig) > 0:
-                values[i] = float(sig[-1])
-        return values
-
     def _extract_peak_from_amplitudes(self, amplitudes_list) -> np.ndarray:
         values = np.zeros(8, dtype=float)
         for i, amp in enumerate(amplitudes_list[:8]):
@@ -373,7 +748,7 @@ class PreciseRecordingManager:
         Returns:
             tuple: (success: bool, message: str, exported_types: list)
         """
-        cached_data = self.get_cached_data_by_type()
+        cached_data = self.get_cached_data_by_type(selected_types)
         if not cached_data:
             return False, "No cached data available", []
         
@@ -399,26 +774,8 @@ class PreciseRecordingManager:
             
             # Export each data type to separate file
             for data_type, data_info in cached_data.items():
-                filename = f"record{data_type}_{self._recording_timestamp}"
-                matrix = data_info['data']
-                columns = data_info['columns']
-                
-                if ext == "csv":
-                    path = os.path.join(directory_path, f"{filename}.csv")
-                    self._write_csv_file(path, matrix, columns, data_info)
-                    exported_files.append(path)
-                    exported_types.append(data_type)
-                elif ext == "npy":
-                    path = os.path.join(directory_path, f"{filename}.npy")
-                    np.save(path, matrix)
-                    exported_files.append(path)
-                    exported_types.append(data_type)
-                elif ext == "npz":
-                    path = os.path.join(directory_path, f"{filename}.npz")
-                    save_dict = {'data': matrix, 'columns': columns}
-                    if 'freqs' in data_info:
-                        save_dict['freqs'] = data_info['freqs']
-                    np.savez(path, **save_dict)
+                path = self.export_data_type(directory_path, ext, data_type, data_info)
+                if path is not None:
                     exported_files.append(path)
                     exported_types.append(data_type)
             
@@ -426,6 +783,8 @@ class PreciseRecordingManager:
             if exported_types:
                 types_str = ", ".join(exported_types)
                 message = f"Export successful: {types_str}"
+                if self.session_error is not None:
+                    message += " (incomplete: recording lost data)"
                 return True, message, exported_types
             else:
                 return False, "No data exported", []
@@ -433,11 +792,61 @@ class PreciseRecordingManager:
         except Exception:
             return False, "Export failed: Unexpected error", []
     
-    def _write_csv_file(self, path: str, matrix: np.ndarray, columns: list, data_info: dict):
-        """Write CSV file with appropriate format for each data type"""
+    def export_data_type(self, directory_path: str, ext: str, data_type: str, data_info: dict, progress=None):
+        """
+        Write one data type (an entry of get_cached_data_by_type) as csv/npy/npz
+        and return its path, or None for an unknown format. The file is written
+        under a temporary name and renamed when complete; on any error (including
+        one raised by `progress`, e.g. to cancel) the partial file is removed.
+
+        `progress(n_bytes, fraction)` is called after every written block with
+        the bytes just written and the fraction of the rows done.
+        """
+        if ext not in ("csv", "npy", "npz"):
+            return None
+        path = os.path.join(directory_path, f"record{data_type}_{self._recording_timestamp}.{ext}")
+        partial = path + ".part"
+        matrix = data_info['data']
+        columns = data_info['columns']
+        try:
+            if ext == "csv":
+                self._write_csv_file(partial, matrix, columns, data_info, progress)
+            else:
+                with open(partial, "wb") as f:
+                    if ext == "npy":
+                        np.save(f, matrix)
+                    else:
+                        save_dict = {'data': matrix, 'columns': columns}
+                        for key in ('freqs', 'timestamps', 'package_nums', 'buffer_flags', 'trial_index'):
+                            if key in data_info:
+                                save_dict[key] = data_info[key]
+                        np.savez(f, **save_dict)
+                if progress is not None:
+                    progress(os.path.getsize(partial), 1.0)
+            os.replace(partial, path)
+        except BaseException:
+            try:
+                os.remove(partial)
+            except OSError:
+                pass
+            raise
+        return path
+
+    # Rows per formatted block: about this many values, so the block's text stays a few MB
+    CSV_CHUNK_VALUES = 1 << 19
+
+    def _write_csv_file(self, path: str, matrix: np.ndarray, columns: list, data_info: dict, progress=None):
+        """
+        Write CSV file with appropriate format for each data type.
+
+        Rows are formatted a block at a time with array operations
+        (format_fixed_rows: every value as %.10f, as the per-value f-strings
+        did) and written through a large buffer, so the output bytes are
+        unchanged.
+        """
         num_cols = matrix.shape[1]
-        
-        with open(path, "w", encoding="utf-8") as f:
+
+        with open(path, "w", encoding="utf-8", buffering=1 << 20) as f:
             # Special handling for FFT/PSD time-by-channel-bins structure
             if data_info.get('structure') == 'time_by_channel_bins' and 'freqs' in data_info:
                 num_channels = 8
@@ -462,8 +871,7 @@ class PreciseRecordingManager:
                 f.write(",".join(ch_labels) + "\n")
 
                 # 4) Data rows (already row-oriented)
-                for row in matrix:
-                    f.write(",".join(f"{v:.10f}" for v in row) + "\n")
+                self._write_csv_rows(f, matrix, progress=progress)
                 return
 
             # Default generic writer, with special handling for muV to transpose for a long format
@@ -474,37 +882,48 @@ class PreciseRecordingManager:
                 # Transpose to N x 10 so each row is a sample timestamp
                 transposed = matrix.T  # shape: (N_samples, 10)
                 # Header uses the provided columns order
-                f.write(",".join(columns) + "\n")
+                flag_column = self.csv_buffer_flags == 'column' and buffer_flags is not None
+                f.write(",".join(list(columns) + (['is_buffer'] if flag_column else [])) + "\n")
                 trial_col_index = None
                 try:
                     trial_col_index = columns.index('trial_s')
                 except Exception:
                     trial_col_index = None
-                # Write each sample row, prefix trial_s with 'B - ' when buffer flag is True
-                for i in range(transposed.shape[0]):
-                    row_vals = []
-                    for j, v in enumerate(transposed[i]):
-                        if (trial_col_index is not None) and (j == trial_col_index) and buffer_flags is not None:
-                            try:
-                                is_buf = bool(buffer_flags[i])
-                            except Exception:
-                                is_buf = False
-                            if is_buf:
-                                row_vals.append(f"B - {float(v):.10f}")
-                            else:
-                                row_vals.append(f"{float(v):.10f}")
-                        else:
-                            row_vals.append(f"{float(v):.10f}")
-                    f.write(",".join(row_vals) + "\n")
+                # Each sample row; trial_s is prefixed with 'B - ' when its buffer flag is set,
+                # or the flag gets its own column
+                flags = None
+                if (trial_col_index is not None or flag_column) and buffer_flags is not None:
+                    flags = np.zeros(transposed.shape[0], dtype=bool)
+                    known = min(len(buffer_flags), len(flags))
+                    flags[:known] = np.asarray(buffer_flags[:known], dtype=bool)
+                self._write_csv_rows(f, transposed, flags, trial_col_index, progress, flag_column)
                 return
             else:
                 # Generic non-muV writer: Column headers: label,sample_0,sample_1,sample_2,...
                 f.write("label," + ",".join(str(i) for i in range(num_cols)) + "\n")
                 # Data rows (matrix expected row-oriented)
+                row_format = ",".join(["%.10f"] * num_cols) + "\n"
+                n_labels = max(len(columns), 1)
                 for r, label in enumerate(columns):
                     if r < matrix.shape[0]:
-                        row = matrix[r]
-                        row_vals = ",".join(f"{v:.10f}" for v in row)
-                        f.write(f"{label},{row_vals}\n")
-
+                        line = f"{label}," + row_format % tuple(matrix[r].tolist())
+                        f.write(line)
+                        if progress is not None:
+                            progress(len(line), (r + 1) / n_labels)
 
+    def _write_csv_rows(self, f, rows: np.ndarray, flags: np.ndarray = None, flag_col: int = None, progress=None,
+                        flag_column: bool = False):
+        """
+        Write `rows` (N x C) as %.10f CSV lines, one formatted block of rows per
+        write. Rows whose `flags` entry is set get 'B - ' before column `flag_col`,
+        or with `flag_column` every row ends in a 0/1 flag column.
+        """
+        n_rows, n_cols = rows.shape
+        block = max(1, self.CSV_CHUNK_VALUES // max(n_cols, 1))
+        for start in range(0, n_rows, block):
+            stop = min(start + block, n_rows)
+            text = format_fixed_rows(rows[start:stop], 10, flags[start:stop] if flags is not None else None,
+                                     flag_col, flag_column=flag_column)
+            f.write(text)
+            if progress is not None:
+                progress(len(text), stop / n_rows)
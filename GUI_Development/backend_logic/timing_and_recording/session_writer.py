@@ -0,0 +1,248 @@
+import os
+import json
+import time
+import queue
+import logging
+import threading
+import numpy as np
+
+
+INDEX_FILE = "index.json"
+
+
+class _Stream:
+    """Staging buffer of one named stream: fixed row shape and dtype (plain or structured)."""
+
+    def __init__(self, name, row_shape, dtype, chunk_rows, max_chunk_rows=None):
+        self.name = name
+        self.row_shape = tuple(row_shape)
+        self.dtype = np.dtype(dtype)
+        self.chunk_rows = int(chunk_rows)
+        self.max_chunk_rows = max(self.chunk_rows, int(max_chunk_rows or chunk_rows))
+        self.buffer = np.empty((self.chunk_rows,) + self.row_shape, dtype=self.dtype)
+        self.fill = 0
+        self.rows = 0           # Rows appended (staged + submitted)
+        self.chunks = []        # Written chunks: {"file", "rows"}
+        self.n_submitted = 0
+        self.started = time.monotonic()  # When the staged chunk got its first row
+
+
+class SessionWriter:
+    """
+    Crash-safe on-disk store for one recording session.
+
+    Rows are appended to named streams (e.g. 'muV', 'FFT'); each stream stages
+    rows in a preallocated chunk buffer of about `chunk_bytes`. Full chunks, and
+    any chunk older than `max_chunk_s`, are handed to a background thread that
+    saves them as numbered .npy files and then rewrites index.json (both via a
+    temporary file and rename). The index therefore only ever lists complete
+    chunks: after a crash load_session() recovers everything except the rows of
+    the last `max_chunk_s` seconds.
+
+    At most `max_pending` chunks wait for the writer thread; beyond that
+    append() blocks, so memory stays bounded to a few chunks per stream.
+    """
+
+    def __init__(self, directory, chunk_bytes=1 << 20, max_chunk_s=10.0, max_pending=2, meta=None):
+        self.logger = logging.getLogger(__name__)
+        self.directory = directory
+        self.chunk_bytes = int(chunk_bytes)
+        self.max_chunk_s = float(max_chunk_s)
+        self.meta = dict(meta or {})
+        self.complete = False
+        self.closed = False
+        self.error = None
+
+        os.makedirs(self.directory, exist_ok=True)
+        self._streams = {}
+        self._lock = threading.Lock()  # Guards the index (streams' chunk lists and meta)
+        self._queue = queue.Queue(maxsize=max(1, int(max_pending)))
+        self._thread = threading.Thread(target=self._run, name="SessionWriter", daemon=True)
+        self._thread.start()
+        self._write_index()
+
+    # ─── Producer side (recording thread) ───
+
+    def _max_chunk_rows(self, row_shape, dtype):
+        row_bytes = max(1, int(np.prod(row_shape, dtype=np.int64)) * np.dtype(dtype).itemsize)
+        return max(1, self.chunk_bytes // row_bytes)
+
+    def reserve(self, name, dtype, row_shape=(), expected_rows=None):
+        """
+        Create stream `name` ahead of its first rows. With `expected_rows` (e.g.
+        from the run schedule) a shorter run stages into a buffer of just that
+        size; if the stream outgrows it, each next buffer doubles, up to the
+        `chunk_bytes` chunk size.
+        """
+        max_rows = self._max_chunk_rows(row_shape, dtype)
+        rows = max_rows if expected_rows is None else min(max_rows, max(1, int(expected_rows)))
+        with self._lock:
+            self._streams[name] = _Stream(name, row_shape, dtype, rows, max_rows)
+
+    def append(self, name, rows):
+        """Append rows (shape (n,) + row_shape) to stream `name`, created on first use."""
+        rows = np.asarray(rows)
+        if rows.shape[0] == 0 or self.closed:
+            return
+        stream = self._streams.get(name)
+        if stream is None:
+            self.reserve(name, rows.dtype, rows.shape[1:])
+            stream = self._streams[name]
+        elif rows.shape[1:] != stream.row_shape:
+            raise ValueError(f"Stream '{name}' rows are {stream.row_shape}, got {rows.shape[1:]}")
+
+        done = 0
+        while done < rows.shape[0]:
+            if stream.fill == 0:
+                stream.started = time.monotonic()
+            k = min(rows.shape[0] - done, stream.chunk_rows - stream.fill)
+            stream.buffer[stream.fill:stream.fill + k] = rows[done:done + k]
+            stream.fill += k
+            stream.rows += k
+            done += k
+            if stream.fill == stream.chunk_rows:
+                self._submit(stream)
+        if stream.fill and time.monotonic() - stream.started >= self.max_chunk_s:
+            self._submit(stream)
+
+    def set_meta(self, key, value):
+        """Store a JSON-serialisable value in the index (written with the next chunk)."""
+        with self._lock:
+            self.meta[key] = value
+
+    def rows(self, name):
+        stream = self._streams.get(name)
+        return stream.rows if stream is not None else 0
+
+    def flush(self):
+        """Submit every partly filled chunk and wait until all are on disk."""
+        for stream in list(self._streams.values()):
+            if stream.fill:
+                self._submit(stream)
+        self._queue.join()
+        self._write_index()
+
+    def close(self):
+        """Flush, stop the writer thread and mark the session complete in the index."""
+        if self.closed:
+            return
+        self.flush()
+        self._stop_thread()
+        self.complete = self.error is None
+        self._write_index()
+
+    def discard(self):
+        """Stop writing and delete the session directory."""
+        self._stop_thread()
+        try:
+            for name in os.listdir(self.directory):
+                os.remove(os.path.join(self.directory, name))
+            os.rmdir(self.directory)
+        except Exception as e:
+            self.logger.error(f"Could not remove session {self.directory}: {e}")
+
+    def _stop_thread(self):
+        self.closed = True
+        if self._thread.is_alive():
+            self._queue.put(None)
+            self._thread.join()
+
+    def _submit(self, stream):
+        chunk = stream.buffer[:stream.fill]
+        if stream.fill == stream.chunk_rows:
+            stream.chunk_rows = min(2 * stream.chunk_rows, stream.max_chunk_rows)
+        # The writer thread owns the old buffer now
+        stream.buffer = np.empty((stream.chunk_rows,) + stream.row_shape, dtype=stream.dtype)
+        stream.fill = 0
+        number = stream.n_submitted
+        stream.n_submitted += 1
+        self._queue.put((stream, number, chunk))
+
+    # ─── Writer thread ───
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            try:
+                if item is None:
+                    return
+                stream, number, chunk = item
+                filename = f"{stream.name}_{number:06d}.npy"
+                path = os.path.join(self.directory, filename)
+                with open(path + ".tmp", "wb") as f:
+                    np.save(f, chunk)
+                    f.flush()
+                    os.fsync(f.fileno())
+                os.replace(path + ".tmp", path)
+                with self._lock:
+                    stream.chunks.append({"file": filename, "rows": int(chunk.shape[0])})
+                self._write_index()
+            except Exception as e:
+                self.error = e
+                self.logger.error(f"Session chunk write failed in {self.directory}: {e}")
+            finally:
+                self._queue.task_done()
+
+    def _write_index(self):
+        with self._lock:
+            index = {
+                "version": 1,
+                "complete": self.complete,
+                "meta": self.meta,
+                "streams": {
+                    name: {"dtype": np.lib.format.dtype_to_descr(s.dtype), "row_shape": list(s.row_shape),
+                           "chunks": list(s.chunks)}
+                    for name, s in self._streams.items()
+                },
+            }
+            path = os.path.join(self.directory, INDEX_FILE)
+            try:
+                with open(path + ".tmp", "w", encoding="utf-8") as f:
+                    json.dump(index, f)
+                os.replace(path + ".tmp", path)
+            except Exception as e:
+                self.logger.error(f"Session index write failed in {self.directory}: {e}")
+
+    # ─── Reading back ───
+
+    def chunks(self, name):
+        """Memory-mapped chunks of stream `name` written so far (call flush() first for all rows)."""
+        stream = self._streams.get(name)
+        if stream is None:
+            return []
+        with self._lock:
+            files = [c["file"] for c in stream.chunks]
+        return [np.load(os.path.join(self.directory, f), mmap_mode="r") for f in files]
+
+    def read(self, name):
+        """Whole stream `name` as one array (flushes first)."""
+        self.flush()
+        return _concatenate(self.chunks(name), self._streams.get(name))
+
+
+def _concatenate(chunks, stream=None):
+    if chunks:
+        return np.concatenate(chunks)
+    if stream is not None:
+        return np.empty((0,) + stream.row_shape, dtype=stream.dtype)
+    return np.empty(0)
+
+
+def load_session(directory):
+    """
+    Read a session directory written by SessionWriter, including one left
+    behind by a crash. Returns (meta, {stream: array}, complete).
+    """
+    with open(os.path.join(directory, INDEX_FILE), "r", encoding="utf-8") as f:
+        index = json.load(f)
+    data = {}
+    for name, info in index["streams"].items():
+        chunks = [np.load(os.path.join(directory, c["file"]), mmap_mode="r") for c in info["chunks"]]
+        if chunks:
+            data[name] = np.concatenate(chunks)
+        else:
+            dtype = info["dtype"]
+            if isinstance(dtype, list):  # Structured: JSON turned the field tuples into lists
+                dtype = [tuple(field) for field in dtype]
+            data[name] = np.empty([0] + info["row_shape"], dtype=np.lib.format.descr_to_dtype(dtype))
+    return index["meta"], data, bool(index["complete"])
@@ -108,6 +108,16 @@ class TimingEngine(QObject):
                 self.phase_changed.emit(self.phase, self.trial_index)
 
     # Public helpers for consumers
+    @property
+    def interval_ms(self) -> int:
+        return self._interval_ms
+
+    @property
+    def scheduled_run_s(self) -> float:
+        """Length of the configured run: every trial plus the buffers between them."""
+        trials = max(self.total_trials, 0)
+        return trials * (self.before_s + self.after_s) + max(trials - 1, 0) * self.buffer_s
+
     def get_run_elapsed_ms(self) -> int:
         if not self._initialized:
             return 0
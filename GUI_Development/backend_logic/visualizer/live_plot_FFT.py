@@ -2,12 +2,13 @@ import pyqtgraph as pg
 import numpy as np
 from joblib.numpy_pickle_utils import xrange
 from scipy.signal import windows
-from PyQt5.QtCore import QTimer
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton
 from brainflow.board_shim import BoardShim
 from backend_logic.data_handling.data_collector import CentralizedDataCollector
 
 class FFTGraph(QWidget):
+    frame_stages = ("fft",)  # DSPFrame stages this plot draws from
+
     def __init__(self, board_shim, BoardOnCheckBox, preprocessing_controls, ica_manager=None, data_collector=None, parent=None):
         super().__init__(parent)
 
@@ -16,16 +17,18 @@ class FFTGraph(QWidget):
         self.preprocessing_controls = preprocessing_controls
         self.ica_manager = ica_manager
         self.data_collector = data_collector
+        self._last_frame_version = None
 
         self.eeg_channels = None
         self.sampling_rate = None
         self.num_points = None
 
-        # Update speed - 16ms for 60fps rendering (smoother visuals)
-        self.update_speed_ms = 16
+        # Redraws are driven by the collector's frame_ready signal (about 60 fps
+        # while new samples arrive, none while idle); main starts them with the tab
+        self.updating = False
+        self.paused = False
 
         self.init_ui()
-        self.init_timer()
 
     def init_ui(self):
         layout = QVBoxLayout(self)
@@ -53,18 +56,37 @@ class FFTGraph(QWidget):
         self.pause_button.clicked.connect(self.toggle_pause)
         layout.addWidget(self.pause_button)
 
-    def init_timer(self):
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_plot)
-        self.timer.start(self.update_speed_ms)
+    def start_updates(self):
+        """Start redrawing on new frames (tab shown); draws the newest frame right away."""
+        self.updating = True
+        self._update_frame_demand()
+        if not self.paused:
+            self.update_plot()
+
+    def stop_updates(self):
+        self.updating = False
+        self._update_frame_demand()
+
+    def _update_frame_demand(self):
+        """Have the DSP worker compute this plot's stages only while it is shown and not paused."""
+        if self.data_collector is not None:
+            active = self.updating and not self.paused
+            self.data_collector.set_frame_demand(self, self.frame_stages if active else ())
+
+    def on_frame_ready(self, frame=None):
+        """Slot for CentralizedDataCollector.signals.frame_ready."""
+        if self.updating and not self.paused:
+            self.update_plot()
 
     def toggle_pause(self):
-        if self.timer.isActive():
-            self.timer.stop()
+        self.paused = not self.paused
+        self._update_frame_demand()
+        if self.paused:
             self.pause_button.setText("Resume")
         else:
-            self.timer.start(self.update_speed_ms)
             self.pause_button.setText("Pause")
+            if self.updating:
+                self.update_plot()
 
     def update_plot(self):
         if not self.board_shim or not self.BoardOnCheckBox.isChecked():
@@ -76,9 +98,13 @@ class FFTGraph(QWidget):
             self.num_points = int(4 * self.sampling_rate)  # 4-second window (33% less processing)
             print(f"FFT Init: {len(self.eeg_channels)} channels, {self.sampling_rate} Hz")
 
-        # Use centralized data collector
-        fft_data = self.data_collector.collect_data_FFT() if self.data_collector else None
-        
+        # Render the DSP worker's newest frame; skip the redraw if nothing new arrived
+        frame = self.data_collector.latest_frame() if self.data_collector else None
+        if frame is None or frame.version == self._last_frame_version:
+            return
+        self._last_frame_version = frame.version
+        fft_data = frame.fft
+
         if fft_data is None:
             return
             
@@ -1,15 +1,18 @@
 import numpy as np
 import time
 from PyQt5.QtWidgets import QWidget, QVBoxLayout, QPushButton
-from PyQt5.QtCore import QTimer
 from vispy import scene
 from vispy.scene import Line, Text
 from vispy.color import get_colormap
 from brainflow.board_shim import BoardShim
 from backend_logic.data_handling.data_collector import CentralizedDataCollector
+from backend_logic.visualizer.ring_trace_visual import StackedRingTraces
+from mindstream_shared.decimation import MinMaxDecimator
 
 
 class MuVGraphVispyStacked(QWidget):
+    frame_stages = ("window",)  # DSPFrame stages this plot draws from
+
     def __init__(self, board_shim, BoardOnCheckBox, preprocessing_controls, ica_manager=None, data_collector=None, parent=None):
         super().__init__(parent)
 
@@ -18,10 +21,14 @@ class MuVGraphVispyStacked(QWidget):
         self.preprocessing_controls = preprocessing_controls
         self.ica_manager = ica_manager
         self.data_collector = data_collector
+        self._last_frame_version = None
 
-        # Live update config - 16ms for 60fps rendering (smoother visuals)
-        self.update_speed_ms = 16
-        self.max_points = 1000
+        # Live update config - redraws are driven by the collector's frame_ready
+        # signal (about 60 fps while new samples arrive, none while idle)
+        self.updating = False
+        self.paused = False
+        self.max_points = 1000  # About the plot's pixel width; longer windows are min/max decimated
+        self.max_channels = 8  # Stacked rows; the trace visual itself has no channel limit
 
         # Visual + layout config
         self.offset_spacing = 130
@@ -34,44 +41,35 @@ class MuVGraphVispyStacked(QWidget):
         self.num_points = None
 
         # Elements
-        self.lines = []
+        self.traces = None  # StackedRingTraces: every channel in one GPU ring buffer
+        self.decimator = None  # MinMaxDecimator feeding the ring when the window exceeds max_points
+        self._bucket = 1
         self.labels = []
         self.separators = []
-        
-        # Performance caching for rendering
-        self._cached_position_arrays = {}  # Cache x/y position arrays per channel
-        self._last_active_channel_count = 0
+
+        # Ring upload state: absolute index of the newest uploaded sample and the
+        # config generation it was filtered with (a new one re-uploads the window)
+        self._uploaded_index = None
+        self._uploaded_generation = None
 
         self.last_time = time.time()
         self.init_ui()
-        self.init_timer()
 
     def init_ui(self):
         layout = QVBoxLayout(self)
-        colormap = get_colormap("cool")
 
         self.canvas = scene.SceneCanvas(keys=None, show=False, bgcolor="black", parent=self)
         self.view = self.canvas.central_widget.add_view()
         self.view.camera = 'panzoom'
-        self.view.camera.set_range(x=(0, 1), y=(-20, self.offset_spacing * 8 + 40))
+        self.view.camera.set_range(x=(0, 1), y=(-20, self.offset_spacing * self.max_channels + 40))
         self.view.camera.interactive = False
 
         layout.addWidget(self.canvas.native)
 
-        for i in range(8):
-            # Placeholder flat line per channel
-            x_placeholder = np.linspace(0, 1 - self.label_margin_ratio, 200)
-            x_placeholder += self.label_margin_ratio
-            y_placeholder = np.full_like(x_placeholder, (i + 0.5) * self.offset_spacing)
-
-            color = colormap.map(np.array([i / 8]))[0]
-            line = Line(
-                pos=np.column_stack((x_placeholder, y_placeholder)),
-                color=color,
-                parent=self.view.scene
-            )
-            self.lines.append(line)
+        # Placeholder flat lines until the first frame arrives
+        self._build_traces(self.max_channels, 200)
 
+        for i in range(self.max_channels):
             # Channel label
             label = Text(
                 text=f"Channel {i + 1}",
@@ -103,7 +101,7 @@ class MuVGraphVispyStacked(QWidget):
             parent=self.view.scene,
             anchor_x='center',
             anchor_y='top',
-            pos=(0.5, self.offset_spacing * 8 + 30)
+            pos=(0.5, self.offset_spacing * self.max_channels + 30)
         )
 
         # Pause button
@@ -112,18 +110,56 @@ class MuVGraphVispyStacked(QWidget):
         self.pause_button.clicked.connect(self.toggle_pause)
         layout.addWidget(self.pause_button)
 
-    def init_timer(self):
-        self.timer = QTimer(self)
-        self.timer.timeout.connect(self.update_plot)
-        # Do NOT start it here — it will be started only when the tab is activated
+    def _build_traces(self, n_channels, shown, bucket=1):
+        """
+        (Re)create the trace visual for `n_channels` rows of `shown` points each;
+        with bucket > 1 every point pair is the min/max of `bucket` samples.
+        """
+        self._bucket = bucket
+        self.decimator = MinMaxDecimator(n_channels, bucket, shown // 2 + 1) if bucket > 1 else None
+        if self.traces is not None:
+            self.traces.parent = None
+        colormap = get_colormap("cool")
+        colors = colormap.map(np.arange(n_channels) / self.max_channels)
+        self.traces = StackedRingTraces(n_channels, shown, colors, left=self.label_margin_ratio,
+                                        parent=self.view.scene)
+        # Flat lines at each row until data is written
+        rows = np.arange(n_channels)
+        self.traces.set_traces(np.zeros(n_channels), (rows + 0.5) * self.offset_spacing,
+                               np.zeros(n_channels), (rows + 0.5) * self.offset_spacing)
+        self._uploaded_index = None
+
+    def start_updates(self):
+        """Start redrawing on new frames (tab shown); draws the newest frame right away."""
+        self.updating = True
+        self._update_frame_demand()
+        if not self.paused:
+            self.update_plot()
+
+    def stop_updates(self):
+        self.updating = False
+        self._update_frame_demand()
+
+    def _update_frame_demand(self):
+        """Have the DSP worker compute this plot's stages only while it is shown and not paused."""
+        if self.data_collector is not None:
+            active = self.updating and not self.paused
+            self.data_collector.set_frame_demand(self, self.frame_stages if active else ())
+
+    def on_frame_ready(self, frame=None):
+        """Slot for CentralizedDataCollector.signals.frame_ready."""
+        if self.updating and not self.paused:
+            self.update_plot()
 
     def toggle_pause(self):
-        if self.timer.isActive():
-            self.timer.stop()
+        self.paused = not self.paused
+        self._update_frame_demand()
+        if self.paused:
             self.pause_button.setText("Resume")
         else:
-            self.timer.start(self.update_speed_ms)
             self.pause_button.setText("Pause")
+            if self.updating:
+                self.update_plot()
 
     def update_plot(self):
         if not self.board_shim or not self.BoardOnCheckBox.isChecked():
@@ -136,116 +172,90 @@ class MuVGraphVispyStacked(QWidget):
             self.num_points = int(4 * self.sampling_rate)  # 4-second window (33% less processing)
             print(f"Board Initialized: {len(self.eeg_channels)} EEG channels, {self.sampling_rate} Hz")
 
-        # Use centralized data collector
-        filtered_data = self.data_collector.collect_data_muV() if self.data_collector else None
-        
-        if filtered_data is None:
+        # Render the DSP worker's newest frame; skip the redraw if nothing new arrived
+        frame = self.data_collector.latest_frame() if self.data_collector else None
+        if frame is None or frame.version == self._last_frame_version:
             return
+        self._last_frame_version = frame.version
+        window = frame.window
 
-        track_height = self.offset_spacing * 0.8
-        # Only update channels that have data - performance optimization
-        num_active = min(len(self.eeg_channels), len(filtered_data))
-        
-        # Track if channel count changed to clear position cache
-        if num_active != self._last_active_channel_count:
-            self._cached_position_arrays.clear()
-            self._last_active_channel_count = num_active
-
-        for idx, line in enumerate(self.lines):
-            # Only process and render active channels
-            if idx < num_active:
-                # ─── Active channel plotting ────────────────────────────
-                channel = self.eeg_channels[idx]
-                y = filtered_data[channel]
-                
-                # Cache x array computation - only depends on data length and sampling rate
-                data_len = len(y)
-                cache_key = f"x_{data_len}"
-                if cache_key not in self._cached_position_arrays:
-                    self._cached_position_arrays[cache_key] = np.linspace(0, data_len / self.sampling_rate, data_len)
-                x = self._cached_position_arrays[cache_key]
-
-                # Trim to max_points
-                if len(x) > self.max_points:
-                    x = x[-self.max_points:]
-                    y = y[-self.max_points:]
-
-                smoothing_on = (
-                        self.preprocessing_controls["Average"].isChecked()
-                        or self.preprocessing_controls["Median"].isChecked()
-                )
-
-                if smoothing_on:
-                    # Lock amplitude range once
-                    if self._fixed_amp_range is None:
-                        peak = max(abs(y.min()), abs(y.max()), 1e-6)
-                        self._fixed_amp_range = peak
-
-                    amp = self._fixed_amp_range
-                    y_clamped = np.clip(y, -amp, amp)
-                    y_scaled = (y_clamped / amp) * (track_height / 2)
-
-
-                else:
-                    # Reset for next smoothing
-                    self._fixed_amp_range = None
-
-                    # Dynamic min/max → [0…1]
-                    y_min, y_max = y.min(), y.max()
-                    if y_max - y_min != 0:
-                        y_norm = (y - y_min) / (y_max - y_min)
-                    else:
-                        y_norm = np.zeros_like(y)
-
-                    # Scale + mean-lock
-                    y_scaled = y_norm * track_height
-                    curr_mean = y_scaled.mean()
-                    desired_mean = track_height / 2
-                    y_scaled = y_scaled - curr_mean + desired_mean
-
-                # ─── FLAT-LINE THE OLDEST PORTION ALWAYS ───────────────────
-                # Slightly reduce height
-                y_scaled *= 0.95
-                flat_duration_s = 0.1  # or 0.2 if you prefer
-                flat_pts = min(int(flat_duration_s * self.sampling_rate), len(y_scaled))
-                y_scaled[:flat_pts] = 0
-
-                # Vertical stacking: centered if smoothing, else original
-                if smoothing_on:
-                    offset_y = y_scaled + (idx + 0.5) * self.offset_spacing
-                else:
-                    offset_y = y_scaled + (idx + 0.20) * self.offset_spacing
-
-                # X scaling - cache when possible
-                x_max = x.max()
-                if x_max != 0:
-                    x_cache_key = f"xscale_{data_len}"
-                    if x_cache_key not in self._cached_position_arrays:
-                        # Cache the scaled x positions (same for all channels with same data length)
-                        x_scaled = (x / x_max) * (1 - self.label_margin_ratio) + self.label_margin_ratio
-                        self._cached_position_arrays[x_cache_key] = x_scaled
-                    else:
-                        x_scaled = self._cached_position_arrays[x_cache_key]
-                else:
-                    x_scaled = x + self.label_margin_ratio
-
-                # Draw and show - use pre-allocated column_stack
-                line.set_data(np.column_stack((x_scaled, offset_y)))
-                line.visible = True
-                # Ensure labels and separators are visible for active channels
-                if idx < len(self.labels):
-                    self.labels[idx].visible = True
-                if idx < len(self.separators):
-                    self.separators[idx].visible = True
-            else:
-                # Hide inactive channels for better performance - no rendering overhead
-                line.visible = False
-                # Also hide labels and separators for inactive channels
-                if idx < len(self.labels):
-                    self.labels[idx].visible = False
-                if idx < len(self.separators):
-                    self.separators[idx].visible = False
-
-
-
+        if window is None or window.shape[1] == 0:
+            return
 
+        # Read the preprocessing snapshot once per frame instead of the widgets per channel
+        config = self.data_collector.get_config()
+        smoothing_on = config.smoothing
+
+        # Only draw channels that have data - inactive rows are not in the visual at all
+        num_active = min(len(self.eeg_channels), window.shape[0], self.max_channels)
+        # Show the whole window; beyond max_points samples (fast boards) reduce each
+        # channel to a min/max pair per bucket instead of dropping the older samples
+        bucket = -(-self.num_points // self.max_points)
+        shown = self.num_points if bucket == 1 else 2 * -(-self.num_points // bucket)
+        if self.traces.n_traces != num_active or self.traces.shown != shown or self._bucket != bucket:
+            self._build_traces(num_active, shown, bucket)
+        for idx in range(self.max_channels):
+            self.labels[idx].visible = idx < num_active
+            self.separators[idx].visible = idx < num_active
+
+        # ─── Upload only the samples the GPU ring has not seen ───────────
+        data = window[:num_active, -self.num_points:]  # Shorter only right after start
+        index = frame.window_index
+        last = self._uploaded_index
+        incremental = (
+            last is not None
+            and frame.generation == self._uploaded_generation
+            and self.data_collector.windows_are_shifts(config)
+            and 0 <= index - last < data.shape[1]
+            and (self.decimator is None or self.decimator.next_index == last)
+        )
+        # Otherwise detrend/smoothing/ICA or a new config rewrote the past: send the whole window
+        new = index - last if incremental else data.shape[1]
+        if new:
+            block = data[:, data.shape[1] - new:]
+            if self.decimator is None:
+                self.traces.write(block, index - new)
+            else:
+                # Only the buckets the new samples fall in are recomputed and uploaded
+                since = self.decimator.completed_points if incremental else None
+                if not incremental:
+                    self.decimator.reset()
+                self.decimator.update(block, index - new)
+                first, points, _ = self.decimator.points(since)
+                self.traces.write(points, first)
+        self._uploaded_index = index
+        self._uploaded_generation = frame.generation
+
+        # ─── Per-channel scale/offset as shader uniforms ─────────────────
+        track_height = self.offset_spacing * 0.8
+        rows = np.arange(num_active)
+        if smoothing_on:
+            # Lock amplitude range once (from the first channel), clamp to it
+            if self._fixed_amp_range is None:
+                self._fixed_amp_range = max(abs(data[0].min()), abs(data[0].max()), 1e-6)
+            amp = self._fixed_amp_range
+            baseline = (rows + 0.5) * self.offset_spacing  # Centered
+            scale = np.full(num_active, 0.95 * (track_height / 2) / amp)
+            offset = baseline
+            clip = np.full(num_active, amp)
+        else:
+            # Reset for next smoothing
+            self._fixed_amp_range = None
+
+            # Dynamic min/max → track height, mean-locked to the middle of the track
+            # (same mapping as normalising, rescaling and re-centering each sample)
+            y_min = data.min(axis=1)
+            y_max = data.max(axis=1)
+            y_range = y_max - y_min
+            baseline = (rows + 0.20) * self.offset_spacing
+            scale = np.divide(0.95 * track_height, y_range, out=np.zeros(num_active), where=y_range != 0)
+            offset = baseline + 0.95 * track_height / 2 - scale * data.mean(axis=1)
+            clip = np.zeros(num_active)
+        self.traces.set_traces(scale, offset, clip, baseline)
+
+        # ─── FLAT-LINE THE OLDEST PORTION ALWAYS ───────────────────
+        flat_duration_s = 0.1  # or 0.2 if you prefer
+        flat_pts = int(flat_duration_s * self.sampling_rate)
+        if bucket > 1:
+            flat_pts = 2 * -(-flat_pts // bucket)
+        self.traces.set_flat(min(flat_pts, shown))
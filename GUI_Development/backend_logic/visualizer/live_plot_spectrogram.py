@@ -0,0 +1,148 @@
+import pyqtgraph as pg
+import numpy as np
+from PyQt5.QtCore import QRectF
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QComboBox, QLabel
+from brainflow.board_shim import BoardShim
+
+
+class SpectrogramGraph(QWidget):
+    """
+    Rolling time-frequency view of one channel.
+
+    The collector's Welch pass appends one dB column per segment hop into a
+    mirrored ring (CentralizedDataCollector.get_spectrogram), so the newest
+    columns are always one contiguous view. This widget only hands that view to
+    an ImageItem when a new column arrived; the history is never recomputed.
+    """
+
+    frame_stages = ("spectrogram",)  # DSPFrame stages this plot draws from
+
+    def __init__(self, board_shim, BoardOnCheckBox, preprocessing_controls, ica_manager=None, data_collector=None, parent=None):
+        super().__init__(parent)
+
+        self.board_shim = board_shim
+        self.BoardOnCheckBox = BoardOnCheckBox
+        self.preprocessing_controls = preprocessing_controls
+        self.ica_manager = ica_manager
+        self.data_collector = data_collector
+        self._last_column_count = None
+
+        self.eeg_channels = None
+        self.sampling_rate = None
+        self.max_freq = 60.0  # Hz shown on the y axis
+
+        # Colour scale (dB), refitted every `levels_every` new columns
+        self._levels = None
+        self._columns_since_levels = 0
+        self.levels_every = 20
+
+        # Redraws are driven by the collector's frame_ready signal; a new
+        # column arrives once per Welch segment hop
+        self.updating = False
+        self.paused = False
+
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.plot = pg.PlotWidget(title="Spectrogram")
+        self.plot.setLabel("bottom", "Time (s)")
+        self.plot.setLabel("left", "Frequency (Hz)")
+        self.plot.setMouseEnabled(x=False, y=False)
+        layout.addWidget(self.plot)
+
+        self.image = pg.ImageItem(axisOrder='row-major')  # image[freq, time]
+        self.image.setLookupTable(pg.colormap.get('viridis').getLookupTable(nPts=256))
+        self.plot.addItem(self.image)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Channel:"))
+        self.channel_box = QComboBox()
+        self.channel_box.currentIndexChanged.connect(self._on_channel_changed)
+        controls.addWidget(self.channel_box)
+        controls.addStretch(1)
+        layout.addLayout(controls)
+
+        self.pause_button = QPushButton("Pause")
+        self.pause_button.setStyleSheet("font-family: 'Montserrat ExtraBold';")
+        self.pause_button.clicked.connect(self.toggle_pause)
+        layout.addWidget(self.pause_button)
+
+    def start_updates(self):
+        """Start redrawing on new frames (tab shown); draws the newest columns right away."""
+        self.updating = True
+        self._update_frame_demand()
+        self._last_column_count = None
+        if not self.paused:
+            self.update_plot()
+
+    def stop_updates(self):
+        self.updating = False
+        self._update_frame_demand()
+
+    def _update_frame_demand(self):
+        """Have the DSP worker compute this plot's stages only while it is shown and not paused."""
+        if self.data_collector is not None:
+            active = self.updating and not self.paused
+            self.data_collector.set_frame_demand(self, self.frame_stages if active else ())
+
+    def on_frame_ready(self, frame=None):
+        """Slot for CentralizedDataCollector.signals.frame_ready."""
+        if self.updating and not self.paused:
+            self.update_plot()
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+        self._update_frame_demand()
+        if self.paused:
+            self.pause_button.setText("Resume")
+        else:
+            self.pause_button.setText("Pause")
+            if self.updating:
+                self.update_plot()
+
+    def _on_channel_changed(self, index):
+        self._levels = None
+        self._last_column_count = None
+        if self.updating and not self.paused:
+            self.update_plot()
+
+    def update_plot(self):
+        if not self.board_shim or not self.BoardOnCheckBox.isChecked():
+            return
+
+        if self.eeg_channels is None or self.sampling_rate is None:
+            self.eeg_channels = BoardShim.get_eeg_channels(self.board_shim.get_board_id())
+            self.sampling_rate = BoardShim.get_sampling_rate(self.board_shim.get_board_id())
+            self.channel_box.blockSignals(True)
+            self.channel_box.clear()
+            self.channel_box.addItems([f"Ch {i + 1}" for i in range(len(self.eeg_channels))])
+            self.channel_box.blockSignals(False)
+            print(f"Spectrogram Init: {len(self.eeg_channels)} channels, {self.sampling_rate} Hz")
+
+        spectrogram = self.data_collector.get_spectrogram() if self.data_collector else None
+        if spectrogram is None:
+            return
+        freqs, seconds_per_column, columns, column_count = spectrogram
+        if column_count == self._last_column_count:
+            return  # No new column since the last redraw
+        new_columns = column_count - (self._last_column_count or 0)
+        self._last_column_count = column_count
+
+        channel = min(max(self.channel_box.currentIndex(), 0), columns.shape[0] - 1)
+        n_bins = int(np.searchsorted(freqs, self.max_freq, side='right'))
+        # Copy the newest columns so the worker can keep writing the ring while Qt paints
+        image = np.array(columns[channel, :n_bins])
+
+        self._columns_since_levels += new_columns
+        if self._levels is None or self._columns_since_levels >= self.levels_every:
+            low, high = np.percentile(image, (5, 99.5))
+            self._levels = (low, max(high, low + 1e-6))
+            self._columns_since_levels = 0
+        self.image.setImage(image, autoLevels=False, levels=self._levels)
+
+        # Newest column ends at t = 0; each column spans one segment hop
+        n_cols = image.shape[1]
+        df = freqs[1] - freqs[0]
+        self.image.setRect(QRectF(-n_cols * seconds_per_column, -df / 2, n_cols * seconds_per_column, n_bins * df))
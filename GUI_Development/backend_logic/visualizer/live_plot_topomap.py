@@ -0,0 +1,207 @@
+import os
+import numpy as np
+from PyQt5.QtWidgets import QWidget, QVBoxLayout, QHBoxLayout, QPushButton, QComboBox, QLabel
+from brainflow.board_shim import BoardShim
+from mindstream_shared.topomap import TopomapView, ring_positions
+
+# Optional electrode of each board channel (channel 1 first), comma or line
+# separated, e.g. "FC4, C4, CP4, C2, C1, CP3, C3, FC3" for the MRCP motor-strip
+# cap. Overrides the board's own channel names.
+ELECTRODES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "topomap_electrodes.txt")
+
+KINDS = {
+    "Absolute (µV²)": "absolute",
+    "Relative": "relative",
+    "ERD (%)": "erd",
+}
+
+
+def load_electrode_names(board_id, path=ELECTRODES_FILE):
+    """
+    Electrode names of the board's EEG channels: from `path` if it exists,
+    otherwise BrainFlow's board description. None when neither has them.
+    """
+    try:
+        if os.path.exists(path):
+            with open(path, "r", encoding="utf-8") as f:
+                names = [n.strip() for n in f.read().replace("\n", ",").split(",") if n.strip()]
+            if names:
+                return names
+    except Exception:
+        pass
+    try:
+        return list(BoardShim.get_eeg_names(board_id))
+    except Exception:
+        return None
+
+
+class TopomapGraph(QWidget):
+    """
+    Live scalp map of one band's power from the collector's band-power engine.
+
+    The interpolation operator is built once for the channel set (TopomapView);
+    a new Welch spectrum costs one matrix-vector product and an image swap.
+    Electrodes come from load_electrode_names(); without names that have 10-10
+    positions the channels are drawn on a labelled placeholder ring.
+    """
+
+    frame_stages = ("bands",)  # DSPFrame stages this plot draws from
+
+    def __init__(self, board_shim, BoardOnCheckBox, preprocessing_controls, ica_manager=None, data_collector=None, parent=None):
+        super().__init__(parent)
+
+        self.board_shim = board_shim
+        self.BoardOnCheckBox = BoardOnCheckBox
+        self.preprocessing_controls = preprocessing_controls
+        self.ica_manager = ica_manager
+        self.data_collector = data_collector
+        self._last_sample_index = None
+
+        self.eeg_channels = None
+        self.channel_names = None  # Set from load_electrode_names() on the first update
+        self._layout_note = ""
+
+        # Colour levels follow the map's range slowly to avoid flicker
+        self._levels = None
+        self.levels_alpha = 0.2
+
+        # Redraws are driven by the collector's frame_ready signal; the map only
+        # changes when a new Welch segment completed
+        self.updating = False
+        self.paused = False
+
+        self.init_ui()
+
+    def init_ui(self):
+        layout = QVBoxLayout(self)
+
+        self.view = TopomapView()
+        layout.addWidget(self.view)
+
+        controls = QHBoxLayout()
+        controls.addWidget(QLabel("Band:"))
+        self.band_box = QComboBox()
+        self.band_box.currentIndexChanged.connect(self._on_selection_changed)
+        controls.addWidget(self.band_box)
+        controls.addWidget(QLabel("Power:"))
+        self.kind_box = QComboBox()
+        self.kind_box.addItems([label for label, kind in KINDS.items() if kind != "erd"])  # ERD once a baseline exists
+        self.kind_box.currentIndexChanged.connect(self._on_selection_changed)
+        controls.addWidget(self.kind_box)
+        self.status = QLabel("")
+        controls.addWidget(self.status)
+        controls.addStretch(1)
+        layout.addLayout(controls)
+
+        self.pause_button = QPushButton("Pause")
+        self.pause_button.setStyleSheet("font-family: 'Montserrat ExtraBold';")
+        self.pause_button.clicked.connect(self.toggle_pause)
+        layout.addWidget(self.pause_button)
+
+    def start_updates(self):
+        """Start redrawing on new frames (tab shown); draws the newest map right away."""
+        self.updating = True
+        self._update_frame_demand()
+        self._last_sample_index = None
+        if not self.paused:
+            self.update_plot()
+
+    def stop_updates(self):
+        self.updating = False
+        self._update_frame_demand()
+
+    def _update_frame_demand(self):
+        """Have the DSP worker compute this plot's stages only while it is shown and not paused."""
+        if self.data_collector is not None:
+            active = self.updating and not self.paused
+            self.data_collector.set_frame_demand(self, self.frame_stages if active else ())
+
+    def on_frame_ready(self, frame=None):
+        """Slot for CentralizedDataCollector.signals.frame_ready."""
+        if self.updating and not self.paused:
+            self.update_plot()
+
+    def toggle_pause(self):
+        self.paused = not self.paused
+        self._update_frame_demand()
+        if self.paused:
+            self.pause_button.setText("Resume")
+        else:
+            self.pause_button.setText("Pause")
+            if self.updating:
+                self.update_plot()
+
+    def _on_selection_changed(self, index):
+        self._levels = None
+        self._last_sample_index = None
+        if self.updating and not self.paused:
+            self.update_plot()
+
+    def update_plot(self):
+        if not self.board_shim or not self.BoardOnCheckBox.isChecked():
+            return
+
+        if self.eeg_channels is None:
+            self.eeg_channels = BoardShim.get_eeg_channels(self.board_shim.get_board_id())
+            print(f"Topomap Init: {len(self.eeg_channels)} channels")
+        if self.channel_names is None:
+            self._init_channel_names()
+
+        frame = self.data_collector.latest_frame() if self.data_collector else None
+        bands = frame.bands if frame is not None else None
+        if bands is None or bands.sample_index == self._last_sample_index:
+            return  # No new spectrum since the last redraw
+        self._last_sample_index = bands.sample_index
+
+        if self.band_box.count() != len(bands.names):
+            self.band_box.blockSignals(True)
+            self.band_box.clear()
+            self.band_box.addItems([name.capitalize() for name in bands.names])
+            if "alpha" in bands.names:
+                self.band_box.setCurrentIndex(bands.names.index("alpha"))
+            self.band_box.blockSignals(False)
+
+        # ERD (%) is offered only while the band powers carry one (a baseline was recorded)
+        labels = [label for label, kind in KINDS.items() if kind != "erd" or bands.erd is not None]
+        if [self.kind_box.itemText(i) for i in range(self.kind_box.count())] != labels:
+            current = self.kind_box.currentText()
+            self.kind_box.blockSignals(True)
+            self.kind_box.clear()
+            self.kind_box.addItems(labels)
+            self.kind_box.setCurrentIndex(labels.index(current) if current in labels else 0)
+            self.kind_box.blockSignals(False)
+            if self.kind_box.currentText() != current:
+                self._levels = None
+
+        kind = KINDS[self.kind_box.currentText()]
+        values = bands.band(bands.names[max(self.band_box.currentIndex(), 0)], kind)
+        if values is None:
+            return
+        self.status.setText(self._layout_note)
+
+        # Operator is only rebuilt when the channel count changes
+        n = min(len(values), len(self.channel_names))
+        self.view.set_channels(self.channel_names[:n])
+        values = values[:n]
+
+        low, high = float(np.min(values)), float(np.max(values))
+        if self._levels is None:
+            self._levels = (low, high)
+        else:
+            a = self.levels_alpha
+            self._levels = (a * low + (1 - a) * self._levels[0], a * high + (1 - a) * self._levels[1])
+        levels = (self._levels[0], max(self._levels[1], self._levels[0] + 1e-6))
+        self.view.set_values(values, levels)
+
+    def _init_channel_names(self):
+        """Electrode per channel; falls back to a placeholder ring of Ch1..ChN."""
+        n_ch = len(self.eeg_channels)
+        names = load_electrode_names(self.board_shim.get_board_id()) or []
+        names = names[:n_ch]
+        if sum(name in self.view.positions for name in names) >= 3:
+            self.channel_names = names
+            self._layout_note = ""
+            return
+        self.channel_names = [f"Ch{i + 1}" for i in range(n_ch)]
+        self.view.positions.update(ring_positions(self.channel_names))
+        self._layout_note = "Generic layout (electrode positions unknown)"
@@ -0,0 +1,212 @@
+import time
+import logging
+from collections import deque
+from dataclasses import dataclass, field
+from typing import Callable, Optional
+from PyQt5.QtCore import QObject, QTimer, Qt
+from PyQt5.QtGui import QGuiApplication
+
+
+@dataclass
+class _Client:
+    render: Callable[[], None]
+    visible: Optional[Callable[[], bool]]
+    continuous: bool      # Redraw every frame while visible (timeline, cue window)
+    essential: bool       # Never skipped for budget reasons; must be cheap
+    paint_widget: Optional[object] = None  # Painted synchronously after render() so the paint is timed too
+    dirty: bool = False
+    avg_ms: float = 0.0   # Median of the recent render times; one slow frame does not move it
+    recent_ms: deque = field(default_factory=lambda: deque(maxlen=9))
+    last_frame: int = -1  # Frame number of the last render
+    last_render_at: float = 0.0  # perf_counter() of the last render
+    rendered: int = 0
+    skipped: int = 0
+    skipped_in_row: int = 0
+
+
+class RenderScheduler(QObject):
+    """
+    One display-rate tick for every live visual in the GUI thread.
+
+    Clients (graphs, the trial timeline, the cue window) register a render
+    callback instead of redrawing from their own timers or signals. Data
+    producers only mark a client dirty with request(); each frame the scheduler
+    renders the dirty, visible clients (longest-waiting first) and measures how
+    long each takes. A client registered with a `paint_widget` has that widget
+    repainted right after its render callback, inside the timed section: Qt
+    widgets (pyqtgraph setData, vispy update()) otherwise only paint later in
+    a paint event, and the measured time would miss the actual drawing.
+
+    A frame may spend at most `budget_fraction` of the refresh interval. Clients
+    whose smoothed render time no longer fits are skipped and stay dirty, so
+    they draw on a later frame instead of stalling the event loop.
+
+    Recording first: while a TimingEngine run is active, frames are started right
+    after an engine tick and only spend the time left before the next one, so
+    engine ticks and the recording work queued behind them are not held up by
+    drawing. A plot too slow for that gap is still drawn once every
+    `resample_ms` during a run, which also re-measures it, so one slow render
+    (the first one, say) cannot freeze it for the whole run. Outside runs a
+    client that keeps getting skipped is drawn anyway after `max_skipped`
+    frames. Either way at most one such forced client is drawn per frame.
+    """
+
+    def __init__(self, timing_engine=None, budget_fraction=0.5, max_skipped=15, resample_ms=1000.0, parent=None):
+        super().__init__(parent)
+        self.logger = logging.getLogger(__name__)
+        self.engine = timing_engine
+        self.budget_fraction = float(budget_fraction)
+        self.max_skipped = int(max_skipped)
+        self.resample_ms = float(resample_ms)
+        self._clients = {}
+        self._frame = 0
+        self._last_frame_at = 0.0
+        self._engine_tick_at = None
+        self._engine_frame_pending = False
+
+        # Qt widgets get no vsync callback; pace the tick at the screen's refresh rate
+        refresh_hz = 60.0
+        try:
+            screen = QGuiApplication.primaryScreen()
+            if screen is not None and screen.refreshRate() > 1:
+                refresh_hz = float(screen.refreshRate())
+        except Exception:
+            pass
+        self.interval_ms = 1000.0 / refresh_hz
+
+        self._timer = QTimer(self)
+        self._timer.setTimerType(Qt.PreciseTimer)
+        self._timer.timeout.connect(self._on_timer)
+
+        if self.engine is not None:
+            try:
+                self.engine.tick_8ms.connect(self._on_engine_tick)
+            except Exception:
+                pass
+
+    # ─── Clients ───
+
+    def add(self, name, render, visible=None, continuous=False, essential=False, paint_widget=None):
+        """
+        Register `render` under `name`. `visible` returns whether the client is
+        on screen (default: always); continuous clients redraw every frame while
+        visible, the others only after request(name). `paint_widget` (the
+        client's QWidget) is repainted after each render so its paint is timed.
+        """
+        self._clients[name] = _Client(render, visible, bool(continuous), bool(essential), paint_widget)
+
+    def remove(self, name):
+        self._clients.pop(name, None)
+
+    def request(self, name):
+        """Mark a client as needing a redraw on the next frame."""
+        client = self._clients.get(name)
+        if client is not None:
+            client.dirty = True
+
+    def request_all(self):
+        for client in self._clients.values():
+            client.dirty = True
+
+    def stats(self):
+        """Per client: smoothed render time (ms), frames rendered and frames skipped."""
+        return {name: {"avg_ms": c.avg_ms, "rendered": c.rendered, "skipped": c.skipped}
+                for name, c in self._clients.items()}
+
+    # ─── Pacing ───
+
+    def start(self):
+        if not self._timer.isActive():
+            self._timer.start(max(1, int(self.interval_ms)))
+
+    def stop(self):
+        self._timer.stop()
+
+    @property
+    def frame_budget_ms(self):
+        return self.interval_ms * self.budget_fraction
+
+    def _run_active(self):
+        return bool(self.engine is not None and getattr(self.engine, "run_active", False))
+
+    def _on_timer(self):
+        # During a run frames are phase-locked to the engine tick instead
+        if self._run_active() and self._engine_tick_at is not None:
+            return
+        self._render_frame()
+
+    def _on_engine_tick(self, now_ms, sched_ms):
+        if not self._run_active():
+            self._engine_tick_at = None
+            return
+        self._engine_tick_at = time.perf_counter()
+        # The tick nearest to a refresh interval after the last frame starts the next one
+        half_tick = float(getattr(self.engine, "interval_ms", 8)) / 2.0
+        due = (self._engine_tick_at - self._last_frame_at) * 1000.0 >= self.interval_ms - half_tick
+        if due and not self._engine_frame_pending:
+            # Queued behind the tick's own slots (recording, timeline state)
+            self._engine_frame_pending = True
+            QTimer.singleShot(0, self._render_after_engine_tick)
+
+    def _render_after_engine_tick(self):
+        self._engine_frame_pending = False
+        self._render_frame()
+
+    def _limit_ms(self, now):
+        """Time this frame may spend on non-essential clients."""
+        limit = self.frame_budget_ms
+        if self._run_active() and self._engine_tick_at is not None:
+            interval = float(getattr(self.engine, "interval_ms", 8))
+            until_next_tick = interval - (now - self._engine_tick_at) * 1000.0 - 1.0  # 1 ms margin
+            limit = min(limit, until_next_tick)
+        return limit
+
+    def _render_frame(self):
+        start = time.perf_counter()
+        self._last_frame_at = start
+        self._frame += 1
+        limit = self._limit_ms(start)
+        recording_first = self._run_active()
+
+        pending = []
+        for name, client in self._clients.items():
+            if not (client.dirty or client.continuous):
+                continue
+            try:
+                if client.visible is not None and not client.visible():
+                    continue
+            except Exception:
+                continue
+            pending.append((name, client))
+        # Essential clients first, then the longest-waiting
+        pending.sort(key=lambda item: (not item[1].essential, item[1].last_frame))
+
+        spent_ms = 0.0
+        drew_optional = False
+        for name, client in pending:
+            if not client.essential and spent_ms + client.avg_ms > limit:
+                if recording_first:
+                    starving = (start - client.last_render_at) * 1000.0 >= self.resample_ms
+                else:
+                    starving = client.skipped_in_row >= self.max_skipped
+                if drew_optional or not starving:
+                    client.skipped += 1
+                    client.skipped_in_row += 1
+                    continue
+            t0 = time.perf_counter()
+            client.dirty = False
+            try:
+                client.render()
+                if client.paint_widget is not None:
+                    client.paint_widget.repaint()
+            except Exception as e:
+                self.logger.error(f"Render of '{name}' failed: {e}")
+            elapsed_ms = (time.perf_counter() - t0) * 1000.0
+            client.recent_ms.append(elapsed_ms)
+            client.avg_ms = sorted(client.recent_ms)[len(client.recent_ms) // 2]
+            client.rendered += 1
+            client.skipped_in_row = 0
+            client.last_frame = self._frame
+            client.last_render_at = t0
+            spent_ms += elapsed_ms
+            drew_optional = drew_optional or not client.essential
@@ -0,0 +1,154 @@
+import numpy as np
+from vispy import gloo
+from vispy.visuals import Visual
+from vispy.scene.visuals import create_visual_node
+
+
+_VERTEX = """
+attribute float a_value;    // Sample value, written once per sample
+attribute float a_slot;     // Ring slot of this vertex (static)
+attribute float a_trace;    // Trace row of this vertex (static)
+attribute vec4 a_color;     // Trace colour (static)
+
+uniform float u_head;       // Ring slot of the newest sample
+uniform float u_capacity;   // Slots per trace
+uniform float u_shown;      // Samples drawn per trace (<= capacity - 1)
+uniform float u_flat;       // Oldest samples drawn flat at the trace baseline
+uniform float u_left;       // x of the oldest sample; the newest is at x = 1
+uniform vec4 u_traces[%d];  // Per trace: (scale, offset, clip amplitude or 0, baseline)
+
+varying vec4 v_color;
+varying float v_visible;
+
+void main() {
+    float age = mod(u_head - a_slot + u_capacity, u_capacity);  // 0 = newest
+    vec4 trace = u_traces[int(a_trace + 0.5)];
+
+    float y = a_value;
+    if (trace.z > 0.0) {
+        y = clamp(y, -trace.z, trace.z);
+    }
+    y = y * trace.x + trace.y;
+    if (age >= u_shown - u_flat) {
+        y = trace.w;
+    }
+    float x = u_left + (1.0 - u_left) * (1.0 - age / max(u_shown - 1.0, 1.0));
+
+    v_color = a_color;
+    v_visible = age < u_shown ? 1.0 : 0.0;
+    gl_Position = $transform(vec4(x, y, 0.0, 1.0));
+}
+"""
+
+_FRAGMENT = """
+varying vec4 v_color;
+varying float v_visible;
+
+void main() {
+    // Drops the segment joining the newest sample to the spare slot behind it
+    if (v_visible < 0.999) {
+        discard;
+    }
+    gl_FragColor = v_color;
+}
+"""
+
+
+class StackedRingTraceVisual(Visual):
+    """
+    Every channel of a scrolling multi-trace plot in one line visual.
+
+    Samples live in a persistent GPU ring: (capacity, n_traces) float32 values,
+    slot-major so the newest samples of all traces are one contiguous upload.
+    Slot, trace and colour attributes and the line index buffer are uploaded
+    once. Scrolling is a `u_head` uniform and the per-trace scale/offset/clip a
+    uniform array, so a frame uploads only its new samples plus a few uniforms.
+
+    One slot per trace is kept spare (capacity = shown + 1): it separates the
+    newest sample from the oldest so the wrap-around segment is never drawn.
+    """
+
+    def __init__(self, n_traces, shown, colors, left=0.0):
+        self.n_traces = int(n_traces)
+        self.shown = int(shown)
+        self.capacity = self.shown + 1
+        self._head = 0
+        self._count = None  # Absolute index one past the newest written sample
+
+        n, cap = self.n_traces, self.capacity
+        slots = np.repeat(np.arange(cap, dtype=np.float32), n)
+        traces = np.tile(np.arange(n, dtype=np.float32), cap)
+        colors = np.asarray(colors, dtype=np.float32).reshape(n, 4)
+        # Line segments slot i → i + 1 of each trace, including the (hidden) wrap
+        vertex = np.arange(cap * n, dtype=np.uint32).reshape(cap, n)
+        segments = np.stack((vertex, np.roll(vertex, -1, axis=0)), axis=-1)
+
+        self._values = gloo.VertexBuffer(np.zeros(cap * n, dtype=np.float32))
+        self._indices = gloo.IndexBuffer(segments.transpose(1, 0, 2).reshape(-1, 2))
+
+        Visual.__init__(self, vcode=_VERTEX % n, fcode=_FRAGMENT)
+        self.shared_program['a_value'] = self._values
+        self.shared_program['a_slot'] = gloo.VertexBuffer(slots)
+        self.shared_program['a_trace'] = gloo.VertexBuffer(traces)
+        self.shared_program['a_color'] = gloo.VertexBuffer(np.tile(colors, (cap, 1)))
+        self.shared_program['u_capacity'] = float(cap)
+        self.shared_program['u_shown'] = float(self.shown)
+        self.shared_program['u_head'] = 0.0
+        self.shared_program['u_flat'] = 0.0
+        self.shared_program['u_left'] = float(left)
+        self.shared_program['u_traces'] = np.zeros((n, 4), dtype=np.float32)
+
+        self._index_buffer = self._indices
+        self._draw_mode = 'lines'
+        self.set_gl_state('translucent', depth_test=False)
+
+    @property
+    def count(self):
+        return self._count
+
+    def write(self, block, first_index):
+        """
+        Upload a (n_traces, k) block whose first sample has absolute index
+        `first_index`; only the slots those samples land in are written.
+        """
+        k = block.shape[1]
+        if k == 0:
+            return
+        if k > self.capacity:
+            first_index += k - self.capacity
+            block = block[:, -self.capacity:]
+            k = self.capacity
+        values = np.ascontiguousarray(block.T, dtype=np.float32)  # Slot-major
+        cap, n = self.capacity, self.n_traces
+        start = first_index % cap
+        first = min(k, cap - start)
+        self._values.set_subdata(values[:first].ravel(), offset=start * n)
+        if k > first:
+            self._values.set_subdata(values[first:].ravel(), offset=0)
+
+        self._count = first_index + k
+        self._head = (self._count - 1) % cap
+        self.shared_program['u_head'] = float(self._head)
+        self.update()
+
+    def set_traces(self, scale, offset, clip, baseline):
+        """Per-trace y = clip(value) * scale + offset; `baseline` is the flat-line level."""
+        traces = np.column_stack((scale, offset, clip, baseline)).astype(np.float32)
+        self.shared_program['u_traces'] = traces
+        self.update()
+
+    def set_flat(self, flat_samples):
+        self.shared_program['u_flat'] = float(flat_samples)
+        self.update()
+
+    def _prepare_transforms(self, view):
+        view.view_program.vert['transform'] = view.transforms.get_transform()
+
+    def _prepare_draw(self, view):
+        return True
+
+    def _compute_bounds(self, axis, view):
+        return None
+
+
+StackedRingTraces = create_visual_node(StackedRingTraceVisual)
@@ -353,7 +353,7 @@ class MenuHandler:
 <pre>ch1, ch2, ch3, ch4, ch5, ch6, ch7, ch8, global_s, trial_s</pre>
 <ul>
   <li><b>global_s:</b> Run-relative seconds.</li>
-  <li><b>trial_s:</b> Onset-relative seconds. During buffer rows, values are prefixed with <b>"B - "</b>.</li>
+  <li><b>trial_s:</b> Onset-relative seconds. During buffer rows, values are prefixed with <b>"B - "</b> (or, with <code>csv_buffer_flags = 'column'</code>, stay numeric and a last <code>is_buffer</code> column holds 0/1).</li>
   <li>Values are floating-point with 10 decimal places.</li>
   <li>Ordering is preserved across channels.</li>
   <li>Sampling aligned to engine ticks at 125 Hz.</li>
@@ -654,7 +654,7 @@ class MenuHandler:
   <li>Transposed again to <b>(N_samples, 10)</b> so each row is one sample timestamp.</li>
   <li><b>Header:</b> <code>ch1,ch2,ch3,ch4,ch5,ch6,ch7,ch8,global_s,trial_s</code></li>
   <li><b>Data Rows:</b> Each row = one 125 Hz sample; floating-point with 10 decimal places.</li>
-  <li><b>Buffer Indication:</b> When <code>engine.phase == 'buffer'</code>, the <code>trial_s</code> cell is prefixed with <b>"B - "</b> (e.g., "B - -2.9920000000").</li>
+  <li><b>Buffer Indication:</b> When <code>engine.phase == 'buffer'</code>, the <code>trial_s</code> cell is prefixed with <b>"B - "</b> (e.g., "B - -2.9920000000"). With <code>csv_buffer_flags = 'column'</code> the flag is written as a separate 0/1 <code>is_buffer</code> column instead.</li>
   <li><b>Result:</b> Long-format CSV; many rows (one per sample), 10 columns. Compatible with spreadsheet tools like Excel that handle rows >> columns.</li>
 </ul>
 
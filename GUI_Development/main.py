@@ -26,6 +26,8 @@ import frontend.frontend_design as fe
 # from backend_logic.visualizer.live_plot_muV import MuVGraphVispyStacked as MuVGraph
 # from backend_logic.visualizer.live_plot_FFT import FFTGraph
 # from backend_logic.visualizer.live_plot_PSD import PSDGraph
+# from backend_logic.visualizer.live_plot_spectrogram import SpectrogramGraph
+# from backend_logic.visualizer.live_plot_topomap import TopomapGraph
 
 # Lazy load board modules (brainflow) to save startup time
 # Will be imported when user turns on board
@@ -36,8 +38,10 @@ import frontend.frontend_design as fe
 # Keep these - used in multiple places or needed early
 from backend_logic.timing_and_recording.TimerGUI import TimelineWidget
 from backend_logic.data_handling.ica_manager import ICAManager
+from backend_logic.data_handling.preprocessing_config import PreprocessingConfigPublisher
 from backend_logic.timing_and_recording.recording_manager import PreciseRecordingManager
 from backend_logic.timing_and_recording.timing_engine import TimingEngine
+from backend_logic.visualizer.render_scheduler import RenderScheduler
 from frontend.chatbotFE import ChatbotFE
 from frontend.menu_handler import MenuHandler
 # Lazy load export manager - only needed when browsing/exporting
@@ -99,6 +103,8 @@ class MainApp(QDialog):
         self.muVPlot    = self.findChild(QWidget,  "muVPlot")
         self.FFTPlot    = self.findChild(QWidget,  "FFTPlot")
         self.PSDPlot    = self.findChild(QWidget,  "PSDPlot")
+        self.SpectrogramPlot = self.findChild(QWidget, "SpectrogramPlot")
+        self.TopomapPlot = self.findChild(QWidget, "TopomapPlot")
         self.NoPlot     = self.findChild(QWidget,  "NoPlot")
 
         # Add friendly guidance message to the NoPlot tab
@@ -232,6 +238,8 @@ class MainApp(QDialog):
         self.muVGraph   = None
         self.FFTGraph   = None
         self.PSDGraph   = None
+        self.SpectrogramGraph = None
+        self.TopomapGraph = None
 
         # ─── Hide band-pass/stop settings panels until needed ───────────
         self.findChild(QWidget, "BandPassSettings").setVisible(False)
@@ -291,6 +299,9 @@ class MainApp(QDialog):
         self.NumBandStop.valueChanged.connect(lambda: fe.toggle_settings_visibility(self))
 
         self.BPTypeFIR_IIR.currentTextChanged.connect(lambda: fe.toggle_settings_visibility(self))
+        # Immutable preprocessing snapshot, republished on every widget change;
+        # the DSP side reads only this, never the widgets
+        self.preprocessing_config = PreprocessingConfigPublisher(self.preprocessing_controls, self)
         
 
         # Refresh serial ports dropdown on click
@@ -328,12 +339,17 @@ class MainApp(QDialog):
         except Exception:
             pass
 
+        # One display-rate tick for every live visual; during runs it only draws
+        # in the gap after each engine tick so recording is never held up by plots
+        self.render_scheduler = RenderScheduler(self.timing_engine, parent=self)
+        self.render_scheduler.start()
+
         tl_layout = QVBoxLayout(self.TimelineVisualizer)
         self.timeline_widget = TimelineWidget(
             self.recordButton, self.stopButton,
             self.BeforeOnset, self.AfterOnset,
             self.TimeBetweenTrials, self.NumOfTrials,
-            self.StatusBar, self.timing_engine
+            self.StatusBar, self.timing_engine, self.render_scheduler
         )
         tl_layout.addWidget(self.timeline_widget)
 
@@ -360,7 +376,8 @@ class MainApp(QDialog):
                     self.timing_engine,
                     before_spinbox=self.BeforeOnset,
                     timeline_widget=self.timeline_widget,
-                    parent=self
+                    parent=self,
+                    render_scheduler=self.render_scheduler
                 )
                 self.black_screen_window.show()
             self.BlackScreenTimer.clicked.connect(open_black_screen)
@@ -382,11 +399,13 @@ class MainApp(QDialog):
         
         # Initialize data collector and associated variables
         self.data_collector = None
+        self.erd_baseline = None  # PreOnsetBaseline, created with the data collector
         self.first_time_collecting = True
 
         # Export destination + recording managers - lazy loaded
         self.export_dest_manager = None
         self.recording_manager = None
+        self.export_jobs = None  # Background export jobs, created on first export
 
         # Hook export controls
         if self.ExportDestination is not None:
@@ -439,6 +458,16 @@ class MainApp(QDialog):
                 except Exception:
                     pass
 
+    def _ensure_export_jobs_loaded(self):
+        """Lazy-create the background export job manager on first export."""
+        if self.export_jobs is None:
+            from backend_logic.timing_and_recording.export_jobs import ExportJobManager
+            self.export_jobs = ExportJobManager(parent=self)
+            self.export_jobs.status.connect(self.ExportStatus.setText)
+            self.export_jobs.finished.connect(self.on_export_finished)
+            # Stop writing (partial files are removed) when the app closes mid-export
+            QApplication.instance().aboutToQuit.connect(self.export_jobs.shutdown)
+
     def setup_muV_live_plot(self):
         """Lazy-create and embed the µV live plot into its tab."""
         # Lazy import vispy and the graph class to save startup time
@@ -451,6 +480,7 @@ class MainApp(QDialog):
         # Update data collector reference if it exists but wasn't available during creation
         if self.data_collector and self.muVGraph.data_collector is None:
             self.muVGraph.data_collector = self.data_collector
+        self._schedule_graph("muV", self.muVGraph)
 
     def setup_FFT_live_plot(self):
         """Lazy-create and embed the FFT live plot into its tab."""
@@ -464,6 +494,7 @@ class MainApp(QDialog):
         # Update data collector reference if it exists but wasn't available during creation
         if self.data_collector and self.FFTGraph.data_collector is None:
             self.FFTGraph.data_collector = self.data_collector
+        self._schedule_graph("FFT", self.FFTGraph)
 
     def setup_PSDGraph(self):
         """Lazy-create and embed the PSD live plot into its tab."""
@@ -477,10 +508,44 @@ class MainApp(QDialog):
         # Update data collector reference if it exists but wasn't available during creation
         if self.data_collector and self.PSDGraph.data_collector is None:
             self.PSDGraph.data_collector = self.data_collector
+        self._schedule_graph("PSD", self.PSDGraph)
+
+    def setup_spectrogram_plot(self):
+        """Lazy-create and embed the spectrogram into its tab."""
+        # Lazy import pyqtgraph and the graph class to save startup time
+        from backend_logic.visualizer.live_plot_spectrogram import SpectrogramGraph
+
+        layout = QVBoxLayout(self.SpectrogramPlot)
+        self.SpectrogramGraph = SpectrogramGraph(self.board_shim, self.BoardOnOff, self.preprocessing_controls, self.ica_manager, self.data_collector)
+        layout.addWidget(self.SpectrogramGraph)
+
+        # Update data collector reference if it exists but wasn't available during creation
+        if self.data_collector and self.SpectrogramGraph.data_collector is None:
+            self.SpectrogramGraph.data_collector = self.data_collector
+        self._schedule_graph("spectrogram", self.SpectrogramGraph)
+
+    def setup_topomap_plot(self):
+        """Lazy-create and embed the scalp map into its tab."""
+        # Lazy import pyqtgraph/scipy and the graph class to save startup time
+        from backend_logic.visualizer.live_plot_topomap import TopomapGraph
+
+        layout = QVBoxLayout(self.TopomapPlot)
+        self.TopomapGraph = TopomapGraph(self.board_shim, self.BoardOnOff, self.preprocessing_controls, self.ica_manager, self.data_collector)
+        layout.addWidget(self.TopomapGraph)
+
+        # Update data collector reference if it exists but wasn't available during creation
+        if self.data_collector and self.TopomapGraph.data_collector is None:
+            self.TopomapGraph.data_collector = self.data_collector
+        self._schedule_graph("topomap", self.TopomapGraph)
+
+    def _schedule_graph(self, name, graph):
+        """Let the render scheduler redraw `graph` when a new frame was requested for it."""
+        self.render_scheduler.add(name, graph.on_frame_ready, visible=lambda: graph.updating and not graph.paused,
+                                  paint_widget=graph)
 
     def handle_tab_change_on_Visualizer(self, index):
         """
-        Starts the timer for the newly selected plot tab and stops all others.
+        Starts updates for the newly selected plot tab and stops all others.
         Lazy-loads each graph the first time its tab is shown.
         """
         current = self.Visualizer.currentWidget()
@@ -489,31 +554,57 @@ class MainApp(QDialog):
         if current is self.muVPlot:
             if self.muVGraph is None:
                 self.setup_muV_live_plot()
-            self.muVGraph.timer.start(self.muVGraph.update_speed_ms)
-            if self.FFTGraph: self.FFTGraph.timer.stop()
-            if self.PSDGraph: self.PSDGraph.timer.stop()
+            self.muVGraph.start_updates()
+            if self.FFTGraph: self.FFTGraph.stop_updates()
+            if self.PSDGraph: self.PSDGraph.stop_updates()
+            if self.SpectrogramGraph: self.SpectrogramGraph.stop_updates()
+            if self.TopomapGraph: self.TopomapGraph.stop_updates()
 
         # FFT tab
         elif current is self.FFTPlot:
             if self.FFTGraph is None:
                 self.setup_FFT_live_plot()
-            self.FFTGraph.timer.start(self.FFTGraph.update_speed_ms)
-            if self.muVGraph: self.muVGraph.timer.stop()
-            if self.PSDGraph: self.PSDGraph.timer.stop()
+            self.FFTGraph.start_updates()
+            if self.muVGraph: self.muVGraph.stop_updates()
+            if self.PSDGraph: self.PSDGraph.stop_updates()
+            if self.SpectrogramGraph: self.SpectrogramGraph.stop_updates()
+            if self.TopomapGraph: self.TopomapGraph.stop_updates()
 
         # PSD tab
         elif current is self.PSDPlot:
             if self.PSDGraph is None:
                 self.setup_PSDGraph()
-            self.PSDGraph.timer.start(self.PSDGraph.update_speed_ms)
-            if self.muVGraph: self.muVGraph.timer.stop()
-            if self.FFTGraph: self.FFTGraph.timer.stop()
+            self.PSDGraph.start_updates()
+            if self.muVGraph: self.muVGraph.stop_updates()
+            if self.FFTGraph: self.FFTGraph.stop_updates()
+            if self.SpectrogramGraph: self.SpectrogramGraph.stop_updates()
+            if self.TopomapGraph: self.TopomapGraph.stop_updates()
+
+        # Spectrogram tab
+        elif self.SpectrogramPlot is not None and current is self.SpectrogramPlot:
+            if self.SpectrogramGraph is None:
+                self.setup_spectrogram_plot()
+            self.SpectrogramGraph.start_updates()
+            if self.muVGraph: self.muVGraph.stop_updates()
+            if self.FFTGraph: self.FFTGraph.stop_updates()
+            if self.PSDGraph: self.PSDGraph.stop_updates()
+            if self.TopomapGraph: self.TopomapGraph.stop_updates()
+
+        # Topomap tab
+        elif self.TopomapPlot is not None and current is self.TopomapPlot:
+            if self.TopomapGraph is None:
+                self.setup_topomap_plot()
+            self.TopomapGraph.start_updates()
+            if self.muVGraph: self.muVGraph.stop_updates()
+            if self.FFTGraph: self.FFTGraph.stop_updates()
+            if self.PSDGraph: self.PSDGraph.stop_updates()
+            if self.SpectrogramGraph: self.SpectrogramGraph.stop_updates()
 
         # No-plot tab
         else:
-            for graph in (self.muVGraph, self.FFTGraph, self.PSDGraph):
+            for graph in (self.muVGraph, self.FFTGraph, self.PSDGraph, self.SpectrogramGraph, self.TopomapGraph):
                 if graph:
-                    graph.timer.stop()
+                    graph.stop_updates()
 
     def toggle_board(self):
         """
@@ -545,9 +636,14 @@ class MainApp(QDialog):
                 self.data_collector = CentralizedDataCollector(
                     self.board_shim, 
                     eeg_channels, 
-                    self.preprocessing_controls, 
+                    self.preprocessing_config,
                     self.ica_manager
                 )
+                # Plots redraw when the DSP worker publishes a frame (no polling timers)
+                self.data_collector.signals.frame_ready.connect(self.on_frame_ready)
+                # ERD% baseline: the pre-onset seconds of every trial
+                from backend_logic.data_handling.band_power import PreOnsetBaseline
+                self.erd_baseline = PreOnsetBaseline(self.timing_engine, self.data_collector)
             else:
                 # Subsequent times - just update the board_shim
                 self.data_collector.set_board_shim(self.board_shim)
@@ -561,10 +657,8 @@ class MainApp(QDialog):
             # Automatically enable FastICA if we have 2+ channels
             self.update_fastica_state()
 
-            # Start the timer on whichever tab is active now (this may create graphs)
-            self.handle_tab_change_on_Visualizer(self.Visualizer.currentIndex())
-            
-            # Update each graph's board_shim and data_collector reference AFTER they're created
+            # Update each existing graph's board_shim and data_collector reference first,
+            # so the tab started below registers its frame demand with this collector
             if self.muVGraph: 
                 self.muVGraph.board_shim = self.board_shim
                 self.muVGraph.data_collector = self.data_collector
@@ -574,6 +668,15 @@ class MainApp(QDialog):
             if self.PSDGraph: 
                 self.PSDGraph.board_shim = self.board_shim
                 self.PSDGraph.data_collector = self.data_collector
+            if self.SpectrogramGraph:
+                self.SpectrogramGraph.board_shim = self.board_shim
+                self.SpectrogramGraph.data_collector = self.data_collector
+            if self.TopomapGraph:
+                self.TopomapGraph.board_shim = self.board_shim
+                self.TopomapGraph.data_collector = self.data_collector
+
+            # Start updates on whichever tab is active now (this may create graphs)
+            self.handle_tab_change_on_Visualizer(self.Visualizer.currentIndex())
 
             # Initialize precise recording manager when board is on and collector ready
             try:
@@ -591,7 +694,11 @@ class MainApp(QDialog):
             self.first_time_collecting = False
 
         else:
-            # Power off the board and stop all timers
+            # Power off the board and stop all plot updates
+            # Stop the acquisition thread first so it never drains a released session
+            if self.data_collector:
+                self.data_collector.set_board_shim(None)
+
             # Import needed here too for turn_off
             import backend_logic.board_setup.backend_eeg as beeg
             beeg.turn_off_board(
@@ -606,10 +713,6 @@ class MainApp(QDialog):
             
             # Clear the board_shim reference to ensure fresh instance on next turn on
             self.board_shim = None
-            
-            # Clear the data collector's board reference but keep the collector
-            if self.data_collector:
-                self.data_collector.set_board_shim(None)
             # Stop any ongoing recording when board turns off
             if self.recording_manager and self.recording_manager.is_recording:
                 try:
@@ -617,11 +720,11 @@ class MainApp(QDialog):
                 except Exception:
                     pass
             
-            for graph in (self.muVGraph, self.FFTGraph, self.PSDGraph):
+            for graph in (self.muVGraph, self.FFTGraph, self.PSDGraph, self.SpectrogramGraph, self.TopomapGraph):
                 if graph:
                     graph.board_shim = None
                     # Keep the data_collector reference - it will handle the board_shim being None
-                    graph.timer.stop()
+                    graph.stop_updates()
 
     # (Removed FileType configure/ensure methods and load_export_destination_on_startup - now in _ensure_export_manager_loaded)
 
@@ -803,9 +906,17 @@ class MainApp(QDialog):
     def export_button_clicked(self):
         # Ensure export manager is loaded before use
         self._ensure_export_manager_loaded()
+        self._ensure_export_jobs_loaded()
         
         try:
-            if not self.recording_manager or not self.recording_manager.has_cached_data():
+            # A click while exporting cancels the running export
+            if self.export_jobs.busy:
+                self.export_jobs.cancel()
+                return
+            # While recording, the previous finished recording is exported
+            available_types = (self.recording_manager.get_exportable_data_types()
+                               if self.recording_manager else {})
+            if not any(available_types.values()):
                 self.ExportStatus.setText("Export failed: Record data beforehand")
                 return
             dest = self.export_dest_manager.current_destination
@@ -833,9 +944,6 @@ class MainApp(QDialog):
                 self.ExportStatus.setText("Export failed: No data types selected")
                 return
             
-            # Get available data types
-            available_types = self.recording_manager.get_available_data_types()
-            
             # Check if any selected types don't have recorded data
             unavailable_selected = []
             for data_type, is_selected in selected_types.items():
@@ -847,9 +955,11 @@ class MainApp(QDialog):
                 self.ExportStatus.setText(f"Export failed: {types_str} not recorded")
                 return
             
-            # Export with current selections
-            success, message, exported_types = self.recording_manager.export_cached(dest, "csv", selected_types)
+            # Export with current selections in the background; progress arrives via export_jobs.status
+            started, message = self.export_jobs.start(self.recording_manager, dest, "csv", selected_types)
             self.ExportStatus.setText(message)
+            if started:
+                self._set_export_button_busy(True)
             
         except Exception:
             try:
@@ -857,6 +967,28 @@ class MainApp(QDialog):
             except Exception:
                 pass
 
+    def on_export_finished(self, success: bool, message: str, exported_types: list):
+        self._set_export_button_busy(False)
+        try:
+            self.ExportStatus.setText(message)
+        except Exception:
+            pass
+
+    def _set_export_button_busy(self, busy: bool):
+        """While an export runs the Export button cancels it; say so on the button."""
+        if self.ExportFile is None:
+            return
+        try:
+            self.ExportFile.setText("Cancel" if busy else "Export")
+            self.ExportFile.setToolTip("Cancel export" if busy else "")
+        except Exception:
+            pass
+
+    def on_frame_ready(self, frame):
+        """Mark the graphs dirty; the render scheduler redraws the visible one on its next frame."""
+        for name in ("muV", "FFT", "PSD", "spectrogram", "topomap"):
+            self.render_scheduler.request(name)
+
     def update_fastica_state(self):
         """
         Automatically enable/disable FastICA checkbox based on current channel count.
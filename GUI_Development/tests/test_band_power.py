@@ -0,0 +1,84 @@
+import numpy as np
+import pytest
+from scipy.signal import welch
+
+from backend_logic.data_handling.band_power import BandPowerEngine
+from backend_logic.data_handling.spectral import WelchEngine
+
+
+def test_weights_are_the_overlap_of_each_bin_with_each_band():
+    engine = BandPowerEngine({"low": (8.2, 13.0), "high": (13.0, 20.0)})
+    freqs = np.arange(0.0, 30.0)  # 1 Hz bins, each covering f ± 0.5 Hz
+
+    weights = engine.weights_for(freqs)
+
+    assert weights.shape == (30, 3)  # Bands plus the total_band column
+    np.testing.assert_allclose(weights[8, 0], 0.3)   # [7.5, 8.5] ∩ [8.2, 13.0]
+    np.testing.assert_allclose(weights[9:13, 0], 1.0)
+    np.testing.assert_allclose(weights[13, 0], 0.5)  # Bin 13 is split between both bands
+    np.testing.assert_allclose(weights[13, 1], 0.5)
+    assert weights[:8, 0].sum() == 0 and weights[14:, 0].sum() == 0
+    np.testing.assert_allclose(weights[:, :2].sum(axis=0), [4.8, 7.0])  # The band widths
+    np.testing.assert_allclose(weights[:, 2].sum(), 20.0 - 8.2)
+    assert engine.weights_for(freqs) is weights  # Built once per grid
+
+
+def test_flat_spectrum_gives_band_width_times_density():
+    engine = BandPowerEngine({"alpha": (8.0, 13.0), "beta": (13.0, 30.0)})
+    freqs = np.fft.rfftfreq(250, d=1.0 / 250)
+    psd = np.full((2, len(freqs)), 2.0)
+    psd[1] *= 3.0
+
+    powers = engine.compute(freqs, psd, sample_index=42)
+
+    np.testing.assert_allclose(powers.absolute, [[10.0, 34.0], [30.0, 102.0]])
+    np.testing.assert_allclose(powers.relative, [[5 / 22, 17 / 22]] * 2)
+    np.testing.assert_allclose(powers.band("beta"), [34.0, 102.0])
+    assert powers.erd is None
+    assert powers.sample_index == 42
+
+
+def test_erd_against_a_given_and_an_averaged_baseline():
+    engine = BandPowerEngine({"alpha": (8.0, 13.0)})
+    freqs = np.arange(0.0, 20.0)
+    flat = np.ones((1, 20))
+
+    engine.set_baseline([[10.0]])
+    np.testing.assert_allclose(engine.compute(freqs, 0.5 * flat).erd, [[-75.0]])  # 2.5 vs 10
+
+    engine.begin_baseline()
+    engine.compute(freqs, 1.0 * flat)
+    engine.compute(freqs, 3.0 * flat)
+    assert engine.end_baseline()
+    np.testing.assert_allclose(engine.baseline, [[10.0]])  # Mean of 5 and 15
+    np.testing.assert_allclose(engine.compute(freqs, 3.0 * flat).erd, [[50.0]])
+
+    engine.begin_baseline()
+    assert not engine.end_baseline()  # Nothing collected: the old baseline stays
+    np.testing.assert_allclose(engine.baseline, [[10.0]])
+
+    engine.set_baseline([[0.0]])
+    np.testing.assert_array_equal(engine.compute(freqs, flat).erd, [[0.0]])
+
+
+def test_decreasing_band_limits_are_rejected():
+    with pytest.raises(ValueError):
+        BandPowerEngine({"alpha": (13.0, 8.0)})
+
+
+def test_baseline_welch_uses_only_segments_inside_the_period():
+    # The pre-onset baseline's estimate over samples [first_index, first_index + n)
+    fs, nperseg = 250, 84
+    engine = WelchEngine(fs, nperseg)
+    data = np.random.default_rng(0).standard_normal((3, 500))
+    first_index = 1000 + 17  # Off the step grid: the first segment starts later
+
+    freqs, psd = engine.mean_psd(data, first_index)
+
+    step = engine.step
+    start = -(-(first_index + nperseg) // step) * step - nperseg - first_index
+    stop = (first_index + 500) // step * step - first_index
+    _, expected = welch(data[:, start:stop], fs=fs, window=engine.window, nperseg=nperseg,
+                        noverlap=engine.noverlap, detrend="constant", axis=-1)
+    np.testing.assert_allclose(psd, expected, rtol=1e-10)
+    assert engine.mean_psd(data[:, :nperseg - 1], first_index) is None
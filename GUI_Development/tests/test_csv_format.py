@@ -0,0 +1,53 @@
+import numpy as np
+import pytest
+
+from backend_logic.timing_and_recording.csv_format import format_fixed_rows
+
+SPECIAL = [np.nan, np.inf, -np.inf, -0.0, 0.0, -1e-12, 4e-11, -5e-11, 1e15, -3.2e17,
+           999999999999999.9, 0.99999999999, 2.5e-10, 0.125, 1.00000000005]
+
+
+def _reference(rows, decimals=10, flags=None, flag_col=None, flag_prefix="B - ", flag_column=False):
+    """What the recorder wrote before: one %-format per value."""
+    lines = []
+    for r, row in enumerate(np.asarray(rows, dtype=np.float64).tolist()):
+        cells = ["%.{}f".format(decimals) % v for v in row]
+        if flags is not None and flag_column:
+            cells.append("1" if flags[r] else "0")
+        elif flags is not None and flag_col is not None and flags[r]:
+            cells[flag_col] = flag_prefix + cells[flag_col]
+        lines.append(",".join(cells) + "\n")
+    return "".join(lines)
+
+
+@pytest.fixture
+def rows():
+    rng = np.random.default_rng(3)
+    block = rng.standard_normal((40, 6)) * 10.0 ** rng.integers(-12, 8, (40, 6))
+    block.ravel()[::7][:len(SPECIAL)] = SPECIAL
+    return block
+
+
+@pytest.mark.parametrize("decimals", [10, 3, 0])
+def test_matches_percent_formatting(rows, decimals):
+    assert format_fixed_rows(rows, decimals) == _reference(rows, decimals)
+
+
+def test_special_values_alone():
+    rows = np.array(SPECIAL).reshape(-1, 1)
+    text = format_fixed_rows(rows)
+    assert text == _reference(rows)
+    assert text.splitlines()[:4] == ["nan", "inf", "-inf", "-0.0000000000"]
+
+
+def test_flag_prefix_and_flag_column(rows):
+    flags = np.arange(len(rows)) % 3 == 0
+
+    assert format_fixed_rows(rows, flags=flags, flag_col=2) == _reference(rows, flags=flags, flag_col=2)
+    assert (format_fixed_rows(rows, flags=flags, flag_col=2, flag_column=True)
+            == _reference(rows, flags=flags, flag_column=True))
+
+
+def test_empty_blocks():
+    assert format_fixed_rows(np.empty((0, 4))) == ""
+    assert format_fixed_rows(np.empty((2, 0))) == "\n\n"
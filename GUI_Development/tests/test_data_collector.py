@@ -0,0 +1,111 @@
+import numpy as np
+import pytest
+from brainflow.board_shim import BoardShim, BoardIds
+from brainflow.data_filter import DataFilter, NoiseTypes
+
+from backend_logic.data_handling.data_collector import CentralizedDataCollector
+from backend_logic.data_handling.preprocessing_config import PreprocessingConfig
+
+BOARD_ID = BoardIds.SYNTHETIC_BOARD.value
+
+
+class _IdleBoard:
+    """Board the acquisition thread drains nothing from; tests append samples to its ring."""
+
+    def get_board_id(self):
+        return BOARD_ID
+
+    def get_board_data(self):
+        return np.empty((BoardShim.get_num_rows(BOARD_ID), 0))
+
+
+class _Preprocessing:
+    def __init__(self):
+        self.config = PreprocessingConfig()
+
+
+@pytest.fixture
+def collector():
+    eeg_channels = BoardShim.get_eeg_channels(BOARD_ID)
+    collector = CentralizedDataCollector(_IdleBoard(), eeg_channels, _Preprocessing())
+    yield collector
+    collector.set_board_shim(None)
+
+
+def _append(collector, n_samples, seed=0):
+    """Append `n_samples` of noise, plus a per-row offset, to the collector's raw ring."""
+    acquisition = collector.acquisition
+    rng = np.random.default_rng(seed)
+    block = rng.standard_normal((acquisition.num_rows, n_samples)) * 10.0
+    block += 100.0 * np.arange(acquisition.num_rows)[:, None]
+    acquisition.ring.append(block)
+    return block
+
+
+# ─── Filtered-window memoization ───
+
+def test_consumers_on_the_same_tick_share_one_window(collector):
+    _append(collector, 2000)
+    collector.reset_window_cache_stats()
+
+    short = collector.get_filtered_array(500)
+    long = collector.get_filtered_array(1000)
+    again = collector.get_filtered_array(500)
+
+    assert collector.get_window_cache_stats() == (2, 1)
+    assert np.shares_memory(short, long)  # Shorter windows are slices of the cached one
+    np.testing.assert_array_equal(short, long[:, -500:])
+    np.testing.assert_array_equal(again, short)
+
+
+def test_new_samples_or_config_generation_miss_the_cache(collector):
+    _append(collector, 2000)
+    before = np.array(collector.get_filtered_array(1000))
+    collector.reset_window_cache_stats()
+
+    collector.get_filtered_array(1000)
+    assert collector.get_window_cache_stats() == (1, 0)
+
+    _append(collector, 10, seed=1)
+    collector.get_filtered_array(1000)
+    assert collector.get_window_cache_stats() == (1, 1)
+
+    # Same filters, new generation: recomputed all the same
+    collector.preprocessing.config = PreprocessingConfig(generation=1)
+    collector.get_filtered_array(1000)
+    assert collector.get_window_cache_stats() == (1, 2)
+
+    collector.preprocessing.config = PreprocessingConfig(bandpass=((1.0, 40.0),), generation=2)
+    after = collector.get_filtered_array(1000)
+    assert collector.get_window_cache_stats() == (1, 3)
+    assert not np.allclose(after[:, :-10], before[:, 10:])
+
+
+# ─── Array API ───
+
+def test_rows_follow_eeg_channels(collector):
+    collector.use_streaming_filters = False
+    raw = _append(collector, 1000)
+
+    window, newest_index = collector.get_indexed_filtered_array(1000)
+
+    assert window.shape == (len(collector.eeg_channels), 1000)
+    assert not window.flags.writeable
+    assert newest_index == 1000
+    for row, channel in enumerate(collector.eeg_channels):
+        assert collector.channel_index[channel] == row
+        expected = raw[channel].copy()
+        DataFilter.remove_environmental_noise(expected, collector.sampling_rate, NoiseTypes.FIFTY_AND_SIXTY.value)
+        np.testing.assert_allclose(window[row], expected, rtol=0, atol=1e-9 * np.abs(expected).max())
+
+
+def test_channel_dict_holds_views_of_the_window(collector):
+    _append(collector, 2000)
+
+    channels = collector.collect_data_muV()
+    window = collector.get_filtered_array(collector.nump_muV)
+
+    assert list(channels) == list(collector.eeg_channels)
+    for row, channel in enumerate(collector.eeg_channels):
+        assert np.shares_memory(channels[channel], window)
+        np.testing.assert_array_equal(channels[channel], window[row])
@@ -0,0 +1,68 @@
+import os
+
+import numpy as np
+
+from backend_logic.timing_and_recording.session_writer import INDEX_FILE, SessionWriter, load_session
+
+EVENT = np.dtype([("sample", np.int64), ("code", np.int32)])
+
+
+def _rows(n, n_cols=4, start=0):
+    return np.arange(start * n_cols, (start + n) * n_cols, dtype=float).reshape(n, n_cols)
+
+
+def test_closed_session_round_trip(tmp_path):
+    directory = str(tmp_path / "session")
+    writer = SessionWriter(directory, chunk_bytes=10 * 4 * 8, meta={"fs": 250})
+    writer.reserve("FFT", np.float32, row_shape=(2, 3))  # Reserved, never written
+    events = np.array([(5, 1), (900, 2)], dtype=EVENT)
+    for start in range(0, 95, 19):
+        writer.append("muV", _rows(19, start=start))
+    writer.append("events", events)
+    writer.set_meta("trials", 3)
+    writer.close()
+
+    meta, data, complete = load_session(directory)
+
+    assert complete
+    assert meta == {"fs": 250, "trials": 3}
+    np.testing.assert_array_equal(data["muV"], _rows(95))
+    np.testing.assert_array_equal(data["events"], events)
+    assert data["FFT"].shape == (0, 2, 3) and data["FFT"].dtype == np.float32
+    assert len(os.listdir(directory)) == 1 + 10 + 1  # Index, ten full muV chunks (chunk_bytes caps them), events
+
+
+def test_crashed_session_keeps_every_completed_chunk(tmp_path):
+    directory = str(tmp_path / "session")
+    writer = SessionWriter(directory, chunk_bytes=10 * 4 * 8, max_chunk_s=3600)
+    writer.append("muV", _rows(10))             # Fills the first chunk
+    writer.append("muV", _rows(25, start=10))   # Two more full chunks; 5 rows stay staged
+    writer._queue.join()  # The three full chunks reached the disk
+
+    # Crash: the staged rows never get written and a chunk write is cut short
+    with open(os.path.join(directory, "muV_000003.npy.tmp"), "wb") as f:
+        f.write(b"\x93NUMPY")
+    index_before = open(os.path.join(directory, INDEX_FILE), encoding="utf-8").read()
+
+    meta, data, complete = load_session(directory)
+
+    assert not complete
+    np.testing.assert_array_equal(data["muV"], _rows(30))
+    assert open(os.path.join(directory, INDEX_FILE), encoding="utf-8").read() == index_before
+    writer._stop_thread()
+
+
+def test_old_staged_chunk_is_written_without_filling_up(tmp_path):
+    directory = str(tmp_path / "session")
+    writer = SessionWriter(directory, chunk_bytes=1 << 20, max_chunk_s=0.0)
+    writer.append("muV", _rows(3))
+    writer._queue.join()
+
+    _, data, complete = load_session(directory)
+
+    assert not complete
+    np.testing.assert_array_equal(data["muV"], _rows(3))
+    writer.close()
+    _, data, complete = load_session(directory)
+    assert complete
+    np.testing.assert_array_equal(data["muV"], _rows(3))
@@ -0,0 +1,92 @@
+import numpy as np
+import pytest
+from scipy.signal import welch, windows
+
+from backend_logic.data_handling.spectral import BatchSpectra, SpectralEngine, WelchEngine
+
+FS = 250
+
+
+@pytest.fixture
+def stream():
+    rng = np.random.default_rng(7)
+    t = np.arange(3000) / FS
+    return rng.standard_normal((3, t.size)) + np.sin(2 * np.pi * 10 * t) + 5.0
+
+
+def _scipy_welch(engine, data, stop):
+    """scipy's Welch mean of the newest `n_segments` grid-aligned segments ending by `stop`."""
+    step, nperseg = engine.step, engine.nperseg
+    newest_end = stop - stop % step
+    oldest_end = max(-(-nperseg // step) * step, newest_end - (engine.n_segments - 1) * step)
+    return welch(data[:, oldest_end - nperseg:newest_end], fs=FS, window=engine.window, nperseg=nperseg,
+                 noverlap=engine.noverlap, detrend="constant", axis=-1)
+
+
+def test_welch_engine_matches_scipy_as_segments_arrive(stream):
+    engine = WelchEngine(FS, nperseg=84, n_segments=8)
+    assert engine.compute(stream[:, :50], 50) is None  # No full segment yet
+
+    stop = 50
+    for hop in [40, 7, 1, 130, 42, 300, 5, 90] * 4:  # Wraps the ring; 300 skips past it entirely
+        stop += hop
+        window = stream[:, max(0, stop - engine.span - engine.step):stop]  # Holds the newest n_segments
+        freqs, psd = engine.compute(window, stop)
+        expected_freqs, expected = _scipy_welch(engine, stream, stop)
+        np.testing.assert_allclose(freqs, expected_freqs)
+        np.testing.assert_allclose(psd, expected, rtol=1e-9)
+        assert engine.last_index == stop - stop % engine.step
+
+
+def test_welch_engine_restarts_for_a_new_key(stream):
+    engine = WelchEngine(FS, nperseg=84, n_segments=8)
+    engine.compute(stream[:, :1000], 1000, key=0)
+    filtered = stream[:, :1100] * 2.0  # E.g. new filter settings rewrote the past
+
+    _, psd = engine.compute(filtered[:, 1100 - engine.span - engine.step:], 1100, key=1)
+
+    np.testing.assert_allclose(psd, _scipy_welch(engine, filtered, 1100)[1], rtol=1e-9)
+
+
+def test_full_spectrum_only_once_per_hop(stream):
+    engine = SpectralEngine(FS, nfft=256, hop_samples=25)
+    freqs, amplitudes = engine.compute(stream[:, :256], 256)
+    np.testing.assert_allclose(freqs, np.fft.rfftfreq(256, 1 / FS))
+    expected = np.abs(np.fft.rfft(stream[:, :256] * windows.hamming(256), axis=-1))
+    np.testing.assert_allclose(amplitudes, expected, rtol=1e-12)
+
+    version = engine.version
+    engine.compute(stream[:, :280], 280)
+    assert engine.version == version  # 24 new samples: the cached frame is reused
+    _, amplitudes = engine.compute(stream[:, :281], 281)
+    assert engine.version == version + 1
+    expected = np.abs(np.fft.rfft(stream[:, 25:281] * windows.hamming(256), axis=-1))
+    np.testing.assert_allclose(amplitudes, expected, rtol=1e-12)
+
+
+def test_sliding_dft_bins_match_rfft_every_sample(stream):
+    bins = [3, 10, 41]
+    engine = SpectralEngine(FS, nfft=256, hop_samples=64, sliding_bins=bins, resync_every=10000)
+    window = windows.hamming(256, sym=False)  # The window the frequency-domain identity holds for
+
+    stop = 256
+    for new in [0] + [1] * 70 + [3, 17, 2] * 5:  # Single samples and small blocks, across hops
+        stop += new
+        segment = stream[:, stop - 256:stop]
+        _, amplitudes = engine.compute(stream[:, :stop], stop)
+        expected = np.abs(np.fft.rfft(segment * window, axis=-1))
+        np.testing.assert_allclose(amplitudes[:, bins], expected[:, bins], rtol=1e-9)
+
+
+def test_batch_spectra_match_the_live_engines(stream):
+    batch = BatchSpectra(FS, nfft=256, nperseg=84, n_segments=8, hop_samples=50)
+    ends = batch.frame_ends(stream.shape[1], max(256, batch.psd_window))
+
+    fft = batch.fft(stream, ends)
+    psd = batch.psd(stream, ends)
+
+    live_fft = SpectralEngine(FS, nfft=256)
+    live_psd = WelchEngine(FS, nperseg=84, n_segments=8)
+    for i, end in enumerate(ends):
+        np.testing.assert_allclose(fft[i], live_fft.compute(stream[:, :end], end)[1], rtol=1e-12)
+        np.testing.assert_allclose(psd[i], live_psd.compute(stream[:, :end], end)[1], rtol=1e-9)
@@ -6,8 +6,9 @@ import pyqtgraph as pg
 from brainflow.board_shim import BoardShim, BrainFlowInputParams, BoardIds
 from brainflow.data_filter import DataFilter, FilterTypes, DetrendOperations
 from pyqtgraph.Qt import QtWidgets, QtCore
-import mne
-import matplotlib.pyplot as plt
+
+# Scalp map component, shared with the GUI (`pip install -e shared` from the repository root)
+from mindstream_shared.topomap import TopomapView
 
 
 class LiveTopomap:
@@ -35,37 +36,24 @@ class LiveTopomap:
         "PO7": (-0.75, -0.75), "PO3": (-0.25, -0.75), "POz": (0.0, -0.75), "PO4": (0.25, -0.75), "PO8": (0.75, -0.75),
         "O1": (-0.5, -1.0), "Oz": (0.0, -1.0), "O2": (0.5, -1.0), "Iz": (0.0, -1.2)
         }
-        self.ch_pos = {ch: (x, y, 0.0) for ch, (x, y) in eeg_positions_10_10.items()}
-        self.custom_montage = mne.channels.make_dig_montage(ch_pos=self.ch_pos, coord_frame='head')
-
         # Define channel names for the active channels
-        self.active_channel_names = ["FC3 ", "C3", "CP3", "Cz", "FCz", "CP4", "C4", "FC4"]
-
-        # MNE info object for all 10-10 channels
-        self.raw_info = mne.create_info(
-            ch_names=list(eeg_positions_10_10.keys()),
-            sfreq=self.sampling_rate,
-            ch_types=["eeg"] * len(eeg_positions_10_10)
-        )
-        self.raw_info.set_montage(self.custom_montage)
+        self.active_channel_names = ["FC3", "C3", "CP3", "Cz", "FCz", "CP4", "C4", "FC4"]
 
         # PyQtGraph application setup
         self.app = QtWidgets.QApplication.instance()
         if self.app is None:
             self.app = QtWidgets.QApplication([])
 
-        self.win = pg.GraphicsLayoutWidget()
+        # Live topographical map of the wired electrodes only: sites without one have
+        # no measurement, and drawing them as 0 pulled the whole map towards zero.
+        # Head, sensors and colour bar are drawn once and the interpolation
+        # operator is built once
+        self.win = TopomapView(positions=eeg_positions_10_10)
         self.win.setWindowTitle("Live EEG Topomap")
         self.win.resize(800, 800)
+        self.win.set_channels(self.active_channel_names)
         self.win.show()
 
-        # Initialize live topographical map
-        self.fig, self.ax = plt.subplots()
-        self.cbar = None
-
-        # Initialize data with zeros
-        self.current_data = np.zeros(len(eeg_positions_10_10))
-
         # Start the timer for updates
         self.timer = QtCore.QTimer()
         self.timer.timeout.connect(self.update)
@@ -100,27 +88,8 @@ class LiveTopomap:
             filtered_signals.append(np.mean(channel_data))
             #filtered_signals.append(np.mean(channel_data[-10:]))
 
-        # Update the corresponding positions in the full montage
-        for i, ch_name in enumerate(self.raw_info["ch_names"]):
-            if ch_name in self.active_channel_names:
-                # Map live data to the appropriate channel in the montage
-                self.current_data[i] = filtered_signals[self.active_channel_names.index(ch_name)]
-            else:
-                self.current_data[i] = 0.0  # Set inactive channels to zero
-
-        # Clear and redraw the topomap
-        self.ax.clear()
-        im, cm = mne.viz.plot_topomap(
-            self.current_data, self.raw_info, axes=self.ax, show=False, cmap="rainbow", sensors=True, sphere=(0, 0, 0, 1.2)
-        )
-
-        # Update the color bar
-        if self.cbar is None:
-            self.cbar = self.fig.colorbar(im, ax=self.ax)
-        else:
-            self.cbar.update_normal(im)
-
-        plt.pause(0.001)  # Pause briefly to allow updates
+        # Active channel i is board EEG channel i; one matrix-vector product per map
+        self.win.set_values(filtered_signals[:len(self.active_channel_names)])
 
 
 
@@ -9,10 +9,9 @@ from brainflow.board_shim import BoardShim, BrainFlowInputParams, BoardIds
 from scipy.signal import butter, sosfilt, sosfilt_zi
 
 import mne
-import matplotlib as mpl
-from matplotlib.backends.backend_qt5agg import FigureCanvasQTAgg as FigureCanvas
-from matplotlib.figure import Figure
-import matplotlib.pyplot as plt
+
+# Scalp map component, shared with the GUI (`pip install -e shared` from the repository root)
+from mindstream_shared.topomap import TopomapView, project_positions
 
 # Display order (top -> bottom) and channel names expected on the board
 LABELS = ["FC4", "C4", "CP4", "C2", "C1", "CP3", "C3", "FC3"]
@@ -154,36 +153,18 @@ class LiveTopomap:
         # Filter state (one zi per active channel)
         self.zi = [sosfilt_zi(self.sos) * 0.0 for _ in range(self.n_active)]
 
-        # Montage / plotting env
+        # Montage: electrode positions flattened once; the interpolation operator is
+        # built once for this channel set, so each update is one matrix-vector product
         self._montage = mne.channels.make_standard_montage('brainproducts-RNP-BA-128')
+        positions = project_positions(self._montage.get_positions()['ch_pos'])
+        self.win = TopomapView(positions=positions, res=128)
+        self.win.setWindowTitle('Topomap (Power 8–12 Hz)')
+        self.win.setTitle('Power (µV^2) in 8–12 Hz')
+        self.win.resize(520, 520)
         avail = set(self._montage.ch_names)
         self._plot_names = [n for n in self.active_channel_names if n in avail]
-        self._plot_info = mne.create_info(self._plot_names, sfreq=self.sampling_rate, ch_types='eeg')
-        self._plot_info.set_montage(self._montage, match_case=True, on_missing='ignore')
-
-        self.win = pg.GraphicsLayoutWidget(title='Topomap (Power 8–12 Hz)', show=True)
-        self.win.resize(520, 520)
-        self.win.clear()
-        self.win.setBackground('w')
-
-        mpl.use("Qt5Agg")
-        self.fig = Figure(figsize=(5.2, 5.2), dpi=100)
-        self.canvas = FigureCanvas(self.fig)
-        self.fig.patch.set_facecolor('white')
-
-        self.ax = self.fig.add_axes([0.05, 0.05, 0.72, 0.90])
-        self.ax.set_axis_off()
-        self.ax.set_facecolor('white')
-
-        self.cax = self.fig.add_axes([0.83, 0.15, 0.03, 0.70])
-        self.cbar = None
-
-        proxy = QtWidgets.QGraphicsProxyWidget()
-        proxy.setWidget(self.canvas)
-        self.win.addItem(proxy)
-
-        self.cmap = plt.get_cmap('rainbow').copy()
-        self.cmap.set_bad('white')
+        self.win.set_channels(self._plot_names)
+        self.win.show()
 
         # Progress ticker
         self._print_every_n = int(1.0 / (self.update_speed_ms / 1000.0))
@@ -213,26 +194,12 @@ class LiveTopomap:
 
         # Align to plotting order
         name_to_ix = {n: i for i, n in enumerate(self.active_channel_names)}
-        kept = [n for n in self._plot_names if n in name_to_ix]
+        kept = self._plot_names
         if len(kept) < 3:
             return  # insufficient channels for interpolation
 
         plot_vals = np.array([vals_active[name_to_ix[n]] for n in kept], dtype=float)
 
-        # Draw topomap of Power (µV)
-        self.ax.clear()
-        sel_idx = mne.pick_channels(self._plot_info['ch_names'], include=kept, ordered=True)
-        info_subset = mne.pick_info(self._plot_info, sel_idx, copy=True)
-
-
-        with mpl.rc_context({'font.size': 25,'font.weight': 'heavy'}):
-            im, _ = mne.viz.plot_topomap(
-                plot_vals, info_subset, axes=self.ax, show=False, names=kept,
-                cmap=self.cmap, sensors=True, extrapolate='head', contours=0, res=128,
-                image_interp='cubic', sphere=(0, 0, 0, 0.08)
-            )
-            im.set_interpolation('bilinear')
-
         # Robust color limits from 5th–95th percentiles
         finite = plot_vals[np.isfinite(plot_vals)]
 
@@ -254,18 +221,8 @@ class LiveTopomap:
         else:
             vmin, vmax = 0.0, 1.0  # sane fallback
 
-        im.set_clim(vmin, vmax)
-
-
-        self.ax.set_axis_off()
-        self.ax.set_aspect('equal')
-        self.ax.set_title('Power (µV^2) in 8–12 Hz')
-
-        if self.cbar is None:
-            self.cbar = self.fig.colorbar(im, cax=self.cax)
-            self.cbar.set_label('µV^2', rotation=90)
-        else:
-            self.cbar.update_normal(im)
+        # Draw topomap of Power (µV): interpolate into the persistent image
+        self.win.set_values(plot_vals, (vmin, vmax))
 
         # Optional periodic stats
         self._tick += 1
@@ -273,7 +230,6 @@ class LiveTopomap:
             print(f"[Topomap] window samples={X.shape[1]}  fs={self.sampling_rate} Hz  "
                   f"Power min/max: {float(np.nanmin(plot_vals)):.2f} / {float(np.nanmax(plot_vals)):.2f} µV^2")
 
-        self.canvas.draw_idle()
         self.app.processEvents()
 
 
@@ -336,7 +292,6 @@ def collect_rest_power(board_shim, sos, fs, duration_s=15, tau_s=0.4, block_s=0.
 def main():
     BoardShim.enable_dev_board_logger()
     logging.basicConfig(level=logging.DEBUG)
-    mpl.set_loglevel("warning")
 
     parser = argparse.ArgumentParser()
     parser.add_argument('--timeout', type=int, default=0)
@@ -14,6 +14,10 @@ from scipy.signal import butter, sosfilt, sosfilt_zi
 
 from brainflow.board_shim import BoardShim, BrainFlowInputParams, BoardIds
 
+# Session history (ring + spill file + min/max pyramid), shared with the GUI;
+# install once with `pip install -e shared` from the repository root
+from mindstream_shared.history import SpillingHistory
+
 
 # ---------------------------- Configuration ----------------------------------
 
@@ -54,7 +58,8 @@ class LiveEEGViewer(QtWidgets.QWidget):
     PyQt widget that:
       - Plots streaming EEG channels with pan/zoom and optional follow-live.
       - Provides per-channel visibility and LP+CAR toggles.
-      - Maintains filter state and bounded signal history.
+      - Maintains filter state and the session history (recent samples in a
+        fixed ring, the whole session in a memory-mapped file for scroll-back).
     """
 
     def __init__(self,
@@ -78,14 +83,19 @@ class LiveEEGViewer(QtWidgets.QWidget):
         self.fs_est = float(fs_est)
         self.fs_decl = float(fs_decl)
         self.window_sec = float(window_sec)
-        self.max_history_sec = float(max_history_sec)
-        self.decim = max(1, int(decim))
+        self.max_history_sec = float(max_history_sec)  # How far back pan/zoom may scroll
+        self.decim = max(1, int(decim))  # Smallest min/max bucket when drawing (1: raw when zoomed in)
 
-        # History buffers (numpy arrays for pyqtgraph efficiency)
+        # History: row 0 is time since the first sample, rows 1.. the channels.
+        # Two windows stay in a preallocated ring; older samples are read back
+        # from the memory-mapped session file only when scrolled to, zoomed-out
+        # views from the min/max pyramid stored next to it
         self.t0: Optional[float] = None
         self.last_ts_seen: Optional[float] = None
-        self.t_hist = np.array([], dtype=float)
-        self.y_hist = [np.array([], dtype=float) for _ in range(self.n_ch)]
+        ring_capacity = int(np.ceil(2 * self.window_sec * max(self.fs_est, self.fs_decl))) + 1
+        self.history = SpillingHistory(1 + self.n_ch, ring_capacity,
+                                       lod_base=self.decim if self.decim > 1 else 8)
+        self._drawn: Optional[Tuple[int, int, int]] = None  # Sample range and point budget on the curves
 
         # Stateful filter (per-channel zi)
         self.sos = design_bandpass_sos(self.fs_est)
@@ -111,6 +121,7 @@ class LiveEEGViewer(QtWidgets.QWidget):
         self.panel.setStyleSheet("QFrame { background-color: #111; color: #eee; }")
         outer.addWidget(self.panel, stretch=0)
         self._build_panel()
+        self.plot.sigXRangeChanged.connect(lambda *_: self._draw_visible())
 
         # Timer
         self.timer = QtCore.QTimer(self)
@@ -255,12 +266,47 @@ class LiveEEGViewer(QtWidgets.QWidget):
                 cb.setChecked(visible)
             self.curves[i].setVisible(visible)
 
+    def _latest_time(self) -> Optional[float]:
+        count = self.history.count
+        return float(self.history.read(count - 1, count)[0, 0]) if count else None
+
     def _snap_to_live(self) -> None:
         """Move viewport to most recent segment."""
-        if self.t_hist.size:
-            tmax = self.t_hist[-1]
+        tmax = self._latest_time()
+        if tmax is not None:
             self.plot.setXRange(max(0.0, tmax - self.window_sec), tmax, padding=0)
 
+    def _draw_visible(self) -> None:
+        """
+        Set the curves to the visible x-range (plus one sample each side) in at
+        most about two points per pixel: raw samples when zoomed in, otherwise
+        min/max pairs from the history's level-of-detail pyramid.
+        """
+        tmax = self._latest_time()
+        if tmax is None:
+            return
+        x0, x1 = self.plot.viewRange()[0]
+        x0 = max(x0, tmax - self.max_history_sec)
+        start = max(self.history.index_of_time(x0) - 1, 0)
+        stop = min(self.history.index_of_time(x1, side='right') + 1, self.history.count)
+        max_points = max(2 * int(self.plot.vb.width()), 100)
+        if self.decim > 1:
+            max_points = min(max_points, 2 * -(-(stop - start) // self.decim))
+        if (start, stop, max_points) == self._drawn:
+            return  # History is append-only: same range, same picture
+        self._drawn = (start, stop, max_points)
+
+        # Min/max pairs keep spikes and the envelope that striding would drop
+        values, idx = self.history.envelope(start, stop, max_points)
+        t = self.history.times_at(idx)
+        for i, c in enumerate(self.curves):
+            c.setData(t[i], values[i])
+
+    def closeEvent(self, event) -> None:
+        self.timer.stop()
+        self.history.close()
+        super().closeEvent(event)
+
     # ----- Streaming/update loop -----
 
     def update_stream(self) -> None:
@@ -307,14 +353,12 @@ class LiveEEGViewer(QtWidgets.QWidget):
         # else:
         #     Xc = X
         Xc = X
-        # Append to history (bounded)
-        self.t_hist = np.concatenate((self.t_hist, t_new))
-        for i in range(self.n_ch):
-            self.y_hist[i] = np.concatenate((self.y_hist[i], Xc[i]))
+        # Append to history (written into the ring and the session file, no re-copy)
+        self.history.append(np.vstack((t_new, Xc)))
 
         # Optional filter call marker (visual cue)
         if filter_called and t_new.size:
-            x_pos = float(self.t_hist[-1])
+            x_pos = float(t_new[-1])
             vline = pg.InfiniteLine(pos=x_pos, angle=90, pen=self.filter_mark_pen)
             self.plot.addItem(vline)
             self.filter_marks.append(vline)
@@ -322,15 +366,8 @@ class LiveEEGViewer(QtWidgets.QWidget):
                 old = self.filter_marks.pop(0)
                 self.plot.removeItem(old)
 
-        # Trim history
         self.last_ts_seen = ts[-1]
-        tmax = self.t_hist[-1]
-        tmin_keep = max(0.0, tmax - self.max_history_sec)
-        start_idx = np.searchsorted(self.t_hist, tmin_keep, side='left')
-        if start_idx > 0:
-            self.t_hist = self.t_hist[start_idx:]
-            for i in range(self.n_ch):
-                self.y_hist[i] = self.y_hist[i][start_idx:]
+        tmax = float(t_new[-1])
 
         # Follow/scroll behavior
         if self.follow_cb.isChecked():
@@ -340,14 +377,8 @@ class LiveEEGViewer(QtWidgets.QWidget):
             if abs(xr[1] - tmax) < 0.2 * self.window_sec:
                 self.plot.setXRange(max(0.0, tmax - self.window_sec), tmax, padding=0)
 
-        # Draw
-        if self.decim > 1:
-            t_draw = self.t_hist[::self.decim]
-            for i, c in enumerate(self.curves):
-                c.setData(t_draw, self.y_hist[i][::self.decim])
-        else:
-            for i, c in enumerate(self.curves):
-                c.setData(self.t_hist, self.y_hist[i])
+        # Draw (no-op when the view moved with setXRange above and already drew)
+        self._draw_visible()
 
 
 # ------------------------------- Main ----------------------------------------
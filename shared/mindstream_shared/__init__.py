@@ -0,0 +1,5 @@
+"""
+Code used both by the GUI (GUI_Development) and by the standalone scripts
+(e.g. Usama MRCP Testing/detector3_pipeline/Scope.py). Install once with
+`pip install -e shared` from the repository root.
+"""
@@ -0,0 +1,268 @@
+"""
+Min/max display decimation, the one reduction every time-domain view uses:
+MinMaxDecimator for a live scrolling window (the GUI's µV plot) and
+MinMaxPyramid for zooming out over a whole session (Scope.py's history).
+Both reduce buckets of samples with minmax_buckets.
+"""
+import os
+import logging
+import numpy as np
+from mindstream_shared.ring_buffer import SampleRingBuffer
+
+
+def minmax_buckets(block, first_index=0, indices=None):
+    """
+    Min/max of each full bucket of a (n_rows, n_buckets, bucket_size) block.
+
+    Returns (values, sample_indices), both (n_rows, 2 * n_buckets): per bucket
+    its minimum and maximum, in the order they occur, with the absolute index
+    of each sample. For contiguous samples `first_index` is the index of
+    block[:, 0, 0]; otherwise `indices` (same shape as `block`, increasing
+    along the last axis) gives every entry's index, as when MinMaxPyramid
+    reduces the points of finer buckets again.
+    """
+    n_rows, n_buckets, size = block.shape
+    lo = block.argmin(axis=-1)
+    hi = block.argmax(axis=-1)
+    first = np.minimum(lo, hi)
+    second = np.maximum(lo, hi)
+    positions = np.stack((first, second), axis=-1)                       # (n_rows, n_buckets, 2)
+    values = np.take_along_axis(block, positions, axis=-1)
+    if indices is None:
+        starts = first_index + size * np.arange(n_buckets)
+        indices = positions + starts[None, :, None]
+    else:
+        indices = np.take_along_axis(indices, positions, axis=-1)
+    return values.reshape(n_rows, -1), indices.reshape(n_rows, -1)
+
+
+class MinMaxDecimator:
+    """
+    Incremental min/max-per-bucket display decimation of a multi-channel stream.
+
+    Buckets are `bucket_size` samples on a grid of absolute sample indices, so a
+    completed bucket never changes. Each bucket becomes two points, its min and
+    max in time order, which keeps spikes and the signal envelope that plain
+    striding drops. update() only touches the buckets the new samples fall in.
+    Completed buckets are kept in mirrored ring buffers (the newest
+    `capacity_buckets`); the still-filling bucket is recomputed from its few
+    buffered samples whenever points are read.
+    """
+
+    def __init__(self, n_rows, bucket_size, capacity_buckets):
+        self.n_rows = int(n_rows)
+        self.bucket_size = max(1, int(bucket_size))
+        self.capacity_buckets = int(capacity_buckets)
+        self._values = SampleRingBuffer(self.n_rows, 2 * self.capacity_buckets)
+        self._indices = SampleRingBuffer(self.n_rows, 2 * self.capacity_buckets, dtype=np.int64)
+        self._tail = np.empty((self.n_rows, self.bucket_size))
+        self.reset()
+
+    def reset(self):
+        self._values.clear()
+        self._indices.clear()
+        self._origin = 0          # Absolute point index of the first completed point
+        self._next_index = None   # Absolute sample index the next update must start at
+        self._tail_start = 0      # Absolute sample index of _tail[:, 0]
+        self._tail_len = 0
+
+    @property
+    def next_index(self):
+        """Absolute index one past the newest sample seen (None before the first update)."""
+        return self._next_index
+
+    @property
+    def completed_points(self):
+        """Absolute point index one past the newest completed bucket's points."""
+        return self._origin + self._values.count
+
+    def update(self, block, first_index):
+        """
+        Add a (n_rows, k) block of samples starting at absolute index `first_index`.
+        A block that does not continue the previous one restarts the decimation.
+        """
+        k = block.shape[1]
+        if k == 0:
+            return
+        size = self.bucket_size
+        if self._next_index is None or first_index != self._next_index:
+            self.reset()
+            self._origin = 2 * (first_index // size)
+            self._tail_start = first_index
+        self._next_index = first_index + k
+
+        # Finish the partially filled bucket first
+        bucket_end = (self._tail_start // size + 1) * size
+        take = min(k, bucket_end - (self._tail_start + self._tail_len))
+        self._tail[:, self._tail_len:self._tail_len + take] = block[:, :take]
+        self._tail_len += take
+        if self._tail_start + self._tail_len < bucket_end:
+            return
+        self._append(self._tail[:, :self._tail_len][:, None, :], self._tail_start)
+        block = block[:, take:]
+        start = bucket_end
+
+        # Whole buckets in one vectorised pass, then keep the remainder as the new tail
+        n_full = block.shape[1] // size
+        if n_full:
+            self._append(block[:, :n_full * size].reshape(self.n_rows, n_full, size), start)
+        rest = block.shape[1] - n_full * size
+        self._tail[:, :rest] = block[:, n_full * size:]
+        self._tail_start = start + n_full * size
+        self._tail_len = rest
+
+    def _append(self, buckets, first_index):
+        values, indices = minmax_buckets(buckets, first_index)
+        self._values.append(values)
+        self._indices.append(indices)
+
+    def points(self, since=None):
+        """
+        Points from absolute point index `since` (default: oldest kept) through the
+        still-filling bucket, as (first point index, values, sample indices); the
+        arrays are (n_rows, n_points) copies.
+        """
+        oldest = self._origin + self._values.oldest_index
+        first = oldest if since is None else max(int(since), oldest)
+        local = first - self._origin
+        values = self._values.read(local, self._values.count)
+        indices = self._indices.read(local, self._indices.count)
+        if self._tail_len:
+            tail_values, tail_indices = minmax_buckets(self._tail[:, None, :self._tail_len], self._tail_start)
+            values = np.concatenate((values, tail_values), axis=1)
+            indices = np.concatenate((indices, tail_indices), axis=1)
+        else:
+            values = np.array(values)
+            indices = np.array(indices)
+        return first, values, indices
+
+
+class MinMaxPyramid:
+    """
+    Multi-resolution min/max envelope of a stream, stored in append-only files.
+
+    Level 0 holds the min/max points (minmax_buckets) of every `base` samples,
+    level k+1 reduces the points of `factor` buckets of level k the same way, so
+    level k buckets span base * factor**k samples on a grid of absolute indices.
+    Levels are extended incrementally as samples arrive (each sample is touched
+    once, each level only sees the buckets completed below it) and each is its
+    own file, memory-mapped on read. A zoomed-out view reads the level whose
+    bucket count fits the screen, so its cost does not grow with the session length.
+    """
+
+    def __init__(self, n_rows, path, base=8, factor=4, dtype=np.float64):
+        self.logger = logging.getLogger(__name__)
+        self.n_rows = int(n_rows)
+        self.path = path
+        self.base = max(2, int(base))
+        self.factor = max(2, int(factor))
+        self.dtype = np.dtype(dtype)
+        # One bucket: its two points per row, in time order, and their sample indices
+        self.record = np.dtype([("values", self.dtype, (self.n_rows, 2)), ("at", np.int64, (self.n_rows, 2))])
+        self.count = 0  # Samples appended
+        self._tail = np.empty((self.n_rows, self.base), dtype=self.dtype)
+        self._tail_len = 0
+        self._files = []    # Per level: open append-only file
+        self._lengths = []  # Per level: completed buckets written
+        self._pending = []  # Per level: its newest buckets not yet merged into the level above
+        self._maps = []
+
+    def bucket_size(self, level):
+        return self.base * self.factor ** level
+
+    @property
+    def levels(self):
+        return len(self._files)
+
+    def _records(self, values, indices):
+        """Level records from minmax_buckets output."""
+        n = values.shape[1] // 2
+        records = np.empty(n, dtype=self.record)
+        records["values"] = values.reshape(self.n_rows, n, 2).transpose(1, 0, 2)
+        records["at"] = indices.reshape(self.n_rows, n, 2).transpose(1, 0, 2)
+        return records
+
+    def _write(self, level, records):
+        if level == len(self._files):
+            self._files.append(open(f"{self.path}.lod{level}", "wb"))
+            self._lengths.append(0)
+            self._pending.append(records[:0])
+            self._maps.append(None)
+        self._files[level].write(records.tobytes())
+        self._lengths[level] += len(records)
+
+        # Reduce complete groups of `factor` buckets (2 * factor points, in time order) into the next level
+        pending = np.concatenate((self._pending[level], records))
+        n_groups = len(pending) // self.factor
+        self._pending[level] = pending[n_groups * self.factor:]
+        if n_groups:
+            groups = pending[:n_groups * self.factor].reshape(n_groups, self.factor)
+            values = groups["values"].transpose(2, 0, 1, 3).reshape(self.n_rows, n_groups, 2 * self.factor)
+            at = groups["at"].transpose(2, 0, 1, 3).reshape(self.n_rows, n_groups, 2 * self.factor)
+            self._write(level + 1, self._records(*minmax_buckets(values, indices=at)))
+
+    def append(self, block):
+        """Append a (n_rows, k) block; completed buckets are written to every level."""
+        k = block.shape[1]
+        if k == 0:
+            return
+        first = self.count - self._tail_len  # Absolute index of the oldest unbucketed sample
+        if self._tail_len:
+            block = np.hstack((self._tail[:, :self._tail_len], block))
+        self.count += k
+        n_buckets = block.shape[1] // self.base
+        used = n_buckets * self.base
+        self._tail_len = block.shape[1] - used
+        self._tail[:, :self._tail_len] = block[:, used:]
+        if not n_buckets:
+            return
+        buckets = block[:, :used].reshape(self.n_rows, n_buckets, self.base)
+        self._write(0, self._records(*minmax_buckets(buckets, first)))
+
+    def _level(self, level):
+        """Memmap of all completed buckets of `level`."""
+        length = self._lengths[level]
+        current = self._maps[level]
+        if current is None or current.shape[0] < length:
+            self._files[level].flush()
+            current = np.memmap(f"{self.path}.lod{level}", dtype=self.record, mode="r", shape=(length,))
+            self._maps[level] = current
+        return current
+
+    def choose_level(self, n_samples, max_points):
+        """Finest level drawing `n_samples` in at most `max_points` points (None: raw samples fit)."""
+        if n_samples <= max_points:
+            return None
+        level = 0
+        while 2 * -(-n_samples // self.bucket_size(level)) > max_points:
+            level += 1
+        return level
+
+    def buckets(self, level, start, stop):
+        """
+        Completed buckets of `level` overlapping samples [start, stop) as
+        (values, indices), both (n_rows, 2 * n): min and max of each bucket in
+        time order. Also returns the absolute index the buckets cover up to.
+        """
+        size = self.bucket_size(level)
+        first = max(int(start), 0) // size
+        last = 0
+        if level < self.levels:
+            last = min(-(-int(stop) // size), self._lengths[level])
+        if last <= first:
+            empty = np.empty((self.n_rows, 0))
+            return empty.astype(self.dtype), empty.astype(np.int64), first * size
+        records = self._level(level)[first:last]
+        values = records["values"].transpose(1, 0, 2).reshape(self.n_rows, -1)
+        indices = records["at"].transpose(1, 0, 2).reshape(self.n_rows, -1)
+        return values, indices, last * size
+
+    def close(self, remove=False):
+        self._maps = [None] * len(self._maps)
+        for level, f in enumerate(self._files):
+            try:
+                f.close()
+                if remove:
+                    os.remove(f"{self.path}.lod{level}")
+            except Exception as e:
+                self.logger.error(f"Could not close pyramid level {level} of {self.path}: {e}")
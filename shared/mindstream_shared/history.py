@@ -0,0 +1,150 @@
+"""
+Session history for Scope.py: the newest samples in a ring buffer, every
+sample in a spill file, and a min/max level-of-detail pyramid for zoomed-out
+views.
+"""
+import os
+import logging
+import tempfile
+import numpy as np
+from mindstream_shared.ring_buffer import SampleRingBuffer
+from mindstream_shared.decimation import MinMaxPyramid
+
+
+class SpillingHistory:
+    """
+    Whole-session multi-channel history with bounded RAM.
+
+    The newest `ring_capacity` samples live in a preallocated SampleRingBuffer,
+    so the live view is always one contiguous slice and appending never copies
+    the history. Every sample is also appended to a file (sample-major rows),
+    which is memory-mapped when a read reaches back past the ring: scrolling
+    through the session pages in only the part being looked at.
+
+    Row `time_row` must be increasing; index_of_time() searches it. With
+    `lod_base` set, a MinMaxPyramid of the other rows is kept next to the file
+    and envelope() serves any range at a bounded number of points.
+    """
+
+    def __init__(self, n_rows, ring_capacity, path=None, time_row=0, dtype=np.float64, lod_base=None, lod_factor=4):
+        self.logger = logging.getLogger(__name__)
+        self.n_rows = int(n_rows)
+        self.time_row = int(time_row)
+        self.dtype = np.dtype(dtype)
+        self.ring = SampleRingBuffer(self.n_rows, ring_capacity, dtype=self.dtype)
+
+        self._owns_file = path is None
+        if path is None:
+            fd, path = tempfile.mkstemp(prefix="eeg_history_", suffix=".bin")
+            os.close(fd)
+        self.path = path
+        self._file = open(self.path, "wb")
+        self._map = None  # (n_samples, n_rows) memmap of the flushed part of the file
+
+        self._value_rows = [row for row in range(self.n_rows) if row != self.time_row]
+        self.pyramid = None
+        if lod_base is not None:
+            self.pyramid = MinMaxPyramid(len(self._value_rows), self.path, lod_base, lod_factor, self.dtype)
+
+    @property
+    def count(self):
+        """Absolute index one past the newest sample."""
+        return self.ring.count
+
+    @property
+    def ring_start(self):
+        """Absolute index of the oldest sample still held in RAM."""
+        return self.ring.oldest_index
+
+    def append(self, block):
+        """Append a (n_rows, k) block."""
+        if block.shape[1] == 0:
+            return
+        self._file.write(np.ascontiguousarray(block.T, dtype=self.dtype).tobytes())
+        self.ring.append(block)
+        if self.pyramid is not None:
+            self.pyramid.append(block[self._value_rows])
+
+    def _disk(self, stop):
+        """Memmap covering at least samples [0, stop) of the file."""
+        if self._map is None or self._map.shape[0] < stop:
+            self._file.flush()
+            self._map = np.memmap(self.path, dtype=self.dtype, mode="r", shape=(self.count, self.n_rows))
+        return self._map
+
+    def read(self, start, stop):
+        """
+        Samples [start, stop) as (n_rows, k), clipped to the session. Served from
+        the ring when it still holds them (a view), otherwise from the file (a
+        transposed view of the memmap; only the touched pages are read).
+        """
+        stop = min(int(stop), self.count)
+        start = max(int(start), 0)
+        if stop <= start:
+            return np.empty((self.n_rows, 0), dtype=self.dtype)
+        if start >= self.ring_start:
+            return self.ring.read(start, stop)
+        return self._disk(stop)[start:stop].T
+
+    def index_of_time(self, t, side="left"):
+        """Absolute index where time `t` would be inserted into the time row."""
+        count = self.count
+        if count == 0:
+            return 0
+        ring_start = self.ring_start
+        times = self.ring.read(ring_start, count)[self.time_row]
+        if ring_start == 0 or t > times[0] or (t == times[0] and side == "right"):
+            return ring_start + int(np.searchsorted(times, t, side=side))
+        # Older than RAM: binary search the file's time column
+        column = self._disk(ring_start)[:ring_start, self.time_row]
+        return int(np.searchsorted(column, t, side=side))
+
+    def times_at(self, indices):
+        """Time-row values at absolute sample indices (any shape)."""
+        indices = np.asarray(indices, dtype=np.int64)
+        if indices.size == 0:
+            return np.empty(indices.shape, dtype=self.dtype)
+        lo, hi = int(indices.min()), int(indices.max()) + 1
+        if lo >= self.ring_start:
+            return self.ring.read(lo, hi)[self.time_row][indices - lo]
+        return self._disk(hi)[indices, self.time_row]
+
+    def envelope(self, start, stop, max_points):
+        """
+        The non-time rows over samples [start, stop) in about `max_points`
+        points per row: raw samples when they fit, otherwise the min/max
+        buckets of the finest pyramid level that fits. The newest, not yet
+        bucketed, part is filled in from finer levels and finally raw samples.
+
+        Returns (values, indices): (n_rows - 1, m) values and absolute indices.
+        """
+        stop = min(int(stop), self.count)
+        start = max(int(start), 0)
+        level = None
+        if self.pyramid is not None:
+            level = self.pyramid.choose_level(stop - start, max_points)
+        values, indices = [], []
+        while level is not None and level >= 0 and start < stop:
+            v, i, start = self.pyramid.buckets(level, start, stop)
+            values.append(v)
+            indices.append(i)
+            level -= 1
+        if start < stop:
+            k = stop - start
+            values.append(self.read(start, stop)[self._value_rows])
+            indices.append(np.broadcast_to(np.arange(start, stop), (len(self._value_rows), k)))
+        if not values:
+            return np.empty((len(self._value_rows), 0), dtype=self.dtype), np.empty((len(self._value_rows), 0), dtype=np.int64)
+        return np.hstack(values), np.hstack(indices)
+
+    def close(self):
+        """Close the files; temporary files created by this history are deleted."""
+        self._map = None
+        if self.pyramid is not None:
+            self.pyramid.close(remove=self._owns_file)
+        try:
+            self._file.close()
+            if self._owns_file:
+                os.remove(self.path)
+        except Exception as e:
+            self.logger.error(f"Could not close history file {self.path}: {e}")
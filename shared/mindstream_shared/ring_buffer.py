@@ -0,0 +1,81 @@
+import threading
+import numpy as np
+
+
+class SampleRingBuffer:
+    """
+    Preallocated (n_rows, capacity) ring buffer with a monotonically increasing
+    sample counter.
+
+    Every sample is stored twice (at slot and slot + capacity), so any window of
+    up to `capacity` samples is one contiguous slice of the backing array.
+    Readers get views instead of copies, even across the wrap point.
+    """
+
+    def __init__(self, n_rows, capacity, dtype=np.float64):
+        self.n_rows = int(n_rows)
+        self.capacity = int(capacity)
+        self._buf = np.zeros((self.n_rows, 2 * self.capacity), dtype=dtype)
+        self._count = 0  # Total samples ever written (never wraps)
+        self._lock = threading.Lock()
+
+    @property
+    def count(self) -> int:
+        """Absolute index one past the newest sample."""
+        return self._count
+
+    @property
+    def oldest_index(self) -> int:
+        """Absolute index of the oldest sample still held in the buffer."""
+        return max(0, self._count - self.capacity)
+
+    def append(self, block):
+        """Append a (n_rows, n) block. Blocks longer than capacity keep only their tail."""
+        n = block.shape[1]
+        if n == 0:
+            return
+        cap = self.capacity
+        skipped = 0
+        if n > cap:
+            skipped = n - cap
+            block = block[:, -cap:]
+            n = cap
+
+        pos = (self._count + skipped) % cap
+        first = min(n, cap - pos)
+        self._buf[:, pos:pos + first] = block[:, :first]
+        self._buf[:, pos + cap:pos + cap + first] = block[:, :first]
+        rest = n - first
+        if rest:
+            self._buf[:, :rest] = block[:, first:]
+            self._buf[:, cap:cap + rest] = block[:, first:]
+
+        # Publish the new samples only once they are fully written
+        with self._lock:
+            self._count += n + skipped
+
+    def read(self, start, stop):
+        """
+        Return a view of samples [start, stop) by absolute index.
+        The range is clipped to what the buffer still holds.
+        """
+        with self._lock:
+            count = self._count
+        stop = min(int(stop), count)
+        start = max(int(start), count - self.capacity, 0)
+        if stop <= start:
+            start = stop = 0
+        s = start % self.capacity
+        view = self._buf[:, s:s + (stop - start)]
+        view.flags.writeable = False
+        return view
+
+    def latest(self, num_points):
+        """Return a view of the newest `num_points` samples (fewer if not yet available)."""
+        with self._lock:
+            count = self._count
+        return self.read(count - int(num_points), count)
+
+    def clear(self):
+        with self._lock:
+            self._count = 0
@@ -0,0 +1,190 @@
+"""
+Scalp maps: 10-10 electrode positions and TopomapView, which draws the head
+once and redraws each map as one precomputed interpolation product. Used by
+the GUI's Topomap tab and the live topomap scripts.
+"""
+import numpy as np
+import pyqtgraph as pg
+from scipy.interpolate import CloughTocher2DInterpolator
+
+# Flattened 10-10 layout: nose up (+y), right ear +x, head circumference at radius 1
+POSITIONS_10_10 = {
+    "Nz": (0.0, 1.3), "Fp1": (-0.5, 1.0), "Fp2": (0.5, 1.0), "Fpz": (0.0, 1.0),
+    "AF7": (-0.75, 0.75), "AF3": (-0.25, 0.75), "AFz": (0.0, 0.75), "AF4": (0.25, 0.75), "AF8": (0.75, 0.75),
+    "F9": (-1.2, 0.6), "F7": (-1.0, 0.5), "F5": (-0.75, 0.5), "F3": (-0.5, 0.5), "F1": (-0.25, 0.5),
+    "Fz": (0.0, 0.5), "F2": (0.25, 0.5), "F4": (0.5, 0.5), "F6": (0.75, 0.5), "F8": (1.0, 0.5), "F10": (1.2, 0.6),
+    "FT9": (-1.2, 0.3), "FT7": (-1.0, 0.3), "FC5": (-0.75, 0.3), "FC3": (-0.5, 0.3), "FC1": (-0.25, 0.3),
+    "FCz": (0.0, 0.3), "FC2": (0.25, 0.3), "FC4": (0.5, 0.3), "FC6": (0.75, 0.3), "FT8": (1.0, 0.3), "FT10": (1.2, 0.3),
+    "T9": (-1.2, 0.0), "T7": (-1.0, 0.0), "C5": (-0.75, 0.0), "C3": (-0.5, 0.0), "C1": (-0.25, 0.0),
+    "Cz": (0.0, 0.0), "C2": (0.25, 0.0), "C4": (0.5, 0.0), "C6": (0.75, 0.0), "T8": (1.0, 0.0), "T10": (1.2, 0.0),
+    "TP9": (-1.2, -0.3), "TP7": (-1.0, -0.3), "CP5": (-0.75, -0.3), "CP3": (-0.5, -0.3), "CP1": (-0.25, -0.3),
+    "CPz": (0.0, -0.3), "CP2": (0.25, -0.3), "CP4": (0.5, -0.3), "CP6": (0.75, -0.3), "TP8": (1.0, -0.3), "TP10": (1.2, -0.3),
+    "P9": (-1.2, -0.6), "P7": (-1.0, -0.5), "P5": (-0.75, -0.5), "P3": (-0.5, -0.5), "P1": (-0.25, -0.5),
+    "Pz": (0.0, -0.5), "P2": (0.25, -0.5), "P4": (0.5, -0.5), "P6": (0.75, -0.5), "P8": (1.0, -0.5), "P10": (1.2, -0.6),
+    "PO7": (-0.75, -0.75), "PO3": (-0.25, -0.75), "POz": (0.0, -0.75), "PO4": (0.25, -0.75), "PO8": (0.75, -0.75),
+    "O1": (-0.5, -1.0), "Oz": (0.0, -1.0), "O2": (0.5, -1.0), "Iz": (0.0, -1.2),
+}
+
+
+def project_positions(ch_pos, origin=(0.0, 0.0, 0.0)):
+    """
+    Flatten 3D head-frame electrode positions {name: (x, y, z)} (e.g. an MNE
+    montage's get_positions()["ch_pos"]) to 2D with the azimuthal equidistant
+    projection topomaps use: the vertex at the centre, the equator at radius 1.
+    """
+    names = list(ch_pos)
+    xyz = np.array([ch_pos[name] for name in names], dtype=float) - np.asarray(origin, dtype=float)
+    polar = np.arccos(np.clip(xyz[:, 2] / np.linalg.norm(xyz, axis=1), -1.0, 1.0))
+    azimuth = np.arctan2(xyz[:, 1], xyz[:, 0])
+    radius = polar / (np.pi / 2)
+    return {name: (r * np.cos(a), r * np.sin(a)) for name, r, a in zip(names, radius, azimuth)}
+
+
+def ring_positions(names, radius=0.7):
+    """
+    Placeholder layout for channels without known electrode positions: evenly
+    on a circle, first channel at the top, going clockwise. Not anatomical.
+    """
+    angles = np.pi / 2 - 2 * np.pi * np.arange(len(names)) / max(len(names), 1)
+    return {name: (radius * np.cos(a), radius * np.sin(a)) for name, a in zip(names, angles)}
+
+
+class TopomapInterpolator:
+    """
+    Sensor-to-grid interpolation of a scalp map as one precomputed matrix.
+
+    Clough-Tocher interpolation is linear in the sensor values, so interpolating
+    the identity once gives a (n_pixels, n_ch) operator: every later map is a
+    single matrix-vector product. Points on a ring outside the sensors take an
+    inverse-distance mean of the sensors (like extrapolating to the head
+    outline), so the whole head disc is covered. Build once per channel set.
+    """
+
+    def __init__(self, positions, res=128, head_radius=1.0, n_border=24):
+        positions = np.asarray(positions, dtype=float).reshape(-1, 2)
+        n_ch = positions.shape[0]
+        if n_ch < 3:
+            raise ValueError("A topomap needs at least 3 sensors")
+        self.positions = positions
+        self.res = int(res)
+        self.head_radius = float(head_radius)
+
+        # Pixel centres of the square around the head; only the disc is drawn
+        axis = np.linspace(-self.head_radius, self.head_radius, self.res)
+        gx, gy = np.meshgrid(axis, axis)  # Row-major: image[y, x]
+        inside = gx ** 2 + gy ** 2 <= self.head_radius ** 2
+        self.inside = np.flatnonzero(inside)
+
+        ring = 1.1 * max(self.head_radius, np.linalg.norm(positions, axis=1).max())
+        angles = np.linspace(0.0, 2.0 * np.pi, n_border, endpoint=False)
+        border = ring * np.column_stack((np.cos(angles), np.sin(angles)))
+        distance = np.linalg.norm(border[:, None, :] - positions[None, :, :], axis=-1)
+        border_weights = 1.0 / np.maximum(distance, 1e-9) ** 2
+        border_weights /= border_weights.sum(axis=1, keepdims=True)
+
+        interpolator = CloughTocher2DInterpolator(
+            np.vstack((positions, border)), np.vstack((np.eye(n_ch), border_weights)))
+        pixels = np.column_stack((gx.ravel()[self.inside], gy.ravel()[self.inside]))
+        self.operator = np.ascontiguousarray(np.nan_to_num(interpolator(pixels)))  # (n_inside, n_ch)
+
+    def new_image(self):
+        """(res, res) float image, NaN (transparent) outside the head."""
+        return np.full((self.res, self.res), np.nan)
+
+    def interpolate(self, values, out=None):
+        """Fill `out` (see new_image) with the map for one value per sensor."""
+        if out is None:
+            out = self.new_image()
+        out.ravel()[self.inside] = self.operator @ np.asarray(values, dtype=float)
+        return out
+
+
+class TopomapView(pg.PlotWidget):
+    """
+    Scalp map with a persistent image: the head outline, sensors, labels and
+    colour bar are drawn once; set_values() only interpolates and swaps the
+    image data. The interpolation operator is rebuilt only when set_channels()
+    receives a different channel set.
+    """
+
+    def __init__(self, positions=None, res=128, colormap="turbo", show_names=True, parent=None):
+        super().__init__(parent)
+        self.positions = dict(POSITIONS_10_10 if positions is None else positions)
+        self.res = int(res)
+        self.show_names = show_names
+        self.names = ()
+        self.interpolator = None
+        self._image_data = None
+        self._keep = []
+        self._labels = []
+
+        self.setAspectLocked(True)
+        self.setMouseEnabled(x=False, y=False)
+        self.hideAxis("left")
+        self.hideAxis("bottom")
+        self.hideButtons()
+
+        self.image = pg.ImageItem(axisOrder="row-major")
+        self.addItem(self.image)
+        cmap = pg.colormap.get(colormap)
+        self.colorbar = pg.ColorBarItem(values=(0.0, 1.0), colorMap=cmap, interactive=False, width=12)
+        self.colorbar.setImageItem(self.image, insert_in=self.getPlotItem())
+
+        self._draw_head()
+        self.sensors = pg.ScatterPlotItem(size=6, pen=pg.mkPen("k"), brush=pg.mkBrush("w"))
+        self.addItem(self.sensors)
+
+    def _draw_head(self):
+        pen = pg.mkPen("w", width=2)
+        theta = np.linspace(0.0, 2.0 * np.pi, 181)
+        self.addItem(pg.PlotCurveItem(np.cos(theta), np.sin(theta), pen=pen))
+        self.addItem(pg.PlotCurveItem([-0.09, 0.0, 0.09], [0.995, 1.1, 0.995], pen=pen))  # Nose
+        ear_y = np.array([0.09, 0.11, 0.09, -0.11, -0.13, -0.09])
+        ear_x = np.array([0.0, 0.05, 0.09, 0.09, 0.05, 0.0])
+        self.addItem(pg.PlotCurveItem(1.0 + ear_x, ear_y, pen=pen))
+        self.addItem(pg.PlotCurveItem(-1.0 - ear_x, ear_y, pen=pen))
+        self.setRange(xRange=(-1.2, 1.2), yRange=(-1.15, 1.2), padding=0)
+
+    def set_channels(self, names):
+        """
+        Use these channels (in value order); names without a position are
+        skipped. Returns the indices into `names` that set_values() will read.
+        """
+        names = tuple(names)
+        keep = [i for i, name in enumerate(names) if name in self.positions]
+        kept_names = tuple(names[i] for i in keep)
+        if kept_names != self.names:
+            self.names = kept_names
+            self.interpolator = None
+            self._image_data = None
+            xy = np.array([self.positions[name] for name in kept_names], dtype=float).reshape(-1, 2)
+            if len(kept_names) >= 3:
+                self.interpolator = TopomapInterpolator(xy, res=self.res)
+                self._image_data = self.interpolator.new_image()
+                self.image.setImage(self._image_data, autoLevels=False)  # setRect needs the image size
+                r = self.interpolator.head_radius
+                self.image.setRect(pg.QtCore.QRectF(-r, -r, 2 * r, 2 * r))
+            self.sensors.setData(xy[:, 0], xy[:, 1])
+            for label in self._labels:
+                self.removeItem(label)
+            self._labels = []
+            if self.show_names:
+                for name, (x, y) in zip(kept_names, xy):
+                    label = pg.TextItem(name, color="w", anchor=(0.5, -0.2))
+                    label.setPos(x, y)
+                    self.addItem(label)
+                    self._labels.append(label)
+        self._keep = keep
+        return keep
+
+    def set_values(self, values, levels=None):
+        """Draw one value per channel given to set_channels(); levels default to the value range."""
+        if self.interpolator is None:
+            return
+        values = np.asarray(values, dtype=float)[self._keep]
+        self.interpolator.interpolate(values, out=self._image_data)
+        if levels is None:
+            low, high = float(np.min(values)), float(np.max(values))
+            levels = (low, high if high > low else low + 1e-6)
+        self.image.setImage(self._image_data, autoLevels=False)
+        self.colorbar.setLevels(levels)
@@ -0,0 +1,70 @@
+import numpy as np
+import pytest
+
+from mindstream_shared.ring_buffer import SampleRingBuffer
+
+
+def _samples(start, stop, n_rows=3):
+    """Rows r * 1000 + absolute sample index, so every value says where it came from."""
+    return np.arange(start, stop)[None, :] + 1000.0 * np.arange(n_rows)[:, None]
+
+
+def test_reads_by_absolute_index_before_wrapping():
+    ring = SampleRingBuffer(3, 10)
+    ring.append(_samples(0, 4))
+    ring.append(_samples(4, 7))
+
+    assert ring.count == 7
+    assert ring.oldest_index == 0
+    np.testing.assert_array_equal(ring.read(2, 6), _samples(2, 6))
+    np.testing.assert_array_equal(ring.latest(3), _samples(4, 7))
+
+
+def test_window_across_the_wrap_point_is_one_view():
+    ring = SampleRingBuffer(3, 8)
+    for start in range(0, 21, 3):  # Wraps twice, in blocks that straddle the end
+        ring.append(_samples(start, start + 3))
+
+    assert ring.count == 21
+    assert ring.oldest_index == 13
+    window = ring.latest(8)
+    np.testing.assert_array_equal(window, _samples(13, 21))
+    assert window.base is not None  # A view of the backing array, not a copy
+    assert not window.flags.writeable
+
+
+def test_block_longer_than_capacity_keeps_its_tail():
+    ring = SampleRingBuffer(3, 5)
+    ring.append(_samples(0, 2))
+    ring.append(_samples(2, 14))
+
+    assert ring.count == 14  # Skipped samples still count towards the absolute index
+    np.testing.assert_array_equal(ring.latest(5), _samples(9, 14))
+    np.testing.assert_array_equal(ring.read(0, 14), _samples(9, 14))
+    ring.append(_samples(14, 16))
+    np.testing.assert_array_equal(ring.latest(5), _samples(11, 16))
+
+
+@pytest.mark.parametrize("start, stop, expected", [
+    (0, 20, (10, 20)),   # Overwritten samples are clipped off the front
+    (15, 99, (15, 20)),  # Samples not yet written are clipped off the end
+    (3, 8, (0, 0)),      # Entirely overwritten: empty
+    (20, 25, (0, 0)),    # Entirely in the future: empty
+])
+def test_read_clips_to_what_is_held(start, stop, expected):
+    ring = SampleRingBuffer(3, 10)
+    ring.append(_samples(0, 20))
+    np.testing.assert_array_equal(ring.read(start, stop), _samples(*expected))
+
+
+def test_latest_before_enough_samples_and_clear():
+    ring = SampleRingBuffer(2, 6)
+    assert ring.latest(4).shape == (2, 0)
+    ring.append(_samples(0, 3, n_rows=2))
+    np.testing.assert_array_equal(ring.latest(4), _samples(0, 3, n_rows=2))
+    ring.append(_samples(3, 3, n_rows=2))  # Empty blocks are ignored
+    assert ring.count == 3
+
+    ring.clear()
+    assert ring.count == 0
+    assert ring.latest(4).shape == (2, 0)